@@ -0,0 +1,471 @@
+"""
+JSON API 공용 로직 (동기 app.py 와 비동기 asgi.py 가 함께 쓴다)
+
+요청 파라미터 해석, Mongo 쿼리/커서 조립, 응답 모양 만들기는 여기에만 두고
+두 앱은 드라이버 호출과 HTTP 응답(상태 코드, ETag, 캐시)만 한다 → 고칠 곳이 한 군데.
+
+- Find 는 find 한 번의 조건이다. 동기/비동기 컬렉션의 커서가 sort/skip/limit 를 똑같이 가지므로
+  Find.cursor(coll) 로 만든 커서를 동기 쪽은 list(...), 비동기 쪽은 await cursor.to_list(None) 으로 읽는다.
+- 잘못된 파라미터는 BadRequest(msg) → 두 앱 모두 400 {"success": false, "msg": msg}.
+- 여기서는 Flask/Quart 와 DB 에 접근하지 않는다 (request.args 같은 매핑과 문서만 받음).
+"""
+import json
+import base64
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import DESCENDING, ReturnDocument
+
+import cache
+import counters
+import search
+
+class BadRequest(Exception):
+    """요청 파라미터 오류 (메시지를 그대로 400 응답에 담는다)"""
+
+def int_arg(args, name: str, default: int, high: int) -> int:
+    """1 ~ high 로 자른 정수 파라미터. 숫자가 아니면 ValueError."""
+    return min(max(int(args.get(name, default)), 1), high)
+
+def arg_flag(args, name: str, default: bool) -> bool:
+    value = args.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+def user_tag(username) -> str:
+    """사용자별 필드(liked)가 들어간 응답의 ETag 를 사용자마다 다르게"""
+    if username is None:
+        return "anon"
+    return hashlib.blake2s(username.encode("utf-8"), digest_size=6).hexdigest()
+
+def to_iso(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.isoformat()
+
+class Find:
+    """find 한 번의 조건 (필터, projection, 정렬, skip, limit)"""
+
+    def __init__(self, query: dict, projection=None, sort=None, skip: int = 0, limit: int = 0,
+                 batch_size: int = 0):
+        self.query = query
+        self.projection = projection
+        self.sort = sort
+        self.skip = skip
+        self.limit = limit
+        self.batch_size = batch_size
+
+    def cursor(self, coll):
+        cur = coll.find(self.query, self.projection)
+        if self.sort:
+            cur = cur.sort(self.sort)
+        if self.skip:
+            cur = cur.skip(self.skip)
+        if self.limit:
+            cur = cur.limit(self.limit)
+        if self.batch_size:
+            cur = cur.batch_size(self.batch_size)
+        return cur
+
+# ── 키셋(커서) 페이지네이션 ──
+# 정렬 키 (created_at, _id) 를 불투명 토큰으로 감싸 클라이언트에 내려준다.
+EPOCH = datetime(1970, 1, 1)
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+OLDEST_FIRST = [("created_at", 1), ("_id", 1)]
+
+def encode_cursor(doc: dict) -> str:
+    dt = doc["created_at"]
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    ms = (dt - EPOCH) // timedelta(milliseconds=1)  # Mongo datetime 은 ms 정밀도
+    raw = f"{ms}:{doc['_id']}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def decode_cursor(token: str) -> tuple:
+    """토큰 → (created_at, _id). 형식이 잘못되면 ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode("ascii")
+        ms, oid = raw.split(":", 1)
+        return EPOCH + timedelta(milliseconds=int(ms)), ObjectId(oid)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+def keyset_filter(key: tuple, forward: bool) -> dict:
+    """forward=True 면 커서보다 오래된 항목, False 면 더 최신 항목."""
+    created_at, oid = key
+    op = "$lt" if forward else "$gt"
+    return {"$or": [
+        {"created_at": {op: created_at}},
+        {"created_at": created_at, "_id": {op: oid}},
+    ]}
+
+def cursor_args(args) -> tuple:
+    """after / before 파라미터 → (after, before) 정렬 키. 둘 다 있으면 after 만 쓴다."""
+    after, before = args.get("after"), args.get("before")
+    try:
+        return (decode_cursor(after) if after else None,
+                decode_cursor(before) if before and not after else None)
+    except ValueError:
+        raise BadRequest("잘못된 커서입니다.")
+
+def keyset_find(query: dict, per_page: int, after=None, before=None, projection=None) -> Find:
+    """
+    커서 기준 한 페이지(+1) 조회 조건. after/before 는 decode_cursor() 결과, 둘 다 없으면 첫 페이지.
+    projection 에는 커서를 만들 created_at 이 포함돼야 한다.
+    """
+    forward = before is None
+    if after is not None or before is not None:
+        query = {**query, **keyset_filter(after or before, forward)}
+    return Find(query, projection, NEWEST_FIRST if forward else OLDEST_FIRST, limit=per_page + 1)
+
+def keyset_result(docs: list, per_page: int, after=None, before=None) -> tuple:
+    """keyset_find 로 읽은 문서 → (docs, has_next, has_prev). docs 는 항상 최신순."""
+    more = len(docs) > per_page
+    docs = docs[:per_page]
+    if before is not None:
+        docs.reverse()
+        return docs, True, more
+    return docs, more, after is not None
+
+def page_links(docs: list, has_next: bool, has_prev: bool) -> dict:
+    return {
+        "has_next": has_next,
+        "has_prev": has_prev,
+        "next_cursor": encode_cursor(docs[-1]) if docs and has_next else None,
+        "prev_cursor": encode_cursor(docs[0]) if docs and has_prev else None,
+    }
+
+# ── 읽기 projection ──
+# 검색용 bigram 필드는 본문보다 커질 수 있으므로 어떤 응답에도 읽어 오지 않는다
+POST_DETAIL_FIELDS = {search.TITLE_FIELD: 0, search.BODY_FIELD: 0}
+# 목록 카드: 본문 대신 excerpt, 이미지는 첫 장만
+POST_SUMMARY_FIELDS = {
+    "title": 1, search.EXCERPT_FIELD: 1, "board": 1, "author": 1, "created_at": 1,
+    "images": {"$slice": 1}, "image_variants": 1, "likes_count": 1, "comments_count": 1,
+}
+COMMENT_FIELDS = {"author": 1, "content": 1, "created_at": 1}
+# 검색 결과 댓글: 어느 글/게시판의 댓글인지 함께
+SEARCH_COMMENT_FIELDS = {**COMMENT_FIELDS, "post_id": 1, "board": 1}
+
+# ── 직렬화 ──
+def post_doc_to_json(doc: dict, liked: bool = False) -> dict:
+    return {
+        "id": str(doc["_id"]),
+        "title": doc["title"],
+        "content": doc["content"],
+        "board": doc["board"],
+        "author": doc["author"],
+        "created_at": to_iso(doc["created_at"]),
+        # 프런트에서 그대로 <img src="{url}"> 로 사용 가능한 절대경로 저장
+        "images": doc.get("images", []),  # e.g. ["/uploads/660a..._image.png"]
+        # [{"src": 원본 URL, "thumb": 320px WebP, "webp": 1280px WebP}] — 생성 완료된 것만
+        "image_variants": doc.get("image_variants", []),
+        # 좋아요 정보: 전체 개수 + 현재 사용자 좋아요 여부 (liked_by 목록은 내려주지 않음)
+        "likes_count": doc.get("likes_count", 0),
+        "liked": liked,
+        "comments_count": doc.get("comments_count", 0),
+    }
+
+def post_summary_to_json(doc: dict, liked: bool = False) -> dict:
+    """목록용: 본문 요약 + 썸네일 하나 (POST_SUMMARY_FIELDS 로 읽은 문서)"""
+    images = doc.get("images", [])
+    first = images[0] if images else None
+    # 320px 썸네일이 생성돼 있으면 그것, 아니면 원본
+    thumb = next((v["thumb"] for v in doc.get("image_variants", []) if v.get("src") == first), first)
+    return {
+        "id": str(doc["_id"]),
+        "title": doc["title"],
+        "excerpt": doc.get(search.EXCERPT_FIELD, ""),
+        "board": doc["board"],
+        "author": doc["author"],
+        "created_at": to_iso(doc["created_at"]),
+        "thumb": thumb,
+        "likes_count": doc.get("likes_count", 0),
+        "liked": liked,
+        "comments_count": doc.get("comments_count", 0),
+    }
+
+def comment_doc_to_json(doc: dict) -> dict:
+    return {
+        "id": str(doc["_id"]),
+        "author": doc.get("author", "익명"),
+        "content": doc.get("content", ""),
+        "created_at": to_iso(doc["created_at"]),
+    }
+
+def item_ids(items: list) -> list:
+    return [ObjectId(item["id"]) for item in items]
+
+def with_liked(items: list, liked_ids: set) -> list:
+    """캐시된 카드(사용자 무관)에 현재 사용자의 liked 를 채운 사본"""
+    return [{**item, "liked": ObjectId(item["id"]) in liked_ids} for item in items]
+
+def liked_find(post_ids: list, username: str) -> Find:
+    """현재 사용자가 좋아요한 게시글 (페이지당 쿼리 1회)"""
+    return Find({"post_id": {"$in": post_ids}, "username": username}, {"post_id": 1, "_id": 0})
+
+# ── 게시글 목록 (GET /api/posts) ──
+class PostList:
+    """
+    board, per_page, after/before(커서) 또는 page(skip, 하위 호환), include_total.
+    캐시에는 사용자 무관한 shape() 결과를 넣고, 요청마다 data() 로 liked/전체 수를 붙인다.
+    """
+
+    def __init__(self, args):
+        self.board = args.get("board")
+        self.per_page = int_arg(args, "per_page", 10, 50)
+        self.include_total = arg_flag(args, "include_total", True)
+        self.query = {"board": self.board} if self.board else {}
+        self.after, self.before = cursor_args(args)
+        if self.after or self.before:
+            # 커서 모드: 정렬 키 기준 범위 조회 → 페이지 깊이와 무관하게 일정한 비용
+            self.page = None
+            self.variant = f"a{args['after']}" if self.after else f"b{args['before']}"
+        else:
+            self.page = max(int(args.get("page", 1)), 1)
+            self.variant = f"p{self.page}"
+
+    def etag(self, version: int, username) -> str:
+        return f"b{version}-{user_tag(username)}"
+
+    def cache_key(self, shared: str) -> str:
+        return cache.list_key(self.board, shared, self.per_page, self.variant)
+
+    def total_key(self) -> str:
+        return counters.board_key(self.board) if self.board else counters.POSTS
+
+    def find(self) -> Find:
+        if self.page is None:
+            return keyset_find(self.query, self.per_page, self.after, self.before, POST_SUMMARY_FIELDS)
+        return Find(self.query, POST_SUMMARY_FIELDS, NEWEST_FIRST,  # 최신순
+                    skip=(self.page - 1) * self.per_page, limit=self.per_page + 1)
+
+    def shape(self, docs: list) -> dict:
+        if self.page is None:
+            docs, has_next, has_prev = keyset_result(docs, self.per_page, self.after, self.before)
+        else:
+            has_next = len(docs) > self.per_page
+            docs = docs[:self.per_page]
+            has_prev = self.page > 1
+        return {"items": [post_summary_to_json(doc) for doc in docs], **page_links(docs, has_next, has_prev)}
+
+    def data(self, cached: dict, liked_ids: set, total: int = None) -> dict:
+        data = {**cached, "items": with_liked(cached["items"], liked_ids), "per_page": self.per_page}
+        if self.page is not None:
+            data["page"] = self.page
+        if self.include_total:
+            data["total"] = total
+            data["pages"] = (total + self.per_page - 1) // self.per_page
+        return data
+
+# ── 인기글 (GET /api/posts/hot) ──
+class HotList:
+    def __init__(self, args):
+        self.board = args.get("board") or None
+        try:
+            self.limit = int_arg(args, "limit", 10, 50)
+        except ValueError:
+            raise BadRequest("limit 은 숫자여야 합니다.")
+
+    def etag(self, version: int, username) -> str:
+        return f"h{version}-{user_tag(username)}"
+
+    def cache_key(self, shared: str) -> str:
+        return cache.list_key(self.board, shared, "hot", self.limit)
+
+    def find(self) -> Find:
+        """hot_posts 에서 순위순 _id (hot.top 과 같은 순서)"""
+        return Find({"board": self.board} if self.board else {}, {"_id": 1},
+                    [("rank", DESCENDING)], limit=self.limit)
+
+    def posts_find(self, ranked: list) -> Find:
+        return Find({"_id": {"$in": [d["_id"] for d in ranked]}}, POST_SUMMARY_FIELDS)
+
+    def shape(self, ranked: list, docs: list) -> dict:
+        """순위 문서 + 게시글 카드 → 순위순 목록 (그 사이 지워진 글은 뺀다)"""
+        by_id = {d["_id"]: d for d in docs}
+        return {"items": [post_summary_to_json(by_id[d["_id"]]) for d in ranked if d["_id"] in by_id]}
+
+    def data(self, cached: dict, liked_ids: set) -> dict:
+        return {"board": self.board, "items": with_liked(cached["items"], liked_ids)}
+
+# ── 게시글 상세 (GET /api/posts/<id>, /view) ──
+def post_etag(version: int, username) -> str:
+    return f"p{version}-{user_tag(username)}"
+
+def post_view_pipeline(oid, per_page: int, username=None) -> list:
+    """상세 페이지용 $lookup 집계: 게시글 + 댓글 첫 페이지(+1) + 현재 사용자 좋아요 여부"""
+    pipeline = [
+        {"$match": {"_id": oid}},
+        {"$project": POST_DETAIL_FIELDS},
+        {"$lookup": {
+            "from": "comments",
+            "let": {"pid": "$_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$post_id", "$$pid"]}}},
+                {"$sort": {"created_at": -1, "_id": -1}},
+                {"$limit": per_page + 1},
+                {"$project": COMMENT_FIELDS},
+            ],
+            "as": "_comments",
+        }},
+    ]
+    if username:
+        pipeline.append({"$lookup": {
+            "from": "likes",
+            "let": {"pid": "$_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$and": [
+                    {"$eq": ["$post_id", "$$pid"]},
+                    {"$eq": ["$username", username]},
+                ]}}},
+                {"$limit": 1},
+                {"$project": {"_id": 1}},
+            ],
+            "as": "_liked",
+        }})
+    return pipeline
+
+def post_view_to_json(doc: dict, per_page: int, username=None) -> dict:
+    liked = bool(doc.get("_liked"))
+    items = doc["_comments"]
+    has_next = len(items) > per_page
+    items = items[:per_page]
+    return {
+        "post": post_doc_to_json(doc, liked),
+        "comments": {
+            "items": [comment_doc_to_json(c) for c in items],
+            "per_page": per_page,
+            "has_next": has_next,
+            "next_cursor": encode_cursor(items[-1]) if items and has_next else None,
+        },
+        "comments_count": doc.get("comments_count", 0),
+        "viewer": {
+            "username": username,
+            "liked": liked,
+            "is_author": username is not None and username == doc["author"],
+        },
+    }
+
+# ── 댓글 (GET/POST /api/posts/<id>/comments) ──
+def comments_etag(version: int) -> str:
+    return f"c{version}"
+
+def comment_stream_find(post_id) -> Find:
+    # 커서를 배치 단위로 읽으면서 바로 내보내므로 스레드 길이와 무관하게 메모리 일정
+    return Find({"post_id": post_id}, COMMENT_FIELDS, NEWEST_FIRST, batch_size=200)
+
+def ndjson_line(doc: dict) -> str:
+    return json.dumps(comment_doc_to_json(doc), ensure_ascii=False) + "\n"
+
+class CommentPage:
+    def __init__(self, post_id, args):
+        self.per_page = int_arg(args, "per_page", 20, 100)
+        self.after, self.before = cursor_args(args)
+        self.post_id = post_id
+
+    def find(self) -> Find:
+        return keyset_find({"post_id": self.post_id}, self.per_page, self.after, self.before, COMMENT_FIELDS)
+
+    def data(self, docs: list) -> dict:
+        docs, has_next, has_prev = keyset_result(docs, self.per_page, self.after, self.before)
+        return {"items": [comment_doc_to_json(c) for c in docs], "per_page": self.per_page,
+                **page_links(docs, has_next, has_prev)}
+
+def comment_content(data: dict) -> str:
+    content = (data.get("content") or "").strip()
+    if not content:
+        raise BadRequest("댓글 내용을 입력해 주세요.")
+    return content
+
+COMMENT_POST_FIELDS = {"board": 1}
+
+def count_comment(oid) -> dict:
+    """
+    댓글 수 증가 (update_one 인자). 댓글을 넣은 다음에 올린다 → 넣기가 실패해도 수가 부풀지 않음.
+    matched_count 0 이면 그 사이 글이 지워진 것이므로 호출 측이 넣은 댓글을 지운다.
+    """
+    return {"filter": {"_id": oid}, "update": {"$inc": {"comments_count": 1}}}
+
+def new_comment(post: dict, author: str, content: str) -> dict:
+    return {
+        "post_id": post["_id"],
+        "board": post["board"],  # 검색 시 게시판 필터용
+        "author": author,
+        "content": content,
+        "created_at": datetime.utcnow(),
+        **search.comment_fields(content),
+    }
+
+# ── 좋아요 (POST /api/posts/<id>/like) ──
+def new_like(oid, username: str) -> dict:
+    return {"post_id": oid, "username": username, "created_at": datetime.utcnow()}
+
+def count_like(oid, delta: int) -> dict:
+    """좋아요 수 반영 + 결과 수/게시판 읽기 (find_one_and_update 인자, 없으면 None)"""
+    return {"filter": {"_id": oid}, "update": {"$inc": {"likes_count": delta}},
+            "projection": {"likes_count": 1, "board": 1}, "return_document": ReturnDocument.AFTER}
+
+def like_data(doc: dict, liked: bool) -> dict:
+    return {"likes_count": doc.get("likes_count", 0), "liked": liked}
+
+# ── 로그인 (POST /api/login) ──
+def login_fields(data: dict) -> tuple:
+    username = (data.get("username") or "").strip()
+    password = data.get("password") or ""
+    if not username or not password:
+        raise BadRequest("아이디와 비밀번호를 입력해 주세요.")
+    return username, password
+
+def rehash_update(user: dict, old_hash: bytes, new_hash: bytes) -> tuple:
+    """재해시 저장 (update_one 인자). 그 사이 비밀번호가 바뀌었으면 덮어쓰지 않음."""
+    return {"_id": user["_id"], "passwordHash": old_hash}, {"$set": {"passwordHash": new_hash}}
+
+# ── 검색 (GET /api/search) ──
+MAX_SEARCH_RESULTS = 1000  # 점수순 skip 페이지네이션이므로 깊이 제한
+
+class Search:
+    """
+    q (필수), board (선택), scope: posts (기본, 제목/본문) | comments, page, per_page.
+    결과 projection: 게시글은 목록 카드(POST_SUMMARY_FIELDS), 댓글은 SEARCH_COMMENT_FIELDS → bigram 필드를 읽지 않음
+    """
+
+    def __init__(self, args):
+        self.scope = args.get("scope", "posts")
+        self.page = max(int(args.get("page", 1)), 1)
+        self.per_page = int_arg(args, "per_page", 10, 50)
+        self.cond = search.text_query((args.get("q") or "").strip())
+        if self.cond is None:
+            raise BadRequest("검색어를 입력해 주세요.")
+        if self.scope not in ("posts", "comments"):
+            raise BadRequest("scope 는 posts 또는 comments 입니다.")
+        if self.page * self.per_page > MAX_SEARCH_RESULTS:
+            raise BadRequest(f"검색 결과는 {MAX_SEARCH_RESULTS}건까지만 볼 수 있습니다.")
+        if args.get("board"):
+            self.cond["board"] = args["board"]
+
+    @property
+    def posts(self) -> bool:
+        return self.scope == "posts"
+
+    def find(self) -> Find:
+        fields = POST_SUMMARY_FIELDS if self.posts else SEARCH_COMMENT_FIELDS
+        return Find(self.cond, {**fields, **search.SCORE}, search.BY_SCORE,
+                    skip=(self.page - 1) * self.per_page, limit=self.per_page + 1)
+
+    def result_ids(self, docs: list) -> list:
+        """liked 를 확인할 게시글 _id (댓글 검색이면 없음)"""
+        return [d["_id"] for d in docs[:self.per_page]] if self.posts else []
+
+    def data(self, docs: list, liked_ids: set) -> dict:
+        has_next = len(docs) > self.per_page
+        docs = docs[:self.per_page]
+        if self.posts:
+            items = [{**post_summary_to_json(d, d["_id"] in liked_ids), "score": d["score"]} for d in docs]
+        else:
+            items = [{**comment_doc_to_json(d), "post_id": str(d["post_id"]),
+                      "board": d.get("board"), "score": d["score"]} for d in docs]
+        return {"items": items, "scope": self.scope, "page": self.page, "per_page": self.per_page,
+                "has_next": has_next}
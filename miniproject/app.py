@@ -1,73 +1,94 @@
 import os
+import time
 import atexit
 from functools import wraps
-from datetime import datetime, timezone
+from collections import Counter
+from datetime import datetime
 
-import bcrypt
+import click
 from dotenv import load_dotenv
 from bson import ObjectId
-from pymongo import MongoClient, errors
+from pymongo import UpdateOne, errors
 from flask import (
-    Flask, render_template, request, jsonify, session,
-    redirect, url_for, send_from_directory
+    Blueprint, Flask, Request, Response, render_template, request, jsonify, session,
+    redirect, url_for, send_from_directory, stream_with_context, g
 )
-from werkzeug.utils import secure_filename
+
+import api
+import cache
+import counters
+import database
+import events
+import hashing
+import hot
+import images
+import jobs
+import metrics
+import migrations
+import responses
+import search
+import transfer
+import uploads
+import versions
 
 load_dotenv()
 
-app = Flask(__name__)
-app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev_secret")
-# 끝 슬래시 혼동 방지 (/comments vs /comments/)
-app.url_map.strict_slashes = False
-
-# ──────────────────────────────────────────────────────────────────────────
-# MongoDB 연결
-# ──────────────────────────────────────────────────────────────────────────
-MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27018/miniproject")
-try:
-    mongo = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-    mongo.admin.command("ping")
-    print("MongoDB 연결 성공")
-except errors.ServerSelectionTimeoutError:
-    print("MongoDB 연결 실패 - 서버를 찾을 수 없습니다")
-    raise
-except Exception as e:
-    print(f"MongoDB 연결 오류: {e}")
-    raise
-
-db = mongo.get_default_database()
-users = db["users"]
-posts = db["posts"]
-comments = db["comments"]
-
-# 인덱스 생성
-try:
-    users.create_index("username", unique=True)
-    posts.create_index([("board", 1), ("created_at", -1)])
-    posts.create_index([("author", 1), ("created_at", -1)])
-    comments.create_index([("post_id", 1), ("created_at", -1)])
-    print("인덱스 생성 완료")
-except errors.PyMongoError as e:
-    print(f"인덱스 생성 중 오류: {e}")
+# 라우트는 전부 이 블루프린트에 달고, create_app() 이 앱에 등록한다.
+# cli_group=None: 관리 명령을 `flask <command>` 그대로 유지
+bp = Blueprint("main", __name__, cli_group=None)
+
+# ──────────────────────────────────────────────────────────────────────────
+# MongoDB 연결 (database.py)
+# ──────────────────────────────────────────────────────────────────────────
+# 클라이언트는 프로세스마다 처음 쓰는 순간에 만든다 → import/fork 시점에는 연결하지 않음.
+# 인덱스는 `flask migrate` (migrations.py) 로 따로 적용한다.
+db = database.LazyDatabase()
+users = db.collection("users")
+posts = db.collection("posts")
+comments = db.collection("comments")
+likes = db.collection("likes")  # (post_id, username) 한 건 = 좋아요 1개
+
+# 요청/DB 지표 (/api/metrics). 느린 명령 기준은 SLOW_QUERY_MS
+app_metrics = metrics.Registry()
+metrics.describe_http(app_metrics)
+mongo_listener = metrics.MongoCommandListener(app_metrics)
+
+# 비밀번호 해시 풀 (BCRYPT_ROUNDS, HASH_WORKERS, HASH_QUEUE_LIMIT, HASH_TIMEOUT)
+hash_pool = hashing.from_env()
+
+# 게시글 상세/목록 읽기 캐시 (CACHE_BACKEND, CACHE_TTL, CACHE_MAX_ENTRIES)
+post_cache = cache.from_env()
+
+# 게시글 실시간 이벤트 (SSE). EVENTS_SOURCE=changestream 이면 change stream 이 publish
+event_broker = events.Broker()
+# SSE 연결은 연결이 끝날 때까지 요청 스레드를 하나씩 잡는다. 다른 API 가 굶지 않도록
+# 워커 스레드의 1/4 만 쓴다: gunicorn --threads N 으로 띄우면 WORKER_THREADS=N 도 같이 줘야 한다
+# (예: --threads 16 → 워커당 SSE 4개). 넘친 연결은 204 + Retry-After 로 돌려보내고 클라이언트가
+# 나중에 다시 시도한다. 많은 연결이 필요하면 스레드를 잡지 않는 asgi.py 로 서비스한다.
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "16"))
+MAX_EVENT_STREAMS = int(os.getenv("MAX_EVENT_STREAMS", str(max(1, WORKER_THREADS // 4))))
+EVENT_HEARTBEAT = 15      # 초: 프록시가 유휴 연결을 끊지 않도록 주석 줄 전송
+EVENT_STREAM_MAX = 300    # 초: 이후 끊고 EventSource 자동 재접속 (스레드 반환)
 
 # ──────────────────────────────────────────────────────────────────────────
 # 업로드/보안 설정
 # ──────────────────────────────────────────────────────────────────────────
-UPLOAD_FOLDER = os.path.join(app.instance_path, "uploads")
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", os.path.join(APP_DIR, "instance", "uploads"))
 
 ALLOWED_EXTS = {"jpg", "jpeg", "png", "gif", "webp"}
 MAX_FILE_MB = 5  # 파일당 5MB 제한
-
-app.config.update(
-    SESSION_COOKIE_HTTPONLY=True,
-    SESSION_COOKIE_SAMESITE="Lax",
-    SESSION_COOKIE_SECURE=False,  # HTTPS 환경이면 True 권장
-)
+MAX_FILES = 10   # 게시글당 이미지 수 제한
 
 def allowed_file(filename: str) -> bool:
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTS
 
+class UploadRequest(Request):
+    """multipart 파일 부분을 받는 동안 파일당 MAX_FILE_MB 를 센다 → 넘으면 본문을 끝까지 받기 전에 중단"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return uploads.LimitedSpool(MAX_FILE_MB * 1024 * 1024)
+
 # ──────────────────────────────────────────────────────────────────────────
 # 유틸
 # ──────────────────────────────────────────────────────────────────────────
@@ -82,25 +103,79 @@ def login_required_json(f):
         return f(*args, **kwargs)
     return wrapper
 
-def to_iso(dt: datetime) -> str:
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.isoformat()
-
-def post_doc_to_json(doc: dict) -> dict:
-    return {
-        "id": str(doc["_id"]),
-        "title": doc["title"],
-        "content": doc["content"],
-        "board": doc["board"],
-        "author": doc["author"],
-        "created_at": to_iso(doc["created_at"]),
-        # 프런트에서 그대로 <img src="{url}"> 로 사용 가능한 절대경로 저장
-        "images": doc.get("images", []),  # e.g. ["/uploads/660a..._image.png"]
-        # 좋아요 정보(권장)
-        "likes_count": doc.get("likes_count", 0),
-        "liked_by": doc.get("liked_by", []),
-    }
+def busy_response():
+    # 해시 풀 포화 시: 기다리게 하지 않고 즉시 거절
+    resp = jsonify(success=False, msg="요청이 많습니다. 잠시 후 다시 시도해 주세요.")
+    resp.headers["Retry-After"] = "1"
+    return resp, 503
+
+def streams_full_response():
+    # SSE 상한 초과: 503 이면 EventSource 가 에러로 끝나므로 204(재접속 안 함) + 다시 시도할 간격
+    resp = Response(status=204)
+    resp.headers["Retry-After"] = str(events.FULL_RETRY_AFTER)
+    return resp
+
+def viewer_name():
+    return session["user"]["username"] if is_logged_in() else None
+
+def bad_request(e: api.BadRequest):
+    return jsonify(success=False, msg=str(e)), 400
+
+def keyset_page(coll, query: dict, per_page: int, after=None, before=None, projection=None):
+    """커서 기준 한 페이지 조회 → (docs, has_next, has_prev) (api.keyset_find/keyset_result)"""
+    docs = list(api.keyset_find(query, per_page, after, before, projection).cursor(coll))
+    return api.keyset_result(docs, per_page, after, before)
+
+def viewer_liked_ids(post_ids: list) -> set:
+    """현재 로그인 사용자가 좋아요한 게시글 _id 집합 (페이지당 쿼리 1회)"""
+    if not is_logged_in() or not post_ids:
+        return set()
+    return {d["post_id"] for d in api.liked_find(post_ids, viewer_name()).cursor(likes)}
+
+def variant_urls(filename: str, names: dict) -> dict:
+    return {"src": f"/uploads/{filename}", **{k: f"/uploads/{v}" for k, v in names.items()}}
+
+def schedule_image_variants(post_id, board, filename: str) -> None:
+    """원본 저장 후 썸네일/WebP 생성을 워커 프로세스에 넘기고, 완료되면 문서에 기록"""
+    def on_done(names):
+        if not uploads.set_variants(db, filename, names):
+            # 생성 중에 글이 지워져 원본 참조가 없어짐 → release_upload 가 지울 기록이 없으니 여기서 지운다
+            for name in names.values():
+                uploads.remove_quietly(os.path.join(UPLOAD_FOLDER, name))
+            return
+        posts.update_one({"_id": post_id}, {"$push": {"image_variants": variant_urls(filename, names)}})
+        versions.bump_post(db, post_id, board)
+
+    images.schedule(os.path.join(UPLOAD_FOLDER, filename), on_done)
+
+def release_upload(url_path: str, post_id) -> None:
+    """게시글이 이미지 참조를 놓을 때: 마지막 참조였다면 원본과 변형본 파일 삭제"""
+    if not url_path.startswith("/uploads/"):
+        return
+    filename = url_path.split("/uploads/", 1)[1]
+    if uploads.release(db, filename, post_id):
+        uploads.discard(db, UPLOAD_FOLDER, filename, images.variant_names(filename).values())
+
+def release_stored(stored: list, post_id) -> None:
+    """글 생성이 실패했을 때 uploads.store() 로 잡은 참조를 모두 놓는다"""
+    for entry in stored:
+        release_upload(f"/uploads/{entry['_id']}", post_id)
+
+def remove_post(doc: dict) -> bool:
+    """게시글 문서 삭제 + 카운터/캐시 갱신 + 연쇄 정리 작업(post.cascade) 등록"""
+    res = posts.delete_one({"_id": doc["_id"]})
+    if not res.deleted_count:
+        return False
+    counters.incr(db, counters.POSTS, counters.board_key(doc["board"]), by=-1)
+    versions.bump_post(db, doc["_id"], doc["board"])
+    hot.remove(db, doc["_id"])
+    jobs.enqueue(db, "post.cascade", {"post_id": doc["_id"], "images": doc.get("images", [])})
+    return True
+
+def publish_post_event(post_id, event_type: str, data: dict) -> None:
+    # change stream 모드에서는 DB 변경이 곧 이벤트 → 여기서 또 보내면 중복
+    if events.SOURCE == "local":
+        event_broker.publish(str(post_id), event_type, data)
 
 def is_author(doc) -> bool:
     return is_logged_in() and session["user"]["username"] == doc["author"]
@@ -108,88 +183,113 @@ def is_author(doc) -> bool:
 # ──────────────────────────────────────────────────────────────────────────
 # 페이지 라우트
 # ──────────────────────────────────────────────────────────────────────────
-@app.get("/")
+@bp.get("/")
 def main_page():
     user = session.get("user")
     return render_template("main.html", user=user)
 
-@app.get("/login")
+@bp.get("/login")
 def login_page():
     if is_logged_in():
-        return redirect(url_for("main_page"))
+        return redirect(url_for(".main_page"))
     return render_template("login.html")
 
-@app.get("/register")
+@bp.get("/register")
 def register_page():
     if is_logged_in():
-        return redirect(url_for("main_page"))
+        return redirect(url_for(".main_page"))
     return render_template("register.html")
 
 # 글쓰기 페이지
-@app.get("/write", endpoint="write_page")
+@bp.get("/write", endpoint="write_page")
 def write_page():
     return render_template("PostWrite.html")
 
 # 글 상세 페이지(템플릿 고정; 추후 /post/<id> 로 변경 가능)
-@app.get("/post/view", endpoint="post_view_page")
+@bp.get("/post/view", endpoint="post_view_page")
 def post_view_page():
     user = session.get("user")
     # 템플릿은 비어 있는 상태로 렌더 → JS(PostView.js)가 API로 채움
     return render_template("PostView.html", post=None, comments=[], user=user)
 
 # 업로드 파일 제공
-@app.get("/uploads/<path:filename>")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+@bp.get("/uploads/<path:filename>")
 def uploaded_file(filename):
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    if not uploads.is_content_addressed(filename):
+        return send_from_directory(UPLOAD_FOLDER, filename)  # 예전 방식 파일명
+    # 이름 = 내용 해시 → 바뀌지 않으므로 영구 캐시, ETag 도 해시(강한 검증자), Range 지원
+    resp = send_from_directory(
+        UPLOAD_FOLDER, filename,
+        etag=os.path.splitext(filename)[0], conditional=True, max_age=IMMUTABLE_MAX_AGE,
+    )
+    resp.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return resp
 
 # ──────────────────────────────────────────────────────────────────────────
 # API: 댓글
 # ──────────────────────────────────────────────────────────────────────────
-@app.get("/api/posts/<id>/comments")  # 댓글 목록 조회
+@bp.get("/api/posts/<id>/comments")  # 댓글 목록 조회
 def list_comments_api(id):
+    """
+    쿼리:
+      - per_page (기본 20, 최대 100)
+      - after / before: 커서 (응답의 next_cursor / prev_cursor 값)
+      - stream: true 면 전체 댓글을 NDJSON(한 줄에 댓글 하나)으로 흘려보냄
+    ETag 는 게시글 버전(댓글 작성 시 증가) → 변화 없으면 댓글을 읽지 않고 304
+    """
     try:
         oid = ObjectId(id)
-        cur = comments.find({"post_id": oid}).sort([("created_at", -1)])
-        items = []
-        for c in cur:
-            items.append({
-                "id": str(c["_id"]),
-                "author": c.get("author", "익명"),
-                "content": c.get("content", ""),
-                "created_at": to_iso(c["created_at"]),
-            })
-        return jsonify(success=True, data={"items": items})
+        version, modified = versions.get_post(db, oid)
+        etag = api.comments_etag(version)
+        unchanged = responses.not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        if api.arg_flag(request.args, "stream", False):
+            def generate():
+                cur = api.comment_stream_find(oid).cursor(comments)
+                try:
+                    for c in cur:
+                        yield api.ndjson_line(c)
+                finally:
+                    cur.close()
+            resp = Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+            return responses.set_validators(resp, etag, modified)
+
+        page = api.CommentPage(oid, request.args)
+        docs = list(page.find().cursor(comments))
+        return responses.set_validators(jsonify(success=True, data=page.data(docs)), etag, modified)
+    except api.BadRequest as e:
+        return bad_request(e)
     except Exception as e:
         print("comments list error:", e)
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
 
-@app.post("/api/posts/<id>/comments")  # 댓글 작성
+@bp.post("/api/posts/<id>/comments")  # 댓글 작성
 @login_required_json
 def create_comment_api(id):
     try:
-        data = request.get_json(silent=True) or {}
-        content = (data.get("content") or "").strip()
-        if not content:
-            return jsonify(success=False, msg="댓글 내용을 입력해 주세요."), 400
-
+        content = api.comment_content(request.get_json(silent=True) or {})
         oid = ObjectId(id)
-        post = posts.find_one({"_id": oid})
+        post = posts.find_one({"_id": oid}, api.COMMENT_POST_FIELDS)
         if not post:
             return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
 
-        doc = {
-            "post_id": oid,
-            "author": session["user"]["username"],
-            "content": content,
-            "created_at": datetime.utcnow(),
-        }
-        res = comments.insert_one(doc)
-        return jsonify(success=True, data={
-            "id": str(res.inserted_id),
-            "author": doc["author"],
-            "content": doc["content"],
-            "created_at": to_iso(doc["created_at"]),
-        }), 201
+        doc = api.new_comment(post, session["user"]["username"], content)
+        comments.insert_one(doc)
+        if not posts.update_one(**api.count_comment(oid)).matched_count:
+            comments.delete_one({"_id": doc["_id"]})  # 그 사이 글이 지워짐
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+        # 댓글 수만 바뀌므로 게시판 목록 버전은 그대로 (목록의 수는 versions.COUNT_WINDOW 만큼 늦게 반영)
+        versions.bump(db, versions.post_key(oid))
+        hot.record(db, oid, post["board"], hot.COMMENT_WEIGHT)
+        data = api.comment_doc_to_json(doc)
+        publish_post_event(oid, "comment", data)
+        return jsonify(success=True, data=data), 201
+    except api.BadRequest as e:
+        return bad_request(e)
     except Exception as e:
         print("comment create error:", e)
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
@@ -197,28 +297,34 @@ def create_comment_api(id):
 # ──────────────────────────────────────────────────────────────────────────
 # API: 좋아요
 # ──────────────────────────────────────────────────────────────────────────
-@app.post("/api/posts/<id>/like")
+@bp.post("/api/posts/<id>/like")
 @login_required_json
 def like_post_api(id):
     try:
         username = session["user"]["username"]
         oid = ObjectId(id)
-        doc = posts.find_one({"_id": oid})
+
+        # 토글: 삽입 성공 → 좋아요, 유니크 인덱스 충돌 → 이미 좋아요 상태이므로 취소
+        try:
+            likes.insert_one(api.new_like(oid, username))
+            liked, delta = True, 1
+        except errors.DuplicateKeyError:
+            res = likes.delete_one({"post_id": oid, "username": username})
+            liked, delta = False, -res.deleted_count
+
+        doc = posts.find_one_and_update(**api.count_like(oid, delta))
         if not doc:
+            if liked:
+                likes.delete_one({"post_id": oid, "username": username})
             return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
 
-        liked_by = set(doc.get("liked_by", []))
-        if username in liked_by:
-            liked_by.remove(username)
-        else:
-            liked_by.add(username)
-
-        likes_count = len(liked_by)
-        posts.update_one(
-            {"_id": oid},
-            {"$set": {"liked_by": list(liked_by), "likes_count": likes_count}}
-        )
-        return jsonify(success=True, data={"likes_count": likes_count, "liked": username in liked_by})
+        # 게시글 + 이 사용자의 좋아요 버전 (목록의 liked 는 바로, likes_count 는 COUNT_WINDOW 안에 반영)
+        versions.bump(db, versions.post_key(oid), versions.user_key(username))
+        data = api.like_data(doc, liked)
+        if delta:
+            hot.record(db, oid, doc["board"], hot.LIKE_WEIGHT * delta)
+            publish_post_event(oid, "like", {"likes_count": data["likes_count"]})
+        return jsonify(success=True, data=data)
     except Exception as e:
         print("like error:", e)
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
@@ -226,7 +332,7 @@ def like_post_api(id):
 # ──────────────────────────────────────────────────────────────────────────
 # API: 회원가입 / 로그인 / 로그아웃 / 계정 삭제
 # ──────────────────────────────────────────────────────────────────────────
-@app.post("/api/register")
+@bp.post("/api/register")
 def register_api():
     try:
         data = request.get_json(silent=True) or {}
@@ -243,11 +349,14 @@ def register_api():
         if password != confirm:
             return jsonify(success=False, msg="비밀번호가 일치하지 않습니다."), 400
 
-        pw_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(12))
+        pw_hash = hash_pool.hash(password)
         users.insert_one({"username": username, "passwordHash": pw_hash})
+        counters.incr(db, counters.USERS)
         return jsonify(success=True, msg="회원가입이 완료되었습니다.")
     except errors.DuplicateKeyError:
         return jsonify(success=False, msg="이미 존재하는 아이디입니다."), 409
+    except hashing.PoolBusy:
+        return busy_response()
     except errors.PyMongoError as e:
         print(f"회원가입 DB 오류: {e}")
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
@@ -255,25 +364,29 @@ def register_api():
         print(f"회원가입 오류: {e}")
         return jsonify(success=False, msg="처리 중 오류가 발생했습니다."), 500
 
-@app.post("/api/login")
+@bp.post("/api/login")
 def login_api():
     try:
-        data = request.get_json(silent=True) or {}
-        username = (data.get("username") or "").strip()
-        password = data.get("password") or ""
-
-        if not username or not password:
-            return jsonify(success=False, msg="아이디와 비밀번호를 입력해 주세요."), 400
-
+        username, password = api.login_fields(request.get_json(silent=True) or {})
         user = users.find_one({"username": username})
         if not user:
             return jsonify(success=False, msg="존재하지 않는 아이디입니다."), 401
 
-        if not bcrypt.checkpw(password.encode("utf-8"), user["passwordHash"]):
+        old_hash = user["passwordHash"]
+        if not hash_pool.verify(password, old_hash):
             return jsonify(success=False, msg="비밀번호가 일치하지 않습니다."), 401
 
+        # 해시 비용(BCRYPT_ROUNDS)이 바뀌었으면 응답과 별개로 재해시해서 저장
+        if hash_pool.needs_rehash(old_hash):
+            hash_pool.rehash_later(password, lambda new_hash: users.update_one(
+                *api.rehash_update(user, old_hash, new_hash)))
+
         session["user"] = {"username": username}
         return jsonify(success=True, msg="로그인 성공")
+    except api.BadRequest as e:
+        return bad_request(e)
+    except hashing.PoolBusy:
+        return busy_response()
     except errors.PyMongoError as e:
         print(f"로그인 DB 오류: {e}")
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
@@ -281,29 +394,33 @@ def login_api():
         print(f"로그인 오류: {e}")
         return jsonify(success=False, msg="처리 중 오류가 발생했습니다."), 500
 
-@app.get("/logout")
+@bp.get("/logout")
 def logout():
     session.clear()
-    return redirect(url_for("main_page"))
+    return redirect(url_for(".main_page"))
 
-@app.post("/account/delete")
+@bp.post("/account/delete")
 def delete_account():
     if not is_logged_in():
-        return redirect(url_for("login_page"))
+        return redirect(url_for(".login_page"))
     try:
         username = session["user"]["username"]
-        users.delete_one({"username": username})
-        # (선택) 본인 게시글/이미지 삭제 로직은 필요 시 추가
+        res = users.delete_one({"username": username})
+        if res.deleted_count:
+            counters.incr(db, counters.USERS, by=-1)
+            # 게시글/댓글/좋아요는 작업 큐에서 배치 단위로 정리.
+            # 같은 아이디로 바로 다시 가입할 수 있으므로 탈퇴 시각 이전 것만 지운다
+            jobs.enqueue(db, "user.purge", {"username": username, "deleted_at": datetime.utcnow()})
     except errors.PyMongoError as e:
         print(f"계정 삭제 DB 오류: {e}")
         return "삭제 중 오류가 발생했습니다.", 500
     session.clear()
-    return redirect(url_for("main_page"))
+    return redirect(url_for(".main_page"))
 
 # ──────────────────────────────────────────────────────────────────────────
 # API: 게시글
 # ──────────────────────────────────────────────────────────────────────────
-@app.post("/api/posts")
+@bp.post("/api/posts")
 @login_required_json
 def create_post_api():
     """
@@ -320,104 +437,207 @@ def create_post_api():
         if not title or not content or not board:
             return jsonify(success=False, msg="필수 항목이 누락되었습니다."), 400
 
-        # 문서 우선 생성
-        doc = {
-            "title": title,
-            "content": content,
-            "board": board,
-            "author": author,
-            "created_at": datetime.utcnow(),
-            "images": [],
-            "likes_count": 0,   # 초기화
-            "liked_by": [],     # 초기화
-        }
-        result = posts.insert_one(doc)
-        post_id = result.inserted_id
-
-        # 파일 저장
-        files = request.files.getlist("images")
-        saved_urls = []
-        for file in files:
-            if not file or file.filename == "":
-                continue
-            if not allowed_file(file.filename):
-                return jsonify(success=False, msg="허용되지 않은 파일 형식입니다."), 400
-
-            # 용량 체크
-            file.seek(0, os.SEEK_END)
-            size_mb = file.tell() / (1024 * 1024)
-            file.seek(0)
-            if size_mb > MAX_FILE_MB:
-                return jsonify(success=False, msg=f"파일 용량은 {MAX_FILE_MB}MB 이하여야 합니다."), 400
-
-            safe_name = secure_filename(file.filename)
-            save_name = f"{post_id}_{safe_name}"
-            save_path = os.path.join(UPLOAD_FOLDER, save_name)
-            file.save(save_path)
-
-            # 프런트에서 바로 사용 가능한 URL
-            url_path = f"/uploads/{save_name}"
-            saved_urls.append(url_path)
-
-        if saved_urls:
-            posts.update_one({"_id": post_id}, {"$set": {"images": saved_urls}})
-
-        created = posts.find_one({"_id": post_id})
-        return jsonify(success=True, data=post_doc_to_json(created)), 201
-
+        files = [f for f in request.files.getlist("images") if f and f.filename]
+        if len(files) > MAX_FILES:
+            return jsonify(success=False, msg=f"이미지는 최대 {MAX_FILES}개까지 첨부할 수 있습니다."), 400
+        if not all(allowed_file(f.filename) for f in files):
+            return jsonify(success=False, msg="허용되지 않은 파일 형식입니다."), 400
+
+        # 파일을 먼저 저장(청크 단위 + 용량 제한 + 내용 해시)하고, 모두 성공하면 문서 생성.
+        # 도중에 실패하면(용량 초과, DB 오류 등) 이미 잡은 참조를 놓아 파일이 남지 않게 한다
+        post_id = ObjectId()
+        stored = []  # uploads 문서 (이미 있던 파일이면 변형본 정보도 포함)
+        try:
+            for file in files:
+                ext = file.filename.rsplit(".", 1)[1].lower()
+                stored.append(uploads.store(db, file, UPLOAD_FOLDER, ext, MAX_FILE_MB * 1024 * 1024, post_id))
+
+            doc = {
+                "_id": post_id,
+                "title": title,
+                "content": content,
+                "board": board,
+                "author": author,
+                "created_at": datetime.utcnow(),
+                # 프런트에서 바로 사용 가능한 URL
+                "images": [f"/uploads/{entry['_id']}" for entry in stored],
+                # 썸네일/WebP: 이미 만들어 둔 파일이면 바로, 아니면 백그라운드에서 채움
+                "image_variants": [variant_urls(e["_id"], e["variants"]) for e in stored if e.get("variants")],
+                "likes_count": 0,   # 초기화 (좋아요 자체는 likes 컬렉션)
+                "comments_count": 0,
+                search.EXCERPT_FIELD: search.excerpt(content),
+                **search.post_fields(title, content),
+            }
+            posts.insert_one(doc)
+        except uploads.FileTooLarge:
+            release_stored(stored, post_id)
+            return jsonify(success=False, msg=f"파일 용량은 {MAX_FILE_MB}MB 이하여야 합니다."), 400
+        except Exception:
+            release_stored(stored, post_id)
+            raise
+
+        counters.incr(db, counters.POSTS, counters.board_key(board))
+        versions.bump_post(db, post_id, board)  # 글 버전도 올려야 Last-Modified 가 작성 시각
+        hot.record(db, post_id, board, hot.POST_WEIGHT)
+
+        for entry in stored:
+            if not entry.get("variants"):
+                schedule_image_variants(post_id, board, entry["_id"])
+
+        return jsonify(success=True, data=api.post_doc_to_json(doc)), 201
+
+    except uploads.FileTooLarge:  # multipart 파싱 중(request.form 첫 접근) UploadRequest 가 끊은 경우
+        return jsonify(success=False, msg=f"파일 용량은 {MAX_FILE_MB}MB 이하여야 합니다."), 400
     except Exception as e:
         print(f"게시글 생성 오류: {e}")
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
 
-@app.get("/api/posts")
+@bp.get("/api/posts")
 def list_posts_api():
     """
     쿼리:
       - board: Cafeteria | Outside | Delivery (선택)
-      - page, per_page
+      - per_page
+      - after / before: 커서 모드 (응답의 next_cursor / prev_cursor 값)
+      - page: 커서가 없을 때만 사용 (skip 기반, 하위 호환용)
+      - include_total: false 면 전체 개수 집계 생략
+    ETag 는 게시판 버전 + 사용자 → 변화 없으면 목록을 읽지 않고 304
     """
     try:
-        board = request.args.get("board")
-        page = max(int(request.args.get("page", 1)), 1)
-        per_page = min(max(int(request.args.get("per_page", 10)), 1), 50)
-
-        query = {}
-        if board:
-            query["board"] = board
-
-        cursor = (
-            posts.find(query)
-                 .sort([("_id", -1)])  # 최신순
-                 .skip((page - 1) * per_page)
-                 .limit(per_page)
-        )
-        items = [post_doc_to_json(doc) for doc in cursor]
-        total = posts.count_documents(query)
-        pages = (total + per_page - 1) // per_page
-
-        return jsonify(success=True, data={
-            "items": items,
-            "page": page,
-            "per_page": per_page,
-            "total": total,
-            "pages": pages
-        })
+        listing = api.PostList(request.args)
+        shared, version, modified = versions.get_list(db, listing.board, viewer_name())
+        etag = listing.etag(version, viewer_name())
+        unchanged = responses.not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        # 목록 자체는 캐시(사용자 무관), liked 여부만 요청마다 계산.
+        # 키에 게시판 버전 + 시간 창이 들어가므로 글 작성/삭제는 바로, 카드의 수는 창이 바뀔 때 새로 읽는다
+        cached = post_cache.get_or_load(listing.cache_key(shared),
+                                        lambda: listing.shape(list(listing.find().cursor(posts))))
+        liked_ids = viewer_liked_ids(api.item_ids(cached["items"]))
+        total = counters.get(db, listing.total_key()) if listing.include_total else None
+        data = listing.data(cached, liked_ids, total)
+        return responses.set_validators(jsonify(success=True, data=data), etag, modified)
+    except api.BadRequest as e:
+        return bad_request(e)
     except Exception as e:
         print(f"게시글 목록 오류: {e}")
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
 
-@app.get("/api/posts/<id>")
+@bp.get("/api/posts/hot")
+def hot_posts_api():
+    """
+    인기글: 좋아요/댓글에 시간 감쇠를 건 점수 순 (hot.py)
+    쿼리: board (없으면 전체), limit (기본 10, 최대 50)
+    감쇠는 모든 글에 똑같이 적용돼 순서가 바뀌지 않으므로 목록과 같은 버전(게시판 + 시간 창)으로
+    캐시/ETag 를 건다 → 좋아요/댓글로 인한 순위 변화는 versions.COUNT_WINDOW 안에 반영된다.
+    """
+    try:
+        ranking = api.HotList(request.args)
+        shared, version, modified = versions.get_list(db, ranking.board, viewer_name())
+        etag = ranking.etag(version, viewer_name())
+        unchanged = responses.not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        def load_hot():
+            ranked = list(ranking.find().cursor(db[hot.COLLECTION]))
+            return ranking.shape(ranked, list(ranking.posts_find(ranked).cursor(posts)))
+
+        cached = post_cache.get_or_load(ranking.cache_key(shared), load_hot)
+        liked_ids = viewer_liked_ids(api.item_ids(cached["items"]))
+        return responses.set_validators(jsonify(success=True, data=ranking.data(cached, liked_ids)),
+                                        etag, modified)
+    except api.BadRequest as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"인기글 조회 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.get("/api/posts/<id>")
 def get_post_api(id):
     try:
-        doc = posts.find_one({"_id": ObjectId(id)})
-        if not doc:
+        oid = ObjectId(id)
+        version, modified = versions.get_post(db, oid)
+        etag = api.post_etag(version, viewer_name())
+        unchanged = responses.not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        def load_post():
+            doc = posts.find_one({"_id": oid}, api.POST_DETAIL_FIELDS)
+            return api.post_doc_to_json(doc) if doc else None
+
+        data = post_cache.get_or_load(cache.post_key(oid, version), load_post)
+        if not data:
             return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
-        return jsonify(success=True, data=post_doc_to_json(doc))
+        liked = bool(viewer_liked_ids([oid]))
+        return responses.set_validators(jsonify(success=True, data={**data, "liked": liked}), etag, modified)
     except Exception as e:
         print(f"게시글 조회 오류: {e}")
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
 
-@app.delete("/api/posts/<id>")
+@bp.get("/api/posts/<id>/view")
+def post_view_api(id):
+    """
+    상세 페이지 한 번에: 게시글 + 댓글 첫 페이지 + 댓글 수 + 현재 사용자 상태.
+    $lookup 집계 한 번(DB 왕복 1회)으로 처리한다.
+    쿼리: per_page (댓글, 기본 20, 최대 100)
+    """
+    try:
+        oid = ObjectId(id)
+        per_page = api.int_arg(request.args, "per_page", 20, 100)
+        username = viewer_name()
+
+        doc = next(posts.aggregate(api.post_view_pipeline(oid, per_page, username)), None)
+        if not doc:
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+        return jsonify(success=True, data=api.post_view_to_json(doc, per_page, username))
+    except Exception as e:
+        print(f"게시글 보기 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.get("/api/posts/<id>/events")
+def post_events_api(id):
+    """
+    SSE: 이 게시글의 새 댓글(event: comment)과 좋아요 수 변화(event: like)를 푸시.
+    연결 직후 event: snapshot 으로 현재 likes_count / comments_count 를 보내므로
+    재접속 사이에 놓친 변화는 클라이언트가 스냅샷으로 맞춘다.
+    """
+    try:
+        oid = ObjectId(id)
+        post = posts.find_one({"_id": oid}, {"likes_count": 1, "comments_count": 1})
+        if not post:
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+        if events.SOURCE == "changestream":
+            events.ensure_change_stream(db, event_broker, api.comment_doc_to_json)
+        try:
+            sub = event_broker.subscribe(str(oid), limit=MAX_EVENT_STREAMS)
+        except events.Full:
+            return streams_full_response()
+        snapshot = {"likes_count": post.get("likes_count", 0), "comments_count": post.get("comments_count", 0)}
+
+        def generate():
+            try:
+                yield "retry: 3000\n\n"
+                yield events.format_sse("snapshot", snapshot)
+                deadline = time.monotonic() + EVENT_STREAM_MAX
+                while time.monotonic() < deadline:
+                    event = sub.get(timeout=EVENT_HEARTBEAT)
+                    yield events.format_sse(*event) if event else ": ping\n\n"
+            finally:
+                sub.close()
+
+        resp = Response(stream_with_context(generate()), mimetype="text/event-stream")
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"  # nginx 버퍼링 끔
+        return resp
+    except Exception as e:
+        print(f"이벤트 스트림 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.delete("/api/posts/<id>")
 @login_required_json
 def delete_post_api(id):
     try:
@@ -427,79 +647,330 @@ def delete_post_api(id):
         if not is_author(doc):
             return jsonify(success=False, msg="권한이 없습니다."), 403
 
-        # 이미지 파일 삭제
-        for url_path in doc.get("images", []):
-            if url_path.startswith("/uploads/"):
-                filename = url_path.split("/uploads/", 1)[1]
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-                if os.path.exists(file_path):
-                    try:
-                        os.remove(file_path)
-                    except Exception:
-                        pass
-
-        posts.delete_one({"_id": doc["_id"]})
+        # 문서만 지우고 바로 응답, 댓글/좋아요/이미지는 작업 큐에서 정리
+        remove_post(doc)
         return jsonify(success=True, msg="삭제되었습니다.")
     except Exception as e:
         print(f"게시글 삭제 오류: {e}")
         return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
 
-@app.get("/Cafeteria")
+@bp.get("/Cafeteria")
 def cafeteria_page():
     user = session.get("user")
     return render_template("Cafateria.html", user=user, board="Cafeteria")
 
-@app.get("/Outside")
+@bp.get("/Outside")
 def outside_page():
     user = session.get("user")
     return render_template("Outside.html", user=user, board="Outside")
 
-@app.get("/Delivery")
+@bp.get("/Delivery")
 def delivery_page():
     user = session.get("user")
     return render_template("Delivery.html", user=user, board="Delivery")
 # ──────────────────────────────────────────────────────────────────────────
+# API: 검색
+# ──────────────────────────────────────────────────────────────────────────
+@bp.get("/api/search")
+def search_api():
+    """
+    쿼리:
+      - q: 검색어 (필수)
+      - board: 게시판 한정 (선택)
+      - scope: posts (기본, 제목/본문) | comments
+      - page, per_page
+    """
+    try:
+        query = api.Search(request.args)
+        docs = list(query.find().cursor(posts if query.posts else comments))
+        liked_ids = viewer_liked_ids(query.result_ids(docs))
+        return jsonify(success=True, data=query.data(docs, liked_ids))
+    except api.BadRequest as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"검색 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# 백그라운드 작업 (jobs.py): 연쇄 삭제
+# ──────────────────────────────────────────────────────────────────────────
+# 웹 프로세스마다 띄울 워커 스레드 수. 0 이면 띄우지 않음 → 별도 `flask run-jobs` 프로세스 사용
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+PURGE_BATCH = 500
+
+@bp.before_app_request
+def ensure_job_workers():
+    jobs.start_workers(db, JOB_WORKERS)  # 프로세스당 한 번만 실제로 띄움
+
+@jobs.handler("post.cascade")
+def cascade_post_job(payload):
+    """삭제된 게시글의 댓글/좋아요/댓글 카운터/이미지 참조 정리"""
+    post_id = payload["post_id"]
+    comments.delete_many({"post_id": post_id})
+    likes.delete_many({"post_id": post_id})
+    for url_path in payload.get("images", []):
+        release_upload(url_path, post_id)
+
+@jobs.handler("hot.compact")
+def compact_hot_job(payload):
+    """식은 글을 인기글 랭킹에서 정리 (HOT_COMPACT_SECONDS 마다)"""
+    removed = hot.compact(db)
+    if removed:
+        print(f"인기글 랭킹 정리: {removed}건 삭제")
+
+jobs.every("hot.compact", hot.COMPACT_INTERVAL)
+
+def delete_counted(coll, docs: list, counter_field: str) -> None:
+    """
+    댓글/좋아요 문서를 delete_many 한 번으로 지우고, 게시글별로 묶은 수만큼 카운터를 한 번의 bulk_write 로 뺀다.
+    그 사이 다른 곳에서 지워진 문서가 섞여 있으면(게시글 연쇄 삭제 등) 뺄 수를 알 수 없으므로
+    해당 게시글들의 수를 다시 센다. 두 쓰기 사이에 죽으면 이 배치만큼 어긋남 → flask reconcile-counters
+    """
+    if not docs:
+        return
+    per_post = Counter(doc["post_id"] for doc in docs)
+    deleted = coll.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}}).deleted_count
+    if deleted == len(docs):
+        ops = [UpdateOne({"_id": pid}, {"$inc": {counter_field: -n}}) for pid, n in per_post.items()]
+    else:
+        rows = coll.aggregate([
+            {"$match": {"post_id": {"$in": list(per_post)}}},
+            {"$group": {"_id": "$post_id", "n": {"$sum": 1}}},
+        ])
+        counts = {row["_id"]: row["n"] for row in rows}
+        ops = [UpdateOne({"_id": pid}, {"$set": {counter_field: counts.get(pid, 0)}}) for pid in per_post]
+    posts.bulk_write(ops, ordered=False)
+
+@jobs.handler("user.purge")
+def purge_user_job(payload):
+    """
+    탈퇴한 사용자의 게시글/댓글/좋아요를 PURGE_BATCH 개씩 삭제.
+    남은 것이 있으면 같은 작업을 다시 큐에 넣어 다음 배치를 이어서 처리한다.
+    탈퇴 시각(deleted_at) 이후에 같은 아이디로 새로 가입한 사용자의 글은 건드리지 않는다.
+    """
+    username = payload["username"]
+    # deleted_at 이 없는 건 이 필드가 생기기 전에 큐에 들어간 작업
+    before = {"created_at": {"$lte": payload["deleted_at"]}} if payload.get("deleted_at") else {}
+    query = {"author": username, **before}
+
+    post_batch = list(posts.find(query, {"board": 1, "images": 1}).limit(PURGE_BATCH))
+    for doc in post_batch:
+        remove_post(doc)
+
+    comment_batch = list(comments.find(query, {"post_id": 1}).limit(PURGE_BATCH))
+    delete_counted(comments, comment_batch, "comments_count")
+
+    like_batch = list(likes.find({"username": username, **before}, {"post_id": 1}).limit(PURGE_BATCH))
+    delete_counted(likes, like_batch, "likes_count")
+
+    # 댓글/좋아요 수가 바뀐 게시글의 ETag 갱신 (목록은 수만 바뀌므로 시간 창에 맡김)
+    touched = {c["post_id"] for c in comment_batch} | {l["post_id"] for l in like_batch}
+    versions.bump(db, *(versions.post_key(pid) for pid in touched))
+
+    if PURGE_BATCH in (len(post_batch), len(comment_batch), len(like_batch)):
+        jobs.enqueue(db, "user.purge", payload)
+
+# ──────────────────────────────────────────────────────────────────────────
 # 헬스 체크
 # ──────────────────────────────────────────────────────────────────────────
-@app.get("/api/health")
+@bp.get("/api/health")
 def health():
     try:
         db.command("ping")
-        return {"ok": True, "users": db["users"].count_documents({})}
+        if schema_gate.needs_check():
+            schema_gate.check(db)
+        if schema_gate.pending:
+            return {"ok": False, "pending_migrations": [v for v, _ in schema_gate.pending]}, 503
+        return {"ok": True, "users": counters.get(db, counters.USERS)}
     except Exception as e:
         return {"ok": False, "error": str(e)}, 500
 
+# 캐시 적중률 확인용 (크기 조정 참고)
+@bp.get("/api/cache/stats")
+def cache_stats():
+    return jsonify(success=True, data=post_cache.stats())
+
+# ──────────────────────────────────────────────────────────────────────────
+# 지표: 엔드포인트별 지연/상태 코드/응답 크기 + MongoDB 명령 (metrics.py)
+# ──────────────────────────────────────────────────────────────────────────
+@bp.before_app_request
+def start_timer():
+    g.request_started = metrics.now()
+
+@bp.after_app_request
+def record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        # 스트리밍 응답은 첫 바이트까지의 시간, 크기는 알 수 없으므로 생략
+        size = None if response.is_streamed else response.calculate_content_length()
+        metrics.observe_request(app_metrics, request.endpoint or "unmatched", request.method,
+                                response.status_code, metrics.now() - started, size)
+    return response
+
+@bp.get("/api/metrics")
+def metrics_api():
+    stats = post_cache.stats()
+    gauges = {
+        ("cache_hits_total", ()): stats["hits"],
+        ("cache_misses_total", ()): stats["misses"],
+        ("cache_evictions_total", ()): stats["evictions"],
+        ("cache_entries", ()): stats["size"],
+    }
+    return Response(app_metrics.render(gauges), mimetype="text/plain; version=0.0.4")
+
+# ──────────────────────────────────────────────────────────────────────────
+# 스키마 확인: `flask migrate` 없이 뜬 워커는 요청을 받지 않는다 (migrations.Gate)
+# ──────────────────────────────────────────────────────────────────────────
+schema_gate = migrations.Gate()
+SCHEMA_EXEMPT = {"main.health", "main.metrics_api", "static"}
+
+def schema_unavailable():
+    msg = "서버 점검 중입니다. 잠시 후 다시 시도해 주세요."
+    if request.path.startswith("/api/"):
+        resp = jsonify(success=False, msg=msg)
+    else:
+        resp = Response(msg, mimetype="text/plain")
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(int(schema_gate.recheck))
+    return resp
+
+@bp.before_app_request
+def ensure_migrated():
+    if request.endpoint in SCHEMA_EXEMPT:
+        return None
+    if schema_gate.needs_check():
+        schema_gate.check(db)
+    return schema_unavailable() if schema_gate.pending else None
+
 # API 에러는 JSON으로
-@app.errorhandler(404)
+@bp.app_errorhandler(404)
 def handle_404(e):
     if request.path.startswith("/api/"):
         return jsonify(success=False, msg="리소스를 찾을 수 없습니다."), 404
     return render_template("404.html"), 404
 
-@app.errorhandler(500)
+@bp.app_errorhandler(413)
+def handle_413(e):
+    msg = f"업로드 용량이 너무 큽니다. (파일당 {MAX_FILE_MB}MB, 최대 {MAX_FILES}개)"
+    if request.path.startswith("/api/"):
+        return jsonify(success=False, msg=msg), 413
+    return msg, 413
+
+@bp.app_errorhandler(500)
 def handle_500(e):
     if request.path.startswith("/api/"):
         return jsonify(success=False, msg="서버 내부 오류가 발생했습니다."), 500
     return render_template("500.html"), 500
 
 # (선택) 405도 JSON으로 받고 싶다면 주석 해제
-# @app.errorhandler(405)
+# @bp.app_errorhandler(405)
 # def handle_405(e):
 #   if request.path.startswith("/api/"):
 #       return jsonify(success=False, msg="허용되지 않은 메서드입니다."), 405
 #   return "Method Not Allowed", 405
 
+# ──────────────────────────────────────────────────────────────────────────
+# 관리 명령 (flask --app app <command>)
+# ──────────────────────────────────────────────────────────────────────────
+@bp.cli.command("reconcile-counters")
+def reconcile_counters_command():
+    """counters 컬렉션과 게시글 댓글/좋아요 수를 전수 집계로 재구성"""
+    summary = counters.rebuild(db)
+    print(f"카운터 재구성 완료: {summary}")
+
+@bp.cli.command("run-jobs")
+def run_jobs_command():
+    """작업 큐 전용 워커 프로세스 (JOB_WORKERS 개 스레드, Ctrl+C 로 종료)"""
+    print(f"작업 워커 시작: {max(JOB_WORKERS, 1)}개")
+    jobs.run_forever(db, max(JOB_WORKERS, 1))
+
+@bp.cli.command("rebuild-hot")
+def rebuild_hot_command():
+    """좋아요/댓글 기록으로 인기글 랭킹을 처음부터 다시 계산"""
+    print(f"인기글 랭킹 재구성 완료: {hot.rebuild(db)}건")
+
+@bp.cli.command("export")
+@click.argument("out_dir")
+@click.option("--no-files", is_flag=True, help="업로드 파일은 복사하지 않음")
+@click.option("--batch", default=1000, show_default=True)
+def export_command(out_dir, no_files, batch):
+    """users/posts/comments/likes/uploads 를 NDJSON 번들로 내보내기 (중단 후 재실행하면 이어서).
+    비밀번호 해시가 포함되므로 번들 보관에 주의."""
+    summary = transfer.export_bundle(db, out_dir, None if no_files else UPLOAD_FOLDER, batch)
+    print(f"내보내기 완료: {summary}")
+
+@bp.cli.command("import")
+@click.argument("in_dir")
+@click.option("--drop", is_flag=True, help="가져오기 전에 대상 컬렉션 비우기")
+@click.option("--no-files", is_flag=True, help="업로드 파일은 복사하지 않음")
+@click.option("--batch", default=1000, show_default=True)
+def import_command(in_dir, drop, no_files, batch):
+    """flask export 번들 가져오기 + 파생 필드 재계산 (중단 후 재실행하면 이어서)"""
+    summary = transfer.import_bundle(db, in_dir, None if no_files else UPLOAD_FOLDER, batch, drop)
+    print(f"가져오기 완료: {summary}")
+
+@bp.cli.command("migrate")
+def migrate_command():
+    """스키마(인덱스) 마이그레이션 적용. 배포 때 워커를 띄우기 전에 한 번 실행"""
+    ran = migrations.migrate(db)
+    for version, name in ran:
+        print(f"  {version:>3}  {name}")
+    print(f"마이그레이션 완료: {len(ran)}건 적용" if ran else "적용할 마이그레이션 없음")
+
+@bp.cli.command("migrate-status")
+def migrate_status_command():
+    """아직 적용되지 않은 마이그레이션 목록"""
+    todo = migrations.pending(db)
+    for version, name in todo:
+        print(f"  {version:>3}  {name}")
+    print(f"대기 중 {len(todo)}건")
+
+# ──────────────────────────────────────────────────────────────────────────
+# 앱 팩토리
+# ──────────────────────────────────────────────────────────────────────────
+def create_app(config: dict = None) -> Flask:
+    """
+    gunicorn 'app:create_app()' / flask --app app run
+    import 와 앱 생성은 연결 없이 끝나고, Mongo 클라이언트는 워커 프로세스에서 첫 요청 때 생성된다.
+    """
+    app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.config.from_mapping(
+        SECRET_KEY=os.getenv("SECRET_KEY", "dev_secret"),
+        MONGODB_URI=os.getenv("MONGODB_URI", "mongodb://localhost:27018/miniproject"),
+        # 요청 본문 상한: 본문을 읽는 도중에 werkzeug 가 413 으로 끊는다
+        MAX_CONTENT_LENGTH=(MAX_FILE_MB * MAX_FILES + 1) * 1024 * 1024,
+        SESSION_COOKIE_HTTPONLY=True,
+        SESSION_COOKIE_SAMESITE="Lax",
+        SESSION_COOKIE_SECURE=False,  # HTTPS 환경이면 True 권장
+        **database.pool_settings_from_env(),
+    )
+    if config:
+        app.config.update(config)
+    # 끝 슬래시 혼동 방지 (/comments vs /comments/)
+    app.url_map.strict_slashes = False
+
+    db.configure(app.config["MONGODB_URI"],
+                 {k: app.config[k] for k in database.POOL_DEFAULTS},
+                 event_listeners=[mongo_listener])
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    responses.init_app(app)  # orjson JSON provider + gzip/br 압축
+    app.register_blueprint(bp)
+    return app
+
 # ──────────────────────────────────────────────────────────────────────────
 # 종료 시 Mongo 연결 정리
 # ──────────────────────────────────────────────────────────────────────────
 def cleanup():
-    if mongo:
-        mongo.close()
+    jobs.stop_workers()
+    images.shutdown()
+    if db.close():
         print("MongoDB 연결 정리 완료")
 
 atexit.register(cleanup)
 
 if __name__ == "__main__":
     print("Flask 앱 시작...")
+    app = create_app()
     print(app.url_map)
     app.run(host="0.0.0.0", port=3000, debug=True)
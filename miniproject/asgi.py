@@ -0,0 +1,523 @@
+"""
+JSON API 비동기 서버 (ASGI)
+
+동기 앱(app.py)은 요청 하나가 Mongo 응답을 기다리는 동안 스레드 하나를 잡고 있어서
+동시 처리량이 워커 스레드 수에 묶인다. 여기서는 자주 불리는 /api/* 라우트를
+Quart(Flask 와 같은 API 의 asyncio 판) + PyMongo 비동기 드라이버(AsyncMongoClient)로 구현해서
+워커 프로세스 하나가 이벤트 루프 하나로 많은 요청의 DB 대기를 겹쳐 처리한다.
+
+- 응답 JSON 모양/상태 코드/메시지, ETag·304, 캐시 키는 app.py 와 같다
+  (파라미터 해석·쿼리/커서 조립·직렬화는 두 앱이 api.py 를 함께 쓰고, 여기는 드라이버 호출만 다르다).
+- 세션 쿠키는 같은 SECRET_KEY 로 서명하므로 어느 쪽에서 로그인해도 양쪽에서 통한다.
+- 여기에 없는 경로(페이지 템플릿, /uploads, 글 작성·삭제(파일 처리), 회원가입, 지표, 캐시 통계)는
+  같은 프로세스의 동기 앱으로 넘긴다 (WSGI 어댑터 → 스레드 풀, WSGI_THREADS).
+  두 앱이 읽기 캐시, SSE broker, 지표 레지스트리, 작업 워커를 함께 쓴다.
+
+실행 (워커 수 = 코어 수 정도)
+  uvicorn --factory asgi:create_asgi_app --workers 4 --port 3000
+  hypercorn --workers 4 -b 0.0.0.0:3000 'asgi:create_asgi_app()'
+필요 패키지: quart, hypercorn, pymongo 4.9 이상 (requirements.txt). 비교 벤치마크는 bench/bench_async.py
+"""
+import os
+import time
+import asyncio
+from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+from pymongo import errors
+from quart import Blueprint, Quart, Response, current_app, request, jsonify, session, g
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from werkzeug.exceptions import HTTPException
+
+import api
+import app as wsgi
+import cache
+import counters
+import database
+import events
+import hashing
+import hot
+import jobs
+import metrics
+import responses
+import versions
+
+bp = Blueprint("main", __name__)  # 이름을 동기 앱과 맞춤 → 지표의 endpoint 라벨이 같다
+
+# 워커 프로세스의 이벤트 루프 안에서 만든다 (connect_mongo)
+client = None
+adb = None
+
+# 동기 앱으로 넘긴 요청을 처리할 스레드 수 (업로드/템플릿 등 드문 경로용)
+WSGI_THREADS = int(os.getenv("WSGI_THREADS", "16"))
+
+# 여기의 SSE 는 스레드를 잡지 않으므로 동기 앱의 MAX_EVENT_STREAMS 와 따로, 더 크게 둔다
+MAX_EVENT_STREAMS = int(os.getenv("MAX_ASYNC_EVENT_STREAMS", "1000"))
+
+# 동기 앱 설정 중 이쪽에도 필요한 것 (세션 쿠키 호환 + Mongo 풀)
+SHARED_CONFIG = ["SECRET_KEY", "MONGODB_URI", "SESSION_COOKIE_HTTPONLY", "SESSION_COOKIE_SAMESITE",
+                 "SESSION_COOKIE_SECURE", *database.POOL_DEFAULTS]
+
+# ──────────────────────────────────────────────────────────────────────────
+# 유틸 (app.py 의 같은 이름 함수의 비동기판). 쿼리/응답 모양은 api.py
+# ──────────────────────────────────────────────────────────────────────────
+def current_username():
+    user = session.get("user")
+    return user["username"] if user is not None else None
+
+def login_required_json(f):
+    @wraps(f)
+    async def wrapper(*args, **kwargs):
+        if current_username() is None:
+            return jsonify(success=False, msg="로그인이 필요합니다."), 401
+        return await f(*args, **kwargs)
+    return wrapper
+
+def busy_response():
+    resp = jsonify(success=False, msg="요청이 많습니다. 잠시 후 다시 시도해 주세요.")
+    resp.headers["Retry-After"] = "1"
+    return resp, 503
+
+def streams_full_response():
+    resp = Response("", status=204)
+    resp.headers["Retry-After"] = str(events.FULL_RETRY_AFTER)
+    return resp
+
+def bad_request(e: api.BadRequest):
+    return jsonify(success=False, msg=str(e)), 400
+
+def not_modified(etag: str, last_modified):
+    if not responses.is_fresh(request, etag, last_modified):
+        return None
+    return responses.set_validators(Response("", status=304), etag, last_modified)
+
+async def read(coll, find: api.Find) -> list:
+    return await find.cursor(coll).to_list(None)
+
+async def get_post_version(oid) -> tuple:
+    return versions.post_from_doc(await adb[versions.COLLECTION].find_one({"_id": versions.post_key(oid)}), oid)
+
+async def get_counter(key: str) -> int:
+    return counters.from_doc(await adb[counters.COLLECTION].find_one({"_id": key}, {"n": 1}))
+
+async def get_list_version(board) -> tuple:
+    """versions.get_list 와 같음: (shared, version, last_modified)"""
+    username = current_username()
+    keys = versions.list_keys(board, username)
+    docs = {d["_id"]: d async for d in adb[versions.COLLECTION].find({"_id": {"$in": keys}})}
+    return versions.list_state(docs, board, username)
+
+async def bump(*keys: str) -> None:
+    await adb[versions.COLLECTION].bulk_write(versions.bump_ops(*keys), ordered=False)
+
+async def record_hot(post_id, board, weight: float) -> None:
+    await adb[hot.COLLECTION].update_one({"_id": post_id}, hot.record_pipeline(board, weight), upsert=True)
+
+async def viewer_liked_ids(post_ids: list) -> set:
+    username = current_username()
+    if username is None or not post_ids:
+        return set()
+    return {d["post_id"] for d in await read(adb.likes, api.liked_find(post_ids, username))}
+
+async def no_total() -> None:
+    return None
+
+# ──────────────────────────────────────────────────────────────────────────
+# API: 댓글
+# ──────────────────────────────────────────────────────────────────────────
+@bp.get("/api/posts/<id>/comments")
+async def list_comments_api(id):
+    try:
+        oid = ObjectId(id)
+        version, modified = await get_post_version(oid)
+        etag = api.comments_etag(version)
+        unchanged = not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        if api.arg_flag(request.args, "stream", False):
+            async def generate():
+                cur = api.comment_stream_find(oid).cursor(adb.comments)
+                try:
+                    async for c in cur:
+                        yield api.ndjson_line(c).encode("utf-8")
+                finally:
+                    await cur.close()
+            resp = Response(generate(), mimetype="application/x-ndjson")
+            resp.timeout = None  # 긴 스레드도 끝까지 (Quart 기본 응답 시간 제한 해제)
+            return responses.set_validators(resp, etag, modified)
+
+        page = api.CommentPage(oid, request.args)
+        docs = await read(adb.comments, page.find())
+        return responses.set_validators(jsonify(success=True, data=page.data(docs)), etag, modified)
+    except api.BadRequest as e:
+        return bad_request(e)
+    except Exception as e:
+        print("comments list error:", e)
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.post("/api/posts/<id>/comments")
+@login_required_json
+async def create_comment_api(id):
+    try:
+        content = api.comment_content(await request.get_json(silent=True) or {})
+        oid = ObjectId(id)
+        post = await adb.posts.find_one({"_id": oid}, api.COMMENT_POST_FIELDS)
+        if not post:
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+
+        doc = api.new_comment(post, current_username(), content)
+        await adb.comments.insert_one(doc)
+        if not (await adb.posts.update_one(**api.count_comment(oid))).matched_count:
+            await adb.comments.delete_one({"_id": doc["_id"]})  # 그 사이 글이 지워짐
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+        # 서로 독립적인 쓰기 두 건은 동시에
+        await asyncio.gather(bump(versions.post_key(oid)),
+                             record_hot(oid, post["board"], hot.COMMENT_WEIGHT))
+        data = api.comment_doc_to_json(doc)
+        wsgi.publish_post_event(oid, "comment", data)
+        return jsonify(success=True, data=data), 201
+    except api.BadRequest as e:
+        return bad_request(e)
+    except Exception as e:
+        print("comment create error:", e)
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# API: 좋아요
+# ──────────────────────────────────────────────────────────────────────────
+@bp.post("/api/posts/<id>/like")
+@login_required_json
+async def like_post_api(id):
+    try:
+        username = current_username()
+        oid = ObjectId(id)
+
+        try:
+            await adb.likes.insert_one(api.new_like(oid, username))
+            liked, delta = True, 1
+        except errors.DuplicateKeyError:
+            res = await adb.likes.delete_one({"post_id": oid, "username": username})
+            liked, delta = False, -res.deleted_count
+
+        doc = await adb.posts.find_one_and_update(**api.count_like(oid, delta))
+        if not doc:
+            if liked:
+                await adb.likes.delete_one({"post_id": oid, "username": username})
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+
+        writes = [bump(versions.post_key(oid), versions.user_key(username))]
+        if delta:
+            writes.append(record_hot(oid, doc["board"], hot.LIKE_WEIGHT * delta))
+        await asyncio.gather(*writes)
+        data = api.like_data(doc, liked)
+        if delta:
+            wsgi.publish_post_event(oid, "like", {"likes_count": data["likes_count"]})
+        return jsonify(success=True, data=data)
+    except Exception as e:
+        print("like error:", e)
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# API: 로그인 (회원가입/계정 삭제는 동기 앱)
+# ──────────────────────────────────────────────────────────────────────────
+@bp.post("/api/login")
+async def login_api():
+    try:
+        username, password = api.login_fields(await request.get_json(silent=True) or {})
+        user = await adb.users.find_one({"username": username})
+        if not user:
+            return jsonify(success=False, msg="존재하지 않는 아이디입니다."), 401
+
+        old_hash = user["passwordHash"]
+        if not await wsgi.hash_pool.verify_async(password, old_hash):
+            return jsonify(success=False, msg="비밀번호가 일치하지 않습니다."), 401
+
+        # 재해시 저장은 해시 풀 스레드에서 끝나므로 동기 드라이버로
+        if wsgi.hash_pool.needs_rehash(old_hash):
+            wsgi.hash_pool.rehash_later(password, lambda new_hash: wsgi.users.update_one(
+                *api.rehash_update(user, old_hash, new_hash)))
+
+        session["user"] = {"username": username}
+        return jsonify(success=True, msg="로그인 성공")
+    except api.BadRequest as e:
+        return bad_request(e)
+    except hashing.PoolBusy:
+        return busy_response()
+    except errors.PyMongoError as e:
+        print(f"로그인 DB 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+    except Exception as e:
+        print(f"로그인 오류: {e}")
+        return jsonify(success=False, msg="처리 중 오류가 발생했습니다."), 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# API: 게시글 (작성/삭제는 동기 앱)
+# ──────────────────────────────────────────────────────────────────────────
+@bp.get("/api/posts")
+async def list_posts_api():
+    try:
+        listing = api.PostList(request.args)
+        shared, version, modified = await get_list_version(listing.board)
+        etag = listing.etag(version, current_username())
+        unchanged = not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        async def load_page():
+            return listing.shape(await read(adb.posts, listing.find()))
+
+        cached = await wsgi.post_cache.get_or_load_async(listing.cache_key(shared), load_page)
+        # 좋아요 여부와 전체 개수는 서로 무관하므로 동시에 읽는다
+        liked_ids, total = await asyncio.gather(
+            viewer_liked_ids(api.item_ids(cached["items"])),
+            get_counter(listing.total_key()) if listing.include_total else no_total())
+        data = listing.data(cached, liked_ids, total)
+        return responses.set_validators(jsonify(success=True, data=data), etag, modified)
+    except api.BadRequest as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"게시글 목록 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.get("/api/posts/hot")
+async def hot_posts_api():
+    try:
+        ranking = api.HotList(request.args)
+        shared, version, modified = await get_list_version(ranking.board)
+        etag = ranking.etag(version, current_username())
+        unchanged = not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        async def load_hot():
+            ranked = await read(adb[hot.COLLECTION], ranking.find())
+            return ranking.shape(ranked, await read(adb.posts, ranking.posts_find(ranked)))
+
+        cached = await wsgi.post_cache.get_or_load_async(ranking.cache_key(shared), load_hot)
+        liked_ids = await viewer_liked_ids(api.item_ids(cached["items"]))
+        return responses.set_validators(jsonify(success=True, data=ranking.data(cached, liked_ids)),
+                                        etag, modified)
+    except api.BadRequest as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"인기글 조회 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.get("/api/posts/<id>")
+async def get_post_api(id):
+    try:
+        oid = ObjectId(id)
+        version, modified = await get_post_version(oid)
+        etag = api.post_etag(version, current_username())
+        unchanged = not_modified(etag, modified)
+        if unchanged:
+            return unchanged
+
+        async def load_post():
+            doc = await adb.posts.find_one({"_id": oid}, api.POST_DETAIL_FIELDS)
+            return api.post_doc_to_json(doc) if doc else None
+
+        data, liked_ids = await asyncio.gather(
+            wsgi.post_cache.get_or_load_async(cache.post_key(oid, version), load_post),
+            viewer_liked_ids([oid]),
+        )
+        if not data:
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+        return responses.set_validators(jsonify(success=True, data={**data, "liked": bool(liked_ids)}),
+                                        etag, modified)
+    except Exception as e:
+        print(f"게시글 조회 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.get("/api/posts/<id>/view")
+async def post_view_api(id):
+    try:
+        oid = ObjectId(id)
+        per_page = api.int_arg(request.args, "per_page", 20, 100)
+        username = current_username()
+
+        cur = await adb.posts.aggregate(api.post_view_pipeline(oid, per_page, username))
+        docs = await cur.to_list(1)
+        if not docs:
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+        return jsonify(success=True, data=api.post_view_to_json(docs[0], per_page, username))
+    except Exception as e:
+        print(f"게시글 보기 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+@bp.get("/api/posts/<id>/events")
+async def post_events_api(id):
+    """SSE. 대기 중에 스레드를 잡지 않는다 (events.AsyncSubscription)"""
+    try:
+        oid = ObjectId(id)
+        post = await adb.posts.find_one({"_id": oid}, {"likes_count": 1, "comments_count": 1})
+        if not post:
+            return jsonify(success=False, msg="게시글을 찾을 수 없습니다."), 404
+        if events.SOURCE == "changestream":
+            events.ensure_change_stream(wsgi.db, wsgi.event_broker, api.comment_doc_to_json)
+        try:
+            sub = wsgi.event_broker.subscribe(str(oid), asyncio.get_running_loop(), limit=MAX_EVENT_STREAMS)
+        except events.Full:
+            return streams_full_response()
+        snapshot = {"likes_count": post.get("likes_count", 0), "comments_count": post.get("comments_count", 0)}
+
+        async def generate():
+            try:
+                yield b"retry: 3000\n\n"
+                yield events.format_sse("snapshot", snapshot).encode("utf-8")
+                deadline = time.monotonic() + wsgi.EVENT_STREAM_MAX
+                while time.monotonic() < deadline:
+                    event = await sub.get(timeout=wsgi.EVENT_HEARTBEAT)
+                    yield (events.format_sse(*event) if event else ": ping\n\n").encode("utf-8")
+            finally:
+                sub.close()
+
+        resp = Response(generate(), mimetype="text/event-stream")
+        resp.timeout = None
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"
+        return resp
+    except Exception as e:
+        print(f"이벤트 스트림 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# API: 검색
+# ──────────────────────────────────────────────────────────────────────────
+@bp.get("/api/search")
+async def search_api():
+    try:
+        query = api.Search(request.args)
+        docs = await read(adb.posts if query.posts else adb.comments, query.find())
+        liked_ids = await viewer_liked_ids(query.result_ids(docs))
+        return jsonify(success=True, data=query.data(docs, liked_ids))
+    except api.BadRequest as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"검색 오류: {e}")
+        return jsonify(success=False, msg="서버 오류가 발생했습니다."), 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# 헬스 체크
+# ──────────────────────────────────────────────────────────────────────────
+@bp.get("/api/health")
+async def health():
+    try:
+        await adb.command("ping")
+        await check_schema()
+        if wsgi.schema_gate.pending:
+            return {"ok": False, "pending_migrations": [v for v, _ in wsgi.schema_gate.pending]}, 503
+        return {"ok": True, "users": await get_counter(counters.USERS)}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}, 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# 지표/압축/에러 (동기 앱의 after_request 와 같은 동작)
+# ──────────────────────────────────────────────────────────────────────────
+@bp.before_app_request
+async def start_timer():
+    g.request_started = metrics.now()
+
+async def check_schema() -> None:
+    # 확인은 프로세스당 첫 요청(과 대기 중 재확인) 때만 → 동기 클라이언트로 스레드에서
+    if wsgi.schema_gate.needs_check():
+        await asyncio.to_thread(wsgi.schema_gate.check, wsgi.db)
+
+@bp.before_app_request
+async def ensure_migrated():
+    """동기 앱의 ensure_migrated 와 같음 (migrations.Gate)"""
+    if request.endpoint in wsgi.SCHEMA_EXEMPT:
+        return None
+    await check_schema()
+    if wsgi.schema_gate.pending:
+        resp = jsonify(success=False, msg="서버 점검 중입니다. 잠시 후 다시 시도해 주세요.")
+        resp.headers["Retry-After"] = str(int(wsgi.schema_gate.recheck))
+        return resp, 503
+    return None
+
+@bp.after_app_request
+async def compress_response(response):
+    # 이쪽의 비스트리밍 응답은 전부 JSON
+    if (response.mimetype != "application/json" or response.status_code < 200
+            or response.status_code in (204, 206, 304) or "Content-Encoding" in response.headers):
+        return response
+    response.vary.add("Accept-Encoding")
+    compressed = responses.compress(await response.get_data(), request.accept_encodings)
+    if compressed is None:
+        return response
+    data, coding = compressed
+    response.set_data(data)
+    response.headers["Content-Encoding"] = coding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+@bp.after_app_request
+async def record_request(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        metrics.observe_request(wsgi.app_metrics, request.endpoint or "unmatched", request.method,
+                                response.status_code, metrics.now() - started, response.content_length)
+    return response
+
+@bp.app_errorhandler(500)
+async def handle_500(e):
+    return jsonify(success=False, msg="서버 내부 오류가 발생했습니다."), 500
+
+# ──────────────────────────────────────────────────────────────────────────
+# 서버 시작/종료 (워커 프로세스마다)
+# ──────────────────────────────────────────────────────────────────────────
+async def connect_mongo():
+    global client, adb
+    config = current_app.config
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(WSGI_THREADS, thread_name_prefix="wsgi"))
+    client = database.connect_async(config["MONGODB_URI"],
+                                    {k: config[k] for k in database.POOL_DEFAULTS},
+                                    event_listeners=[wsgi.mongo_listener])
+    adb = client.get_default_database()
+    jobs.start_workers(wsgi.db, wsgi.JOB_WORKERS)
+
+async def close_mongo():
+    global client, adb
+    if client is not None:
+        await client.close()
+        client = adb = None
+
+class Dispatcher:
+    """경로가 비동기 앱의 라우트와 맞으면 Quart 로, 아니면 동기 Flask 앱(WSGI)으로"""
+
+    def __init__(self, async_app, sync_app):
+        self.async_app = async_app
+        # 본문 상한은 Flask 가 413 으로 판단하도록 여유를 둔다 (어댑터는 넘으면 400)
+        self.sync_app = AsyncioWSGIMiddleware(
+            sync_app, max_body_size=sync_app.config["MAX_CONTENT_LENGTH"] + 1024 * 1024)
+        self.routes = async_app.url_map.bind("localhost")
+
+    def handles(self, scope) -> bool:
+        try:
+            self.routes.match(scope["path"], scope["method"])
+            return True
+        except HTTPException:  # 404/405/리다이렉트 → 동기 앱이 원래대로 처리
+            return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not self.handles(scope):
+            return await self.sync_app(scope, receive, send)
+        return await self.async_app(scope, receive, send)  # lifespan 포함
+
+def create_asgi_app(config: dict = None) -> Dispatcher:
+    """uvicorn --factory asgi:create_asgi_app / hypercorn 'asgi:create_asgi_app()'"""
+    sync_app = wsgi.create_app(config)
+    app = Quart(__name__, static_folder=None)
+    app.config.update({k: sync_app.config[k] for k in SHARED_CONFIG})
+    app.url_map.strict_slashes = False
+    if responses.orjson:
+        app.json = responses.OrjsonProvider(app)
+    app.register_blueprint(bp)
+    app.before_serving(connect_mongo)
+    app.after_serving(close_mongo)
+    return Dispatcher(app, sync_app)
@@ -0,0 +1,168 @@
+"""
+동기(gunicorn + app.py) vs 비동기(uvicorn + asgi.py) 서버 비교: 같은 p99 에서 코어당 처리량
+
+두 서버를 같은 워커 수(= 코어 수)로 차례로 띄우고, 동시 사용자 수를 --levels 순서로 늘려 가며
+run.py 와 같은 요청 섞기로 부하를 건다. p99 가 --p99-ms 를 넘기 직전 단계의 rps 를
+워커 수로 나눈 값이 "코어당 rps" 다.
+
+- 부하 생성기도 CPU 를 쓰므로 --cpus 로 서버를 특정 코어에 묶는 것을 권장 (taskset 필요)
+- 업로드/이미지/삭제는 두 서버 모두 동기 앱이 처리하므로 기본 섞기에서 뺐다
+- 서버 명령은 --sync-cmd / --async-cmd 로 바꿀 수 있다 ({port} {workers} {threads} 치환)
+
+사용 예:
+  python bench/bench_async.py --mongodb-uri mongodb://localhost:27018/miniproject_bench \\
+      --workers 2 --cpus 0-1 --p99-ms 100 --levels 8,16,32,64,128,256 --seconds 15
+"""
+import os
+import sys
+import time
+import random
+import shlex
+import argparse
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+
+import common
+import run
+
+SYNC_CMD = "gunicorn -w {workers} --threads {threads} -b 127.0.0.1:{port} app:create_app()"
+ASYNC_CMD = "uvicorn --factory asgi:create_asgi_app --workers {workers} --host 127.0.0.1 --port {port} --no-access-log"
+DEFAULT_MIX = "upload=0,image=0,delete=0,login=0"
+
+def start_server(cmd: str, args, env) -> subprocess.Popen:
+    argv = shlex.split(cmd.format(port=args.port, workers=args.workers, threads=args.threads))
+    if args.cpus:
+        argv = ["taskset", "-c", args.cpus] + argv
+    return subprocess.Popen(argv, cwd=common.APP_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_ready(base: str, proc: subprocess.Popen, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"서버가 바로 종료됨 (exit {proc.returncode})")
+        try:
+            with urllib.request.urlopen(f"{base}/api/health", timeout=2) as resp:
+                if resp.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.3)
+    raise SystemExit("서버가 준비되지 않음 (/api/health)")
+
+def stop_server(proc: subprocess.Popen) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+def run_level(base, users, seconds, weights, post_ids, password, seed) -> dict:
+    """동시 사용자 users 명으로 seconds 동안 → 전체 rps/p99 (로그인은 측정 전에 끝냄)"""
+    warmup = common.Recorder()
+    sims = [run.SimUser(i, run.HttpClient(base), warmup, post_ids, password, random.Random(seed + i))
+            for i in range(users)]
+    for s in sims:
+        s.login()
+
+    recorder = common.Recorder()
+    names, w = zip(*weights.items())
+    deadline = time.monotonic() + seconds
+
+    def loop(sim):
+        sim.rec = recorder
+        while time.monotonic() < deadline:
+            sim.do(sim.rng.choices(names, w)[0])
+
+    threads = [threading.Thread(target=loop, args=(s,)) for s in sims]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"users": users, **recorder.overall(time.perf_counter() - started)}
+
+def measure(name, cmd, args, weights, post_ids) -> dict:
+    base = f"http://127.0.0.1:{args.port}"
+    # WORKER_THREADS: 동기 앱이 SSE 연결 상한을 --threads 에 맞춰 잡도록
+    env = {**os.environ, "MONGODB_URI": args.mongodb_uri, "WORKER_THREADS": str(args.threads)}
+    proc = start_server(cmd, args, env)
+    try:
+        wait_ready(base, proc)
+        levels, best = [], None
+        for users in args.levels:
+            row = run_level(base, users, args.seconds, weights, post_ids, args.password, args.seed)
+            levels.append(row)
+            ok = row["p99_ms"] is not None and row["p99_ms"] <= args.p99_ms and not row["errors"]
+            print(f"  {name:5} users={users:>4}  rps={row['rps']:>9}  p99={str(row['p99_ms']):>8} ms"
+                  f"  errors={row['errors']}{'' if ok else '  (p99 초과)'}")
+            if not ok:
+                break
+            best = row
+    finally:
+        stop_server(proc)
+    return {
+        "command": cmd,
+        "levels": levels,
+        "best": best,
+        "rps_per_core": round(best["rps"] / args.workers, 2) if best else 0,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mongodb-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27018/miniproject_bench"))
+    ap.add_argument("--port", type=int, default=3100)
+    ap.add_argument("--workers", type=int, default=2, help="서버 워커 프로세스 수 (= 코어 수)")
+    ap.add_argument("--threads", type=int, default=16, help="동기 서버의 워커당 스레드 수")
+    ap.add_argument("--cpus", help="서버를 묶을 코어 (taskset -c 형식, 예: 0-1)")
+    ap.add_argument("--p99-ms", type=float, default=100)
+    ap.add_argument("--levels", default="8,16,32,64,128,256", help="동시 사용자 수 단계")
+    ap.add_argument("--seconds", type=float, default=15, help="단계별 측정 시간")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="run.py 와 같은 형식의 가중치 덮어쓰기")
+    ap.add_argument("--sync-cmd", default=SYNC_CMD)
+    ap.add_argument("--async-cmd", default=ASYNC_CMD)
+    ap.add_argument("--skip-seed", action="store_true")
+    ap.add_argument("--seed-users", type=int, default=300)
+    ap.add_argument("--posts-per-board", type=int, default=500)
+    ap.add_argument("--password", default="bench-password")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default="bench_async_output.json")
+    args = ap.parse_args()
+    args.levels = [int(n) for n in args.levels.split(",") if n]
+
+    weights = run.parse_mix(args.mix)
+    if not args.skip_seed and max(args.levels) > args.seed_users:
+        raise SystemExit("--levels 의 최대값은 --seed-users 이하여야 합니다 (사용자마다 계정 하나).")
+    os.environ["MONGODB_URI"] = args.mongodb_uri
+    import seed as seeder
+
+    from pymongo import MongoClient
+    seed_db = MongoClient(args.mongodb_uri).get_default_database()
+    dataset = {}
+    if not args.skip_seed:
+        dataset = seeder.seed(seed_db, args.seed_users, args.posts_per_board, 5, 3, args.password)
+        post_ids = dataset.pop("post_ids")
+    else:  # 서버를 띄우기 전이므로 DB 에서 직접
+        post_ids = [str(d["_id"]) for d in seed_db.posts.find({}, {"_id": 1}).limit(1000)]
+
+    print(f"p99 ≤ {args.p99_ms} ms 기준, 워커 {args.workers}개")
+    results = {
+        "sync": measure("sync", args.sync_cmd, args, weights, post_ids),
+        "async": measure("async", args.async_cmd, args, weights, post_ids),
+    }
+    text = common.write_report(args.out, {
+        "config": {"workers": args.workers, "threads": args.threads, "cpus": args.cpus,
+                   "p99_ms": args.p99_ms, "seconds": args.seconds, "mix": weights},
+        "dataset": dataset,
+        "results": results,
+    })
+    print(text)
+
+    sync_rate, async_rate = results["sync"]["rps_per_core"], results["async"]["rps_per_core"]
+    print(f"\n코어당 rps (p99 ≤ {args.p99_ms} ms): sync {sync_rate} → async {async_rate}"
+          + (f" (x{async_rate / sync_rate:.2f})" if sync_rate else ""))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+로그인 폭주 중 /api/posts 지연 측정
+
+실행 중인 서버를 대상으로 두 단계를 잰다.
+  1) baseline : /api/posts 만 호출
+  2) burst    : 로그인 스레드들이 계속 로그인하는 동안 /api/posts 호출
+bcrypt 가 요청 스레드를 잡고 있으면 2)의 p99 가 크게 튄다.
+
+사용 예:
+  python bench/bench_login.py --url http://localhost:3000 --login-threads 16 --seconds 10
+"""
+import json
+import time
+import argparse
+import threading
+import urllib.error
+import urllib.request
+
+from common import percentile
+
+def request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, (time.perf_counter() - start) * 1000
+
+def ensure_users(base, count, password):
+    names = [f"bench_user_{i}" for i in range(count)]
+    for name in names:
+        request(f"{base}/api/register", {"username": name, "password": password, "confirm": password})
+    return names
+
+def run_phase(base, seconds, readers, login_threads, usernames, password):
+    stop = time.monotonic() + seconds
+    lock = threading.Lock()
+    list_ms, login_ms = [], []
+    statuses = {}
+
+    def reader():
+        while time.monotonic() < stop:
+            status, ms = request(f"{base}/api/posts?per_page=10&include_total=false")
+            with lock:
+                list_ms.append(ms)
+                statuses[f"posts:{status}"] = statuses.get(f"posts:{status}", 0) + 1
+
+    def login(i):
+        name = usernames[i % len(usernames)]
+        while time.monotonic() < stop:
+            status, ms = request(f"{base}/api/login", {"username": name, "password": password})
+            with lock:
+                login_ms.append(ms)
+                statuses[f"login:{status}"] = statuses.get(f"login:{status}", 0) + 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=login, args=(i,)) for i in range(login_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    ok_logins = statuses.get("login:200", 0)
+    return {
+        "posts_requests": len(list_ms),
+        "posts_p50_ms": percentile(list_ms, 50),
+        "posts_p95_ms": percentile(list_ms, 95),
+        "posts_p99_ms": percentile(list_ms, 99),
+        "login_requests": len(login_ms),
+        "login_ok_per_sec": round(ok_logins / seconds, 2),
+        "login_p99_ms": percentile(login_ms, 99),
+        "statuses": statuses,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://localhost:3000")
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--login-threads", type=int, default=16)
+    ap.add_argument("--users", type=int, default=8)
+    ap.add_argument("--password", default="bench-password")
+    ap.add_argument("--out", help="결과를 JSON 파일로 저장")
+    args = ap.parse_args()
+
+    base = args.url.rstrip("/")
+    names = ensure_users(base, args.users, args.password)
+    result = {
+        "baseline": run_phase(base, args.seconds, args.readers, 0, names, args.password),
+        "burst": run_phase(base, args.seconds, args.readers, args.login_threads, names, args.password),
+    }
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+검색 벤치마크: 생성한 게시글 코퍼스(기본 100만 건)에서 /api/search 와 같은 쿼리 측정
+
+별도 DB(기본 miniproject_bench)에 posts 를 채우고, search.py 의 bigram 필드 + text
+인덱스로 질의한 지연(p50/p95/p99)을 잰다. 비교용으로 $regex 전수 스캔도 몇 번 잰다.
+
+사용 예:
+  python bench/bench_search.py --mongodb-uri mongodb://localhost:27018 --posts 1000000
+  python bench/bench_search.py --skip-seed --queries 500   # 이미 채운 코퍼스 재사용
+"""
+import os
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient
+
+from common import percentile
+import search
+
+BOARDS = ["Cafeteria", "Outside", "Delivery"]
+WORDS = (
+    "학식 메뉴 식당 점심 저녁 배달 치킨 피자 떡볶이 김밥 라면 국밥 돈까스 짜장면 짬뽕 "
+    "카레 샐러드 커피 디저트 맛집 추천 후기 가격 양 맛 별로 최고 오늘 내일 같이 "
+    "먹을 사람 구해요 주문 할인 쿠폰 리뷰 웨이팅 줄 포장 매장 정글 크래프톤 "
+    "delivery lunch dinner menu pizza burger coffee review"
+).split()
+PARTICLES = ["", "", "", "에서", "이", "가", "은", "는", "을", "를", "도"]
+QUERIES = ["학식", "식당", "치킨 배달", "맛집 추천", "떡볶이", "점심 같이", "피자", "웨이팅", "커피", "국밥"]
+
+def sentence(rng, n):
+    return " ".join(rng.choice(WORDS) + rng.choice(PARTICLES) for _ in range(n))
+
+def seed(db, total, batch, rng):
+    db.drop_collection("posts")
+    posts = db["posts"]
+    start = datetime.utcnow() - timedelta(days=365)
+    written = 0
+    t0 = time.perf_counter()
+    while written < total:
+        docs = []
+        for _ in range(min(batch, total - written)):
+            title = sentence(rng, rng.randint(2, 6))
+            content = sentence(rng, rng.randint(10, 80))
+            docs.append({
+                "title": title,
+                "content": content,
+                "board": rng.choice(BOARDS),
+                "author": f"user{rng.randint(1, 5000)}",
+                "created_at": start + timedelta(seconds=written),
+                "images": [],
+                "likes_count": 0,
+                **search.post_fields(title, content),
+            })
+        posts.insert_many(docs, ordered=False)
+        written += len(docs)
+        print(f"\r시드 {written}/{total}", end="", flush=True)
+    seed_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    search.ensure_indexes(db)
+    index_s = time.perf_counter() - t0
+    print()
+    return {"seed_seconds": round(seed_s, 1), "index_seconds": round(index_s, 1)}
+
+def run_text(db, count, per_page, rng):
+    posts = db["posts"]
+    samples = []
+    for _ in range(count):
+        cond = search.text_query(rng.choice(QUERIES))
+        if rng.random() < 0.5:
+            cond["board"] = rng.choice(BOARDS)
+        t0 = time.perf_counter()
+        list(posts.find(cond, {**search.SCORE, "title": 1}).sort(search.BY_SCORE).limit(per_page + 1))
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {
+        "queries": count,
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    }
+
+def run_regex(db, count, per_page, rng):
+    posts = db["posts"]
+    samples = []
+    for _ in range(count):
+        q = rng.choice(QUERIES).split()[0]
+        t0 = time.perf_counter()
+        list(posts.find({"$or": [{"title": {"$regex": q}}, {"content": {"$regex": q}}]},
+                        {"title": 1}).limit(per_page + 1))
+        samples.append((time.perf_counter() - t0) * 1000)
+    return {"queries": count, "p50_ms": percentile(samples, 50)}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mongodb-uri", default=os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27018"))
+    ap.add_argument("--db", default="miniproject_bench")
+    ap.add_argument("--posts", type=int, default=1_000_000)
+    ap.add_argument("--batch", type=int, default=10_000)
+    ap.add_argument("--queries", type=int, default=300)
+    ap.add_argument("--regex-queries", type=int, default=5)
+    ap.add_argument("--per-page", type=int, default=10)
+    ap.add_argument("--skip-seed", action="store_true")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", help="결과를 JSON 파일로 저장")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    db = MongoClient(args.mongodb_uri)[args.db]
+    result = {"posts": args.posts}
+    if not args.skip_seed:
+        result.update(seed(db, args.posts, args.batch, rng))
+    result["text_search"] = run_text(db, args.queries, args.per_page, rng)
+    if args.regex_queries:
+        result["regex_scan_baseline"] = run_regex(db, args.regex_queries, args.per_page, rng)
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+벤치마크 공용 도구: 지연 기록/요약, 결과 JSON 저장, 앱 모듈 import 경로
+"""
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)  # app.py 와 같은 폴더의 모듈(search, counters ...) 사용
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    idx = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return round(ordered[idx], 2)
+
+class Recorder:
+    """엔드포인트별 지연(ms)/상태 코드/응답 크기 수집 (스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self.started = time.perf_counter()
+
+    def add(self, endpoint: str, status: int, ms: float, nbytes: int = 0):
+        with self._lock:
+            row = self._data.setdefault(endpoint, {"ms": [], "statuses": {}, "bytes": 0})
+            row["ms"].append(ms)
+            row["statuses"][str(status)] = row["statuses"].get(str(status), 0) + 1
+            row["bytes"] += nbytes
+
+    def summary(self, elapsed: float = None) -> dict:
+        elapsed = elapsed or (time.perf_counter() - self.started)
+        out = {}
+        with self._lock:
+            for endpoint, row in sorted(self._data.items()):
+                n = len(row["ms"])
+                errors = sum(c for s, c in row["statuses"].items() if int(s) >= 500 or int(s) == 0)
+                out[endpoint] = {
+                    "requests": n,
+                    "errors": errors,
+                    "rps": round(n / elapsed, 2),
+                    "p50_ms": percentile(row["ms"], 50),
+                    "p95_ms": percentile(row["ms"], 95),
+                    "p99_ms": percentile(row["ms"], 99),
+                    "avg_bytes": round(row["bytes"] / n) if n else 0,
+                    "statuses": row["statuses"],
+                }
+        return out
+
+    def overall(self, elapsed: float = None) -> dict:
+        """엔드포인트 구분 없이 전체 요청의 처리량/지연"""
+        elapsed = elapsed or (time.perf_counter() - self.started)
+        with self._lock:
+            samples = [ms for row in self._data.values() for ms in row["ms"]]
+            errors = sum(c for row in self._data.values() for s, c in row["statuses"].items()
+                         if int(s) >= 500 or int(s) == 0)
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "rps": round(len(samples) / elapsed, 2),
+            "p50_ms": percentile(samples, 50),
+            "p99_ms": percentile(samples, 99),
+        }
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+def write_report(path: str, report: dict) -> str:
+    report = {
+        "commit": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        **report,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return text
@@ -0,0 +1,321 @@
+"""
+API 부하 테스트
+
+데이터셋을 시드한 뒤 동시 사용자(스레드)를 흉내 내서 모든 API 라우트를 섞어 호출하고,
+엔드포인트별 처리량(rps)과 p50/p95/p99 지연을 JSON 으로 남긴다.
+커밋마다 돌려서 --baseline 으로 이전 결과와 비교하면 회귀를 잡을 수 있다.
+
+모드 (둘 다 실제 MongoDB 필요 — $text/$lookup/파이프라인 update 를 쓰는 라우트가 있음)
+  (기본)       프로세스 내: Flask test client 로 app.py 를 직접 호출 (MONGODB_URI 의 DB 사용)
+  --url URL    실행 중인 서버에 HTTP 로 (시드는 --mongodb-uri 로 서버와 같은 DB 에)
+
+5xx(또는 연결 실패) 응답이 하나라도 있으면 보고서는 남기되 종료 코드 1 로 끝난다.
+
+사용 예:
+  python bench/run.py --users 50 --seconds 30 --out bench_output.json
+  python bench/run.py --url http://localhost:3000 --mongodb-uri mongodb://localhost:27018/miniproject
+  python bench/run.py --skip-seed --baseline bench_prev.json --mix like=20,upload=0
+"""
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import zlib
+import struct
+import random
+import argparse
+import threading
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import common
+
+# (보고서 키, 기본 가중치)
+ACTIONS = {
+    "list": ("GET /api/posts", 25),
+    "list_next": ("GET /api/posts?after", 10),
+    "detail": ("GET /api/posts/<id>", 12),
+    "view": ("GET /api/posts/<id>/view", 12),
+    "hot": ("GET /api/posts/hot", 4),
+    "comments": ("GET /api/posts/<id>/comments", 8),
+    "like": ("POST /api/posts/<id>/like", 8),
+    "comment": ("POST /api/posts/<id>/comments", 4),
+    "search": ("GET /api/search", 4),
+    "login": ("POST /api/login", 2),
+    "upload": ("POST /api/posts", 2),
+    "image": ("GET /uploads/<file>", 3),
+    "delete": ("DELETE /api/posts/<id>", 1),
+    "health": ("GET /api/health", 1),
+}
+SEARCH_TERMS = ["학식", "식당", "치킨 배달", "맛집 추천", "pizza", "점심 같이"]
+BOARDS = ["Cafeteria", "Outside", "Delivery"]
+
+def tiny_png(rng, size=32) -> bytes:
+    """무작위 픽셀의 작은 PNG (업로드마다 내용이 달라 중복 제거에 걸리지 않음)"""
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    rows = b"".join(b"\x00" + bytes(rng.randrange(256) for _ in range(size * 3)) for _ in range(size))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows))
+            + chunk(b"IEND", b""))
+
+# ── 클라이언트: request() → (status, 응답 바이트) ──
+class HttpClient:
+    def __init__(self, base):
+        self.base = base.rstrip("/")
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, method, path, json_body=None, form=None, files=None):
+        headers, data = {}, None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif files is not None:
+            boundary = uuid.uuid4().hex
+            parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode()
+                     for k, v in (form or {}).items()]
+            for field, (filename, content, ctype) in files:
+                parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; '
+                             f'filename="{filename}"\r\nContent-Type: {ctype}\r\n\r\n'.encode()
+                             + content + b"\r\n")
+            parts.append(f"--{boundary}--\r\n".encode())
+            data = b"".join(parts)
+            headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
+        req = urllib.request.Request(self.base + path, data=data, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=30) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+        except OSError:
+            return 0, b""
+
+class InProcessClient:
+    def __init__(self, flask_app):
+        self.client = flask_app.test_client()
+
+    def request(self, method, path, json_body=None, form=None, files=None):
+        kwargs = {}
+        if json_body is not None:
+            kwargs["json"] = json_body
+        elif files is not None:
+            data = dict(form or {})
+            data["images"] = [(io.BytesIO(content), filename, ctype) for _, (filename, content, ctype) in files]
+            kwargs["data"] = data
+            kwargs["content_type"] = "multipart/form-data"
+        resp = self.client.open(path, method=method, **kwargs)
+        return resp.status_code, resp.get_data()
+
+# ── 시뮬레이션 사용자 ──
+class SimUser:
+    def __init__(self, idx, client, recorder, post_ids, password, rng):
+        self.name = f"bench_user_{idx}"
+        self.client = client
+        self.rec = recorder
+        self.post_ids = post_ids
+        self.password = password
+        self.rng = rng
+        self.next_cursor = None
+        self.own_posts = []
+        self.uploaded = []
+
+    def call(self, action, method, path, **kwargs):
+        t0 = time.perf_counter()
+        status, body = self.client.request(method, path, **kwargs)
+        self.rec.add(ACTIONS[action][0], status, (time.perf_counter() - t0) * 1000, len(body))
+        return status, body
+
+    def data(self, body):
+        try:
+            return json.loads(body).get("data") or {}
+        except ValueError:
+            return {}
+
+    def pick_post(self):
+        return self.rng.choice(self.post_ids) if self.post_ids else "000000000000000000000000"
+
+    def do(self, action):
+        rng = self.rng
+        if action == "list":
+            board = rng.choice(BOARDS + [""])
+            q = urllib.parse.urlencode({"board": board, "per_page": 10, "include_total": "false"})
+            status, body = self.call(action, "GET", f"/api/posts?{q}")
+            self.next_cursor = self.data(body).get("next_cursor")
+        elif action == "list_next":
+            if not self.next_cursor:
+                return self.do("list")
+            q = urllib.parse.urlencode({"after": self.next_cursor, "per_page": 10, "include_total": "false"})
+            status, body = self.call(action, "GET", f"/api/posts?{q}")
+            self.next_cursor = self.data(body).get("next_cursor")
+        elif action == "hot":
+            q = urllib.parse.urlencode({"board": rng.choice(BOARDS + [""]), "limit": 10})
+            self.call(action, "GET", f"/api/posts/hot?{q}")
+        elif action == "detail":
+            self.call(action, "GET", f"/api/posts/{self.pick_post()}")
+        elif action == "view":
+            self.call(action, "GET", f"/api/posts/{self.pick_post()}/view")
+        elif action == "comments":
+            self.call(action, "GET", f"/api/posts/{self.pick_post()}/comments?per_page=20")
+        elif action == "like":
+            self.call(action, "POST", f"/api/posts/{self.pick_post()}/like")
+        elif action == "comment":
+            self.call(action, "POST", f"/api/posts/{self.pick_post()}/comments",
+                      json_body={"content": f"벤치 댓글 {rng.randrange(10 ** 6)}"})
+        elif action == "search":
+            q = urllib.parse.urlencode({"q": rng.choice(SEARCH_TERMS), "board": rng.choice(BOARDS)})
+            self.call(action, "GET", f"/api/search?{q}")
+        elif action == "login":
+            self.login()
+        elif action == "upload":
+            status, body = self.call(
+                action, "POST", "/api/posts",
+                form={"title": "벤치 업로드", "content": "이미지 업로드 부하 테스트", "board": rng.choice(BOARDS)},
+                files=[("images", ("bench.png", tiny_png(rng), "image/png"))],
+            )
+            created = self.data(body)
+            if status == 201 and created.get("id"):
+                self.own_posts.append(created["id"])
+                self.uploaded.extend(created.get("images", []))
+        elif action == "image":
+            if not self.uploaded:
+                return self.do("detail")
+            self.call(action, "GET", rng.choice(self.uploaded))
+        elif action == "delete":
+            if not self.own_posts:
+                return self.do("detail")
+            self.call(action, "DELETE", f"/api/posts/{self.own_posts.pop()}")
+        elif action == "health":
+            self.call(action, "GET", "/api/health")
+
+    def login(self):
+        self.call("login", "POST", "/api/login", json_body={"username": self.name, "password": self.password})
+
+    def run(self, deadline, weights, think_ms):
+        names, w = zip(*weights.items())
+        self.login()
+        while time.monotonic() < deadline:
+            self.do(self.rng.choices(names, w)[0])
+            if think_ms:
+                time.sleep(think_ms / 1000)
+
+# ── 실행 ──
+def parse_mix(text):
+    weights = {name: w for name, (_, w) in ACTIONS.items()}
+    for part in filter(None, (text or "").split(",")):
+        name, _, value = part.partition("=")
+        if name not in ACTIONS:
+            raise SystemExit(f"알 수 없는 동작: {name} (가능: {', '.join(ACTIONS)})")
+        weights[name] = float(value)
+    return {k: v for k, v in weights.items() if v > 0}
+
+def discover_post_ids(client, pages=20):
+    ids, cursor = [], None
+    for _ in range(pages):
+        q = {"per_page": 50, "include_total": "false", **({"after": cursor} if cursor else {})}
+        status, body = client.request("GET", f"/api/posts?{urllib.parse.urlencode(q)}")
+        data = json.loads(body).get("data") or {} if status == 200 else {}
+        ids += [p["id"] for p in data.get("items", [])]
+        cursor = data.get("next_cursor")
+        if not cursor:
+            break
+    return ids
+
+def load_app():
+    import app as app_module
+    return app_module, app_module.create_app()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", help="실행 중인 서버 주소 (없으면 프로세스 내 실행)")
+    ap.add_argument("--mongodb-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27018/miniproject_bench"))
+    ap.add_argument("--users", type=int, default=20, help="동시 사용자(스레드) 수")
+    ap.add_argument("--seconds", type=float, default=20)
+    ap.add_argument("--think-ms", type=float, default=0)
+    ap.add_argument("--mix", help="동작 가중치 덮어쓰기: like=20,upload=0 ...")
+    ap.add_argument("--skip-seed", action="store_true")
+    ap.add_argument("--seed-users", type=int, default=100)
+    ap.add_argument("--posts-per-board", type=int, default=500)
+    ap.add_argument("--comments-per-post", type=int, default=5)
+    ap.add_argument("--likes-per-post", type=int, default=3)
+    ap.add_argument("--password", default="bench-password")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default="bench_output.json")
+    ap.add_argument("--baseline", help="이전 결과 JSON 과 p99/rps 비교")
+    args = ap.parse_args()
+
+    weights = parse_mix(args.mix)
+    if not args.skip_seed and args.users > args.seed_users:
+        raise SystemExit("--users 는 --seed-users 이하여야 합니다 (사용자마다 계정 하나).")
+    os.environ["MONGODB_URI"] = args.mongodb_uri
+    import seed as seeder
+
+    if args.url:
+        make_client = lambda: HttpClient(args.url)  # noqa: E731
+        seed_db = None
+        if not args.skip_seed:
+            from pymongo import MongoClient
+            seed_db = MongoClient(args.mongodb_uri).get_default_database()
+    else:
+        app_module, flask_app = load_app()
+        make_client = lambda: InProcessClient(flask_app)  # noqa: E731
+        seed_db = app_module.db
+
+    dataset = {}
+    if not args.skip_seed:
+        dataset = seeder.seed(seed_db, args.seed_users, args.posts_per_board, args.comments_per_post,
+                              args.likes_per_post, args.password)
+        post_ids = dataset.pop("post_ids")
+    else:
+        post_ids = discover_post_ids(make_client())
+
+    recorder = common.Recorder()
+    deadline = time.monotonic() + args.seconds
+    sims = [SimUser(i, make_client(), recorder, post_ids, args.password, random.Random(args.seed + i))
+            for i in range(args.users)]
+    threads = [threading.Thread(target=s.run, args=(deadline, weights, args.think_ms)) for s in sims]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    endpoints = recorder.summary(elapsed)
+    failed = {name: e["errors"] for name, e in endpoints.items() if e["errors"]}
+    text = common.write_report(args.out, {
+        "mode": "http" if args.url else "inprocess",
+        "config": {"users": args.users, "seconds": args.seconds, "think_ms": args.think_ms, "mix": weights},
+        "dataset": dataset,
+        "elapsed_s": round(elapsed, 2),
+        "total_rps": round(sum(e["requests"] for e in endpoints.values()) / elapsed, 2),
+        "endpoints": endpoints,
+        "failed": failed,
+    })
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            base = json.load(f)
+        print(f"\n비교 기준: {base.get('commit')} → 현재: {common.git_revision()}")
+        for name, cur in endpoints.items():
+            old = base.get("endpoints", {}).get(name)
+            if not old or not old.get("p99_ms") or not cur.get("p99_ms"):
+                continue
+            print(f"  {name:34} p99 {old['p99_ms']:>8} → {cur['p99_ms']:>8} ms "
+                  f"({(cur['p99_ms'] / old['p99_ms'] - 1) * 100:+.1f}%)   "
+                  f"rps {old['rps']:>8} → {cur['rps']:>8}")
+
+    if failed:
+        # 오류 응답의 지연은 의미가 없으므로 결과를 성공으로 취급하지 않는다
+        print(f"\n5xx/연결 실패 응답: {failed}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+벤치마크용 데이터셋 시드
+
+users / posts(게시판별) / comments / likes 를 직접 bulk insert 하고,
+파생 필드(likes_count, comments_count, 검색 필드, counters)를 앱과 같은 규칙으로 맞추고
+마이그레이션(인덱스)까지 적용한다.
+모든 사용자의 비밀번호는 --password 하나 (해시는 한 번만 계산해서 공유).
+해시 비용은 앱과 같은 BCRYPT_ROUNDS → 로그인 측정 중에 재해시(쓰기)가 끼어들지 않는다.
+기존 데이터는 파생/운영용 컬렉션(버전, 인기글, 업로드 참조, 작업 큐)까지 함께 지운다.
+
+사용 예:
+  python bench/seed.py --mongodb-uri mongodb://localhost:27018/miniproject_bench \\
+      --users 200 --posts-per-board 2000 --comments-per-post 5 --likes-per-post 3
+"""
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import bcrypt
+from bson import ObjectId
+
+import common  # noqa: F401  (앱 모듈 import 경로 설정)
+import counters
+import hashing
+import hot
+import jobs
+import migrations
+import search
+import uploads
+import versions
+
+BOARDS = ["Cafeteria", "Outside", "Delivery"]
+WORDS = ("학식 메뉴 식당 점심 저녁 배달 치킨 피자 떡볶이 김밥 라면 국밥 맛집 추천 후기 "
+         "가격 오늘 같이 먹을 사람 주문 할인 리뷰 포장 정글 lunch dinner pizza coffee").split()
+USER_PREFIX = "bench_user_"
+
+def username(i: int) -> str:
+    return f"{USER_PREFIX}{i}"
+
+def _text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def seed(db, users=100, posts_per_board=500, comments_per_post=5, likes_per_post=3,
+         password="bench-password", rounds=None, batch=2000, seed_value=7, drop=True) -> dict:
+    rng = random.Random(seed_value)
+    rounds = rounds or hashing.from_env().rounds
+    if drop:
+        for name in ("users", "posts", "comments", "likes", counters.COLLECTION, migrations.COLLECTION,
+                     versions.COLLECTION, hot.COLLECTION, uploads.COLLECTION, jobs.COLLECTION):
+            db.drop_collection(name)
+
+    pw_hash = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds))
+    db["users"].insert_many(
+        [{"username": username(i), "passwordHash": pw_hash} for i in range(users)], ordered=False
+    )
+
+    now = datetime.utcnow()
+    post_ids = []
+    post_docs, comment_docs, like_docs = [], [], []
+
+    def flush(force=False):
+        for coll, docs in (("posts", post_docs), ("comments", comment_docs), ("likes", like_docs)):
+            if docs and (force or len(docs) >= batch):
+                db[coll].insert_many(docs, ordered=False)
+                docs.clear()
+
+    seq = 0
+    for board in BOARDS:
+        for _ in range(posts_per_board):
+            seq += 1
+            pid = ObjectId()
+            created = now - timedelta(seconds=seq * 7)
+            title = _text(rng, rng.randint(2, 6))
+            content = _text(rng, rng.randint(10, 60))
+            n_comments = rng.randint(0, comments_per_post * 2)
+            likers = rng.sample(range(users), min(users, rng.randint(0, likes_per_post * 2)))
+            post_docs.append({
+                "_id": pid, "title": title, "content": content, "board": board,
+                "author": username(rng.randrange(users)), "created_at": created,
+                "images": [], "image_variants": [],
+                "likes_count": len(likers), "comments_count": n_comments,
+                search.EXCERPT_FIELD: search.excerpt(content),
+                **search.post_fields(title, content),
+            })
+            for c in range(n_comments):
+                body = _text(rng, rng.randint(3, 20))
+                comment_docs.append({
+                    "post_id": pid, "board": board, "author": username(rng.randrange(users)),
+                    "content": body, "created_at": created + timedelta(seconds=c + 1),
+                    **search.comment_fields(body),
+                })
+            like_docs.extend({"post_id": pid, "username": username(u), "created_at": created}
+                             for u in likers)
+            post_ids.append(str(pid))
+            flush()
+    flush(force=True)
+
+    migrations.migrate(db)  # 인덱스는 적재 후에 한 번에 만드는 편이 빠르다
+    counters.rebuild(db)
+    return {
+        "users": users,
+        "posts": len(post_ids),
+        "comments": db["comments"].estimated_document_count(),
+        "likes": db["likes"].estimated_document_count(),
+        "post_ids": post_ids,
+    }
+
+def main():
+    from pymongo import MongoClient
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mongodb-uri", default="mongodb://localhost:27018/miniproject_bench")
+    ap.add_argument("--users", type=int, default=100)
+    ap.add_argument("--posts-per-board", type=int, default=500)
+    ap.add_argument("--comments-per-post", type=int, default=5)
+    ap.add_argument("--likes-per-post", type=int, default=3)
+    ap.add_argument("--password", default="bench-password")
+    args = ap.parse_args()
+
+    db = MongoClient(args.mongodb_uri).get_default_database()
+    result = seed(db, args.users, args.posts_per_board, args.comments_per_post,
+                  args.likes_per_post, args.password)
+    result.pop("post_ids")
+    print(f"시드 완료: {result}")
+
+if __name__ == "__main__":
+    main()
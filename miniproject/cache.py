@@ -0,0 +1,139 @@
+"""
+읽기 캐시 (read-through)
+
+게시글 상세/목록 키에는 versions.py 의 버전이 들어간다. 쓰기 때 버전이 오르면 다음 읽기는
+새 키를 보므로 프로세스마다 따로 무효화할 필요가 없고, 예전 키는 TTL/LRU 로 사라진다.
+(ETag 와 같은 버전을 쓰므로 "새 ETag + 예전 본문" 조합이 나가지 않는다.)
+
+백엔드
+  - MemoryBackend : 프로세스 내 dict, LRU 축출 + TTL (기본)
+  - RedisBackend  : redis-py 호환 클라이언트 (CACHE_BACKEND=redis, REDIS_URL)
+
+값은 JSON 으로 직렬화 가능한 dict/list 만 넣는다 (Redis 백엔드와 호환되도록).
+Memory 백엔드는 저장한 객체를 그대로 돌려주므로 호출 측에서 수정하지 말 것.
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+MISS = object()
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, max_entries: int = 2048, ttl: float = 30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return MISS
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return MISS
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def size(self) -> int:
+        return len(self._data)
+
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float = 30, namespace: str = "miniproject:"):
+        import redis  # 선택 의존성: CACHE_BACKEND=redis 일 때만 필요
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.namespace = namespace
+        self.evictions = 0  # Redis 가 자체 maxmemory 정책으로 관리
+
+    def get(self, key):
+        raw = self.client.get(self.namespace + key)
+        return MISS if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self.client.set(self.namespace + key, json.dumps(value, ensure_ascii=False),
+                        px=max(int(ttl * 1000), 1))
+
+    def size(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.namespace}*", count=500))
+
+class Cache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, key: str, loader, ttl=None):
+        """캐시에 있으면 그대로, 없으면 loader() 결과를 저장 후 반환 (None 은 저장 안 함)."""
+        value = self.backend.get(key)
+        if value is not MISS:
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value, ttl)
+        return value
+
+    async def get_or_load_async(self, key: str, loader, ttl=None):
+        """asgi.py 용: loader 가 코루틴 함수. 백엔드 get/set 자체는 그대로(메모리는 즉시, redis 는 짧게 블로킹)."""
+        value = self.backend.get(key)
+        if value is not MISS:
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        value = await loader()
+        if value is not None:
+            self.backend.set(key, value, ttl)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.backend.evictions,
+            "size": self.backend.size(),
+            "ttl": self.backend.ttl,
+        }
+
+def from_env() -> Cache:
+    ttl = float(os.getenv("CACHE_TTL", "30"))
+    if os.getenv("CACHE_BACKEND", "memory").lower() == "redis":
+        backend = RedisBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"), ttl=ttl)
+    else:
+        backend = MemoryBackend(int(os.getenv("CACHE_MAX_ENTRIES", "2048")), ttl=ttl)
+    return Cache(backend)
+
+# ── 키 규칙 ──
+def post_key(post_id, version: int) -> str:
+    return f"post:{post_id}:v{version}"
+
+def list_key(board, version, *parts) -> str:
+    return f"posts:{board or ''}:" + ":".join([f"v{version}", *map(str, parts)])
@@ -0,0 +1,98 @@
+"""
+비정규화 카운터 (counters 컬렉션)
+
+쓰기 시점에 $inc 로 유지해서 목록/헬스 체크에서 count_documents 를 없앤다.
+
+문서 형태: {"_id": <key>, "n": <int>}
+  - "posts"               : 전체 게시글 수
+  - "posts:<board>"       : 게시판별 게시글 수
+  - "users"               : 전체 회원 수
+게시글별 댓글 수는 게시글 문서의 comments_count 필드로 유지한다
+(댓글 작성 시 댓글을 먼저 넣고 나서 $inc → 넣기가 실패해도 수가 부풀지 않는다).
+
+값이 어긋났을 때는 rebuild() (flask reconcile-counters) 로 처음부터 다시 계산한다.
+"""
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+COLLECTION = "counters"
+
+POSTS = "posts"
+USERS = "users"
+
+def board_key(board: str) -> str:
+    return f"{POSTS}:{board}"
+
+def incr(db, *keys: str, by: int = 1) -> None:
+    """여러 키를 한 번의 bulk_write 로 원자적으로 증감 (키 단위 원자성)."""
+    if not keys:
+        return
+    ops = [UpdateOne({"_id": key}, {"$inc": {"n": by}}, upsert=True) for key in keys]
+    db[COLLECTION].bulk_write(ops, ordered=False)
+
+def from_doc(doc) -> int:
+    return max(doc["n"], 0) if doc else 0
+
+def get(db, key: str) -> int:
+    return from_doc(db[COLLECTION].find_one({"_id": key}, {"n": 1}))
+
+def rebuild(db, batch_size: int = 1000) -> dict:
+    """
+    posts/users/comments/likes 컬렉션을 전수 집계해서 카운터와
+    posts.comments_count / posts.likes_count 를 다시 만든다.
+    이번 집계에서 갱신되지 않은 카운터(사라진 게시판)는 0 처리.
+    """
+    coll = db[COLLECTION]
+    stamp = datetime.utcnow()
+    summary = {"posts": 0, "boards": 0, "users": 0, "comment_counts_fixed": 0, "like_counts_fixed": 0}
+    ops = []
+
+    def put(key, n):
+        ops.append(UpdateOne({"_id": key}, {"$set": {"n": n, "reconciled_at": stamp}}, upsert=True))
+        if len(ops) >= batch_size:
+            coll.bulk_write(ops, ordered=False)
+            ops.clear()
+
+    total_posts = 0
+    for row in db["posts"].aggregate([{"$group": {"_id": "$board", "n": {"$sum": 1}}}]):
+        put(board_key(row["_id"]), row["n"])
+        total_posts += row["n"]
+        summary["boards"] += 1
+    put(POSTS, total_posts)
+    summary["posts"] = total_posts
+
+    summary["users"] = db["users"].count_documents({})
+    put(USERS, summary["users"])
+
+    if ops:
+        coll.bulk_write(ops, ordered=False)
+
+    stale = {"reconciled_at": {"$ne": stamp}}
+    coll.update_many({**stale, "_id": {"$regex": f"^{POSTS}:"}}, {"$set": {"n": 0}})
+    coll.delete_many({"_id": {"$regex": "^comments:"}})  # 예전 방식(게시글별 댓글 카운터 문서) 정리
+
+    # 게시글 batch_size 개씩 댓글/좋아요 수를 집계해서 다른 값만 고친다 (메모리 일정)
+    def fix_counts(ids, source, field, summary_key):
+        rows = db[source].aggregate([
+            {"$match": {"post_id": {"$in": ids}}},
+            {"$group": {"_id": "$post_id", "n": {"$sum": 1}}},
+        ])
+        counts = {row["_id"]: row["n"] for row in rows}
+        fixes = [UpdateOne({"_id": pid, field: {"$ne": counts.get(pid, 0)}},
+                           {"$set": {field: counts.get(pid, 0)}}) for pid in ids]
+        summary[summary_key] += db["posts"].bulk_write(fixes, ordered=False).modified_count
+
+    def fix_post_counts(ids):
+        fix_counts(ids, "comments", "comments_count", "comment_counts_fixed")
+        fix_counts(ids, "likes", "likes_count", "like_counts_fixed")
+
+    ids = []
+    for doc in db["posts"].find({}, {"_id": 1}).batch_size(batch_size):
+        ids.append(doc["_id"])
+        if len(ids) >= batch_size:
+            fix_post_counts(ids)
+            ids = []
+    if ids:
+        fix_post_counts(ids)
+    return summary
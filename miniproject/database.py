@@ -0,0 +1,124 @@
+"""
+프로세스별 지연 MongoDB 연결
+
+MongoClient 는 fork 후에 안전하지 않으므로 import 시점이 아니라 각 프로세스에서
+처음 쓰는 순간에 만든다 (gunicorn 워커마다 풀 하나). 모듈 전역에 두는 db/컬렉션은
+프록시라서 어느 프로세스에서 접근하든 그 프로세스의 클라이언트로 연결된다.
+
+풀 설정 (환경 변수 / app.config)
+  MONGO_MAX_POOL_SIZE      프로세스당 최대 연결 수. 요청 스레드 수 + JOB_WORKERS 정도면 충분
+  MONGO_MIN_POOL_SIZE      미리 유지할 연결 수
+  MONGO_MAX_IDLE_MS        유휴 연결을 닫기까지의 시간
+  MONGO_WAIT_QUEUE_TIMEOUT_MS  풀이 가득 찼을 때 연결을 기다리는 최대 시간
+  MONGO_CONNECT_TIMEOUT_MS / MONGO_SERVER_SELECTION_TIMEOUT_MS / MONGO_SOCKET_TIMEOUT_MS
+"""
+import os
+import threading
+
+from pymongo import MongoClient
+
+POOL_DEFAULTS = {
+    "MONGO_MAX_POOL_SIZE": 20,
+    "MONGO_MIN_POOL_SIZE": 0,
+    "MONGO_MAX_IDLE_MS": 60_000,
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": 2_000,
+    "MONGO_CONNECT_TIMEOUT_MS": 5_000,
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": 5_000,
+    "MONGO_SOCKET_TIMEOUT_MS": 30_000,
+}
+_CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+}
+
+def pool_settings_from_env() -> dict:
+    return {key: int(os.getenv(key, str(default))) for key, default in POOL_DEFAULTS.items()}
+
+def client_options(settings: dict) -> dict:
+    return {_CLIENT_OPTIONS[k]: v for k, v in settings.items() if k in _CLIENT_OPTIONS}
+
+def connect_async(uri: str, settings: dict, event_listeners=()):
+    """
+    비동기 드라이버(PyMongo AsyncMongoClient, pymongo 4.9+) 클라이언트 — asgi.py 용.
+    클라이언트는 만든 이벤트 루프에 묶이므로 워커의 루프 안(서버 시작 훅)에서 만든다.
+    """
+    from pymongo import AsyncMongoClient  # 동기 앱은 예전 pymongo 로도 돌 수 있도록 여기서 import
+    return AsyncMongoClient(uri, event_listeners=list(event_listeners), **client_options(settings))
+
+class LazyDatabase:
+    def __init__(self):
+        self._uri = os.getenv("MONGODB_URI", "mongodb://localhost:27018/miniproject")
+        self._options = client_options(pool_settings_from_env())
+        self._listeners = []
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, uri: str, settings: dict, event_listeners=()) -> None:
+        """create_app() 에서 호출. 이미 만든 클라이언트가 있으면 다음 접근 때 새 설정으로 다시 만든다."""
+        with self._lock:
+            self._uri = uri
+            self._options = client_options(settings)
+            self._listeners = list(event_listeners)
+            self._close_locked()
+
+    @property
+    def client(self) -> MongoClient:
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    # fork 로 물려받은 부모의 클라이언트는 닫지 않고 버린다 (부모 소켓 보호)
+                    self._client = MongoClient(self._uri, event_listeners=self._listeners, **self._options)
+                    self._pid = pid
+        return self._client
+
+    def get(self):
+        return self.client.get_default_database()
+
+    def __getitem__(self, name):
+        return self.get()[name]
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+    def collection(self, name: str) -> "LazyCollection":
+        return LazyCollection(self, name)
+
+    def _close_locked(self):
+        if self._client is not None and self._pid == os.getpid():
+            self._client.close()
+        self._client = None
+        self._pid = None
+
+    def close(self) -> bool:
+        with self._lock:
+            opened = self._client is not None and self._pid == os.getpid()
+            self._close_locked()
+            return opened
+
+class LazyCollection:
+    """모듈 전역 컬렉션 핸들 (users, posts ...). 속성 접근 때마다 현재 프로세스의 컬렉션으로 위임."""
+
+    def __init__(self, database: LazyDatabase, name: str):
+        self._database = database
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self._database[self._name], attr)
+
+    def __getitem__(self, sub):
+        return self._database[self._name][sub]
@@ -0,0 +1,174 @@
+"""
+게시글 실시간 이벤트 (SSE /api/posts/<id>/events 용 pub/sub)
+
+Broker: 토픽(게시글 id)별 구독자 큐. publish 는 막히지 않는다 — 느린 구독자의 큐가
+가득 차면 가장 오래된 이벤트를 버린다 (클라이언트는 다시 연결할 때 스냅샷으로 맞춤).
+subscribe(limit=N) 은 상한 확인과 등록을 한 락 안에서 하고, 넘치면 Full 을 던진다.
+상한은 스레드를 잡는 구독(동기 앱)과 asyncio 구독(asgi.py)을 따로 센다.
+넘친 요청에는 204 + Retry-After(FULL_RETRY_AFTER) 로 답한다 → EventSource 는 자동 재접속하지
+않으므로 클라이언트(PostView.js)가 그 간격 뒤에 다시 연결을 시도한다 (폴링).
+
+이벤트 소스 (EVENTS_SOURCE)
+  - local (기본)   : create_comment_api / like_post_api 가 같은 프로세스의 broker 에 직접 publish.
+                     워커가 여럿이면 다른 워커에서 일어난 변화는 전달되지 않는다.
+  - changestream   : 프로세스당 스레드 하나가 MongoDB change stream(레플리카 셋 필요)을 구독해서
+                     댓글 insert / 게시글 likes_count 변경을 broker 로 넘긴다. 모든 워커가 같은
+                     변화를 받으므로 다중 워커 배포용. 이때 라우트는 직접 publish 하지 않는다.
+"""
+import os
+import json
+import time
+import queue
+import asyncio
+import threading
+from collections import defaultdict
+
+from pymongo import errors
+
+SOURCE = os.getenv("EVENTS_SOURCE", "local").lower()
+QUEUE_SIZE = 100
+FULL_RETRY_AFTER = 30  # 초: 상한에 걸린 클라이언트가 다시 연결해 볼 간격
+
+class Full(Exception):
+    """구독 수가 상한에 도달한 경우"""
+
+def format_sse(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+class Subscription:
+    def __init__(self, broker, topic: str):
+        self.broker = broker
+        self.topic = topic
+        self.queue = queue.Queue(QUEUE_SIZE)
+
+    def get(self, timeout: float):
+        """다음 이벤트 (event_type, data). timeout 동안 없으면 None."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, event) -> None:
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()  # 가장 오래된 것 버림
+                except queue.Empty:
+                    pass
+
+    def close(self) -> None:
+        self.broker._unsubscribe(self)
+
+class AsyncSubscription(Subscription):
+    """
+    asyncio 용 (asgi.py): publish 는 어느 스레드에서든 올 수 있으므로
+    call_soon_threadsafe 로 이벤트 루프에 넘겨서 asyncio.Queue 에 넣는다.
+    대기 중에 스레드를 잡지 않으므로 연결 수가 스레드 수에 묶이지 않는다.
+    """
+
+    def __init__(self, broker, topic: str, loop):
+        self.broker = broker
+        self.topic = topic
+        self.loop = loop
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+
+    async def get(self, timeout: float):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def put(self, event) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘 (서버 종료 중)
+
+    def _put(self, event) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()  # 가장 오래된 것 버림
+        self.queue.put_nowait(event)
+
+class Broker:
+    def __init__(self):
+        self._subs = defaultdict(set)
+        self._counts = {Subscription: 0, AsyncSubscription: 0}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, loop=None, limit: int = None) -> Subscription:
+        """
+        loop 를 주면 asyncio 구독 (await sub.get(...)).
+        limit: 같은 종류의 구독이 이미 이만큼 있으면 등록하지 않고 Full.
+        """
+        sub = AsyncSubscription(self, topic, loop) if loop else Subscription(self, topic)
+        with self._lock:
+            if limit is not None and self._counts[type(sub)] >= limit:
+                raise Full()
+            self._subs[topic].add(sub)
+            self._counts[type(sub)] += 1
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._subs.get(sub.topic)
+            if subs and sub in subs:
+                subs.discard(sub)
+                self._counts[type(sub)] -= 1
+                if not subs:
+                    del self._subs[sub.topic]
+
+    def publish(self, topic: str, event_type: str, data: dict) -> int:
+        with self._lock:
+            subs = list(self._subs.get(topic, ()))
+        for sub in subs:
+            sub.put((event_type, data))
+        return len(subs)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(self._counts.values())
+
+# ── change stream 소스 ──
+_watch_lock = threading.Lock()
+_watch_pid = None
+
+def ensure_change_stream(db, broker: Broker, comment_to_json) -> None:
+    """현재 프로세스에서 change stream 스레드를 한 번만 띄운다 (fork 후 자식에서도 새로)."""
+    global _watch_pid
+    if _watch_pid == os.getpid():
+        return
+    with _watch_lock:
+        if _watch_pid == os.getpid():
+            return
+        threading.Thread(target=_watch, args=(db, broker, comment_to_json),
+                         name="events-change-stream", daemon=True).start()
+        _watch_pid = os.getpid()
+
+def _watch(db, broker: Broker, comment_to_json) -> None:
+    pipeline = [{"$match": {"$or": [
+        {"ns.coll": "comments", "operationType": "insert"},
+        {"ns.coll": "posts", "operationType": "update",
+         "updateDescription.updatedFields.likes_count": {"$exists": True}},
+    ]}}]
+    resume_token = None
+    while True:
+        try:
+            with db.watch(pipeline, resume_after=resume_token) as stream:
+                for change in stream:
+                    resume_token = stream.resume_token
+                    if change["ns"]["coll"] == "comments":
+                        doc = change["fullDocument"]
+                        broker.publish(str(doc["post_id"]), "comment", comment_to_json(doc))
+                    else:
+                        post_id = change["documentKey"]["_id"]
+                        likes_count = change["updateDescription"]["updatedFields"]["likes_count"]
+                        broker.publish(str(post_id), "like", {"likes_count": likes_count})
+        except errors.PyMongoError as e:
+            # 재개 토큰이 oplog 에서 밀려났으면 처음부터 (그 사이 이벤트는 유실 → 재접속 스냅샷으로 보정)
+            if isinstance(e, errors.OperationFailure) and e.code == 286:
+                resume_token = None
+            print(f"change stream 오류, 재연결합니다: {e}")
+            time.sleep(2)
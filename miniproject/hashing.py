@@ -0,0 +1,117 @@
+"""
+비밀번호 해시(bcrypt) 전용 작업 풀
+
+bcrypt 는 해시 계산 중 GIL 을 놓기 때문에 스레드 풀에서 돌려도 다른 요청 스레드를
+막지 않는다. 동시에 처리 + 대기할 수 있는 작업 수를 (workers + queue_limit) 로
+제한하고, 넘치면 기다리지 않고 PoolBusy 를 던져서 호출 측이 바로 503 을 돌려준다.
+
+설정 (환경 변수)
+  - BCRYPT_ROUNDS    : 해시 비용 (기본 12). 바뀌면 로그인 성공 시 자동 재해시
+  - HASH_WORKERS     : 해시 스레드 수 (기본 CPU 코어 수)
+  - HASH_QUEUE_LIMIT : 풀이 바쁠 때 추가로 대기시킬 작업 수 (기본 32)
+  - HASH_TIMEOUT     : 요청 스레드가 결과를 기다리는 최대 시간(초, 기본 10)
+"""
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import bcrypt
+
+class PoolBusy(Exception):
+    """해시 풀과 대기열이 모두 찬 경우"""
+
+def cost_of(hashed: bytes) -> int:
+    # $2b$12$<salt+hash>
+    return int(hashed.split(b"$")[2])
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+class HashPool:
+    def __init__(self, rounds: int = 12, workers: int = None,
+                 queue_limit: int = 32, timeout: float = 10):
+        self.rounds = rounds
+        self.workers = workers or os.cpu_count() or 2
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+        self._slots = None
+
+    def _ensure(self):
+        # fork 후 자식 프로세스에서는 스레드가 없으므로 풀을 새로 만든다
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="bcrypt")
+                    self._slots = threading.BoundedSemaphore(self.workers + self.queue_limit)
+                    self._pid = os.getpid()
+
+    def _submit(self, fn, *args):
+        self._ensure()
+        if not self._slots.acquire(blocking=False):
+            raise PoolBusy()
+        slots = self._slots
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def _run(self, fn, *args):
+        try:
+            return self._submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeout:
+            raise PoolBusy()
+
+    def hash(self, password: str) -> bytes:
+        return self._run(_hash, password.encode("utf-8"), self.rounds)
+
+    def verify(self, password: str, hashed: bytes) -> bool:
+        return self._run(_check, password.encode("utf-8"), hashed)
+
+    async def verify_async(self, password: str, hashed: bytes) -> bool:
+        """asgi.py 용: 풀 스레드에서 검사하는 동안 이벤트 루프는 다른 요청을 처리한다"""
+        future = asyncio.wrap_future(self._submit(_check, password.encode("utf-8"), hashed))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise PoolBusy()
+
+    def needs_rehash(self, hashed: bytes) -> bool:
+        return cost_of(hashed) != self.rounds
+
+    def rehash_later(self, password: str, on_done) -> bool:
+        """
+        현재 비용으로 재해시를 백그라운드에 맡긴다 (응답은 기다리지 않음).
+        풀이 바쁘면 건너뛰고 False — 다음 로그인 때 다시 시도된다.
+        """
+        try:
+            future = self._submit(_hash, password.encode("utf-8"), self.rounds)
+        except PoolBusy:
+            return False
+
+        def done(f):
+            if f.exception() is None:
+                try:
+                    on_done(f.result())
+                except Exception as e:
+                    print(f"재해시 저장 오류: {e}")
+        future.add_done_callback(done)
+        return True
+
+def from_env() -> HashPool:
+    workers = os.getenv("HASH_WORKERS")
+    return HashPool(
+        rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+        workers=int(workers) if workers else None,
+        queue_limit=int(os.getenv("HASH_QUEUE_LIMIT", "32")),
+        timeout=float(os.getenv("HASH_TIMEOUT", "10")),
+    )
@@ -0,0 +1,133 @@
+"""
+게시판별 인기글 랭킹 (hot_posts 컬렉션, 시간 감쇠 점수)
+
+문서 형태: {"_id": <post_id>, "board", "score", "at", "rank"}
+  - score : 마지막 갱신 시각(at) 기준 감쇠 점수. HALF_LIFE 마다 절반이 된다.
+  - rank  : log2(score) + at / HALF_LIFE
+    현재 시각 T 의 점수는 log2(score · 2^-(T-at)/H) = rank - T/H 이므로
+    rank 순서 = 현재 점수 순서. 시간이 지나도 순서를 다시 계산할 필요가 없다.
+
+이벤트(좋아요 ±LIKE_WEIGHT, 댓글 +COMMENT_WEIGHT, 새 글 +POST_WEIGHT)마다
+파이프라인 update 한 번으로 원자적으로 감쇠 + 가산 + rank 재계산을 한다.
+조회는 (board, rank) 인덱스로 상위 N 개만 읽고, compact() 가 주기적으로
+점수가 사실상 0 이 된 글과 게시판별 KEEP_PER_BOARD 밖의 글을 지운다.
+"""
+import os
+import math
+from datetime import datetime, timedelta
+
+from pymongo import DESCENDING, UpdateOne
+
+import versions
+
+COLLECTION = "hot_posts"
+HALF_LIFE = timedelta(hours=float(os.getenv("HOT_HALF_LIFE_HOURS", "24")))
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+POST_WEIGHT = 1.0
+MIN_SCORE = 0.05          # 이보다 작아진 글은 compact 때 삭제
+KEEP_PER_BOARD = 500
+COMPACT_INTERVAL = int(os.getenv("HOT_COMPACT_SECONDS", "600"))
+_FLOOR = 1e-6             # 좋아요 취소로 0 이하가 돼도 log 가 가능하도록
+
+_H_MS = HALF_LIFE.total_seconds() * 1000
+_EPOCH = datetime(1970, 1, 1)
+
+def ensure_indexes(db) -> None:
+    coll = db[COLLECTION]
+    coll.create_index([("board", 1), ("rank", DESCENDING)])
+    coll.create_index([("rank", DESCENDING)])
+
+def _time_term(at: datetime) -> float:
+    return (at - _EPOCH).total_seconds() * 1000 / _H_MS
+
+def current_score(doc: dict, now: datetime = None) -> float:
+    now = now or datetime.utcnow()
+    return doc["score"] * 2 ** (-(now - doc["at"]).total_seconds() * 1000 / _H_MS)
+
+def record_pipeline(board: str, weight: float) -> list:
+    """이벤트 하나 반영: score ← score·2^-(now-at)/H + weight (upsert 로 쓰는 update 파이프라인)"""
+    decayed = {"$multiply": [
+        {"$ifNull": ["$score", 0]},
+        {"$pow": [0.5, {"$divide": [{"$subtract": ["$$NOW", {"$ifNull": ["$at", "$$NOW"]}]}, _H_MS]}]},
+    ]}
+    return [
+        {"$set": {"board": board, "score": {"$max": [{"$add": [decayed, weight]}, _FLOOR]}, "at": "$$NOW"}},
+        {"$set": {"rank": {"$add": [{"$log": ["$score", 2]}, {"$divide": [{"$toLong": "$at"}, _H_MS]}]}}},
+    ]
+
+def record(db, post_id, board: str, weight: float) -> None:
+    db[COLLECTION].update_one({"_id": post_id}, record_pipeline(board, weight), upsert=True)
+
+def remove(db, post_id) -> None:
+    db[COLLECTION].delete_one({"_id": post_id})
+
+def top(db, board: str = None, limit: int = 10) -> list:
+    """[(post_id, 현재 점수)] 순위순"""
+    query = {"board": board} if board else {}
+    now = datetime.utcnow()
+    cur = db[COLLECTION].find(query, {"score": 1, "at": 1}).sort("rank", DESCENDING).limit(limit)
+    return [(d["_id"], current_score(d, now)) for d in cur]
+
+def compact(db, keep: int = KEEP_PER_BOARD) -> int:
+    """
+    감쇠로 MIN_SCORE 아래로 떨어진 글과 게시판별 상위 keep 밖의 글 삭제. 삭제 수 반환.
+    지운 글이 있는 게시판은 버전을 올려서 /api/posts/hot 의 캐시/ETag 가 바로 바뀌게 한다.
+    """
+    coll = db[COLLECTION]
+    floor = math.log2(MIN_SCORE) + _time_term(datetime.utcnow())
+    touched = set(coll.distinct("board", {"rank": {"$lt": floor}}))
+    removed = coll.delete_many({"rank": {"$lt": floor}}).deleted_count
+    for board in coll.distinct("board"):
+        edge = list(coll.find({"board": board}, {"rank": 1}).sort("rank", DESCENDING).skip(keep).limit(1))
+        if edge:
+            n = coll.delete_many({"board": board, "rank": {"$lte": edge[0]["rank"]}}).deleted_count
+            if n:
+                touched.add(board)
+                removed += n
+    if touched:
+        versions.bump(db, *(versions.board_key(b) for b in touched), versions.board_key(None))
+    return removed
+
+def rebuild(db, batch_size: int = 1000) -> int:
+    """
+    posts/likes/comments 의 created_at 으로 처음부터 다시 계산 (마이그레이션/복구용).
+    MIN_SCORE 아래로 감쇠했을 기간보다 오래된 이벤트는 읽지 않는다.
+    """
+    now = datetime.utcnow()
+    since = now - HALF_LIFE * math.log2(max(LIKE_WEIGHT, COMMENT_WEIGHT, POST_WEIGHT) / MIN_SCORE)
+    scores, boards = {}, {}
+
+    def add(post_id, weight, at):
+        scores[post_id] = scores.get(post_id, 0.0) + weight * 2 ** (-(now - at).total_seconds() * 1000 / _H_MS)
+
+    for p in db["posts"].find({"created_at": {"$gte": since}}, {"board": 1, "created_at": 1}):
+        boards[p["_id"]] = p["board"]
+        add(p["_id"], POST_WEIGHT, p["created_at"])
+    for c in db["comments"].find({"created_at": {"$gte": since}}, {"post_id": 1, "created_at": 1}):
+        add(c["post_id"], COMMENT_WEIGHT, c["created_at"])
+    for l in db["likes"].find({"created_at": {"$gte": since}}, {"post_id": 1, "created_at": 1}):
+        add(l["post_id"], LIKE_WEIGHT, l["created_at"])
+
+    # 오래된 글에 달린 최근 댓글/좋아요: 게시판을 따로 조회
+    missing = [pid for pid in scores if pid not in boards]
+    for i in range(0, len(missing), batch_size):
+        for p in db["posts"].find({"_id": {"$in": missing[i:i + batch_size]}}, {"board": 1}):
+            boards[p["_id"]] = p["board"]
+
+    coll = db[COLLECTION]
+    coll.delete_many({})
+    ops = []
+    for post_id, score in scores.items():
+        if post_id not in boards or score < MIN_SCORE:
+            continue  # 삭제된 글 / 이미 식은 글
+        ops.append(UpdateOne({"_id": post_id}, {"$set": {
+            "board": boards[post_id], "score": score, "at": now,
+            "rank": math.log2(score) + _time_term(now),
+        }}, upsert=True))
+        if len(ops) >= batch_size:
+            coll.bulk_write(ops, ordered=False)
+            ops.clear()
+    if ops:
+        coll.bulk_write(ops, ordered=False)
+    return coll.estimated_document_count()
@@ -0,0 +1,87 @@
+"""
+업로드 이미지 변형본(썸네일 / WebP) 생성
+
+make_variants() 는 프로세스 풀 워커에서 실행된다. 요청 스레드는 작업만 넘기고
+바로 응답하며, 완료 콜백이 게시글 문서에 변형본 URL 을 기록한다.
+
+Pillow 가 설치되어 있지 않으면 변형본 생성은 건너뛴다 (원본만 제공).
+설정: IMAGE_WORKERS (기본 2)
+
+워커 프로세스는 forkserver 로 띄운다. 이 풀은 bcrypt 풀/작업 워커/Mongo 모니터 스레드가
+이미 돌고 있는 웹 프로세스 안에서 만들어지므로, 그대로 fork 하면 자식이 다른 스레드가 잡고
+있던 락을 물려받아 멈출 수 있다.
+"""
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # 선택 의존성
+    Image = None
+
+THUMB_PX = 320    # 목록 카드용
+WEB_PX = 1280     # 상세 보기용
+
+def enabled() -> bool:
+    return Image is not None
+
+def _save_webp(im, max_px: int, path: str) -> None:
+    copy = im.copy()
+    copy.thumbnail((max_px, max_px))
+    copy.save(path, "WEBP", quality=80, method=4)
+
+def variant_names(filename: str) -> dict:
+    """원본 파일명 → {"thumb": <이름>_w320.webp, "webp": <이름>_w1280.webp}"""
+    stem = os.path.splitext(filename)[0]
+    return {"thumb": f"{stem}_w{THUMB_PX}.webp", "webp": f"{stem}_w{WEB_PX}.webp"}
+
+def make_variants(src_path: str) -> dict:
+    """
+    src_path 옆에 변형본 두 개를 만들고 variant_names() 결과를 반환. (워커 프로세스에서 실행)
+    """
+    folder, filename = os.path.split(src_path)
+    names = variant_names(filename)
+    with Image.open(src_path) as im:
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+        _save_webp(im, THUMB_PX, os.path.join(folder, names["thumb"]))
+        _save_webp(im, WEB_PX, os.path.join(folder, names["webp"]))
+    return names
+
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+
+def _executor() -> ProcessPoolExecutor:
+    global _pool, _pool_pid
+    if _pool_pid != os.getpid():
+        with _lock:
+            if _pool_pid != os.getpid():
+                _pool = ProcessPoolExecutor(max_workers=int(os.getenv("IMAGE_WORKERS", "2")),
+                                            mp_context=multiprocessing.get_context("forkserver"))
+                _pool_pid = os.getpid()
+    return _pool
+
+def schedule(src_path: str, on_done) -> bool:
+    """변형본 생성을 백그라운드 프로세스에 맡긴다. on_done(names) 는 부모 프로세스에서 호출."""
+    if not enabled():
+        return False
+
+    def done(future):
+        if future.exception() is not None:
+            print(f"이미지 변형 실패 ({src_path}): {future.exception()}")
+            return
+        try:
+            on_done(future.result())
+        except Exception as e:
+            print(f"이미지 변형 결과 저장 오류 ({src_path}): {e}")
+
+    _executor().submit(make_variants, src_path).add_done_callback(done)
+    return True
+
+def shutdown() -> None:
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,170 @@
+"""
+Mongo 기반 로컬 작업 큐
+
+요청에서 오래 걸리는 정리 작업(연쇄 삭제, 파일 삭제 등)을 jobs 컬렉션에 넣고
+워커 스레드가 꺼내서 처리한다. 서버가 죽어도 작업은 컬렉션에 남아 있으므로
+다음 워커가 이어서 처리한다.
+
+jobs 문서:
+  {"_id", "type", "payload", "status": queued|running|done|failed,
+   "attempts", "run_at", "locked_until", "error", "created_at", "finished_at"}
+
+- 꺼낼 때 locked_until(리스)을 걸고, 리스가 지난 running 작업은 다시 꺼낼 수 있다.
+- 실패하면 지수 백오프로 재시도, MAX_ATTEMPTS 를 넘기면 failed.
+- 핸들러는 멱등이어야 한다 (같은 작업이 두 번 실행될 수 있음).
+- 주기 작업: jobs.every("hot.compact", 600) 로 등록하면 워커들 중 하나만 주기마다 큐에 넣는다
+  (job_schedules 컬렉션의 next_run 을 원자적으로 밀어낸 쪽이 등록).
+"""
+import os
+import time
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING, ReturnDocument, errors
+
+COLLECTION = "jobs"
+MAX_ATTEMPTS = 5
+LEASE = timedelta(minutes=5)
+POLL_INTERVAL = 1.0          # 큐가 비었을 때 대기(초)
+KEEP_DONE = 7 * 24 * 3600    # 완료된 작업 보관 기간(초, TTL 인덱스)
+SCHEDULES = "job_schedules"
+SCHEDULE_CHECK = 30.0        # 프로세스당 주기 작업 확인 간격(초)
+
+_handlers = {}
+_schedules = {}  # job_type -> 주기(초)
+
+def handler(job_type: str):
+    """@jobs.handler("post.cascade") 로 작업 종류별 처리 함수 등록"""
+    def register(fn):
+        _handlers[job_type] = fn
+        return fn
+    return register
+
+def every(job_type: str, seconds: float) -> None:
+    """주기 작업 등록 (핸들러는 @handler 로 따로 등록)"""
+    _schedules[job_type] = seconds
+
+def ensure_indexes(db) -> None:
+    coll = db[COLLECTION]
+    coll.create_index([("status", ASCENDING), ("run_at", ASCENDING)])
+    coll.create_index([("status", ASCENDING), ("locked_until", ASCENDING)])
+    coll.create_index("finished_at", expireAfterSeconds=KEEP_DONE)
+
+def enqueue(db, job_type: str, payload: dict, delay: float = 0) -> None:
+    now = datetime.utcnow()
+    db[COLLECTION].insert_one({
+        "type": job_type,
+        "payload": payload,
+        "status": "queued",
+        "attempts": 0,
+        "run_at": now + timedelta(seconds=delay),
+        "created_at": now,
+    })
+
+def _claim(db, worker_id: str):
+    now = datetime.utcnow()
+    return db[COLLECTION].find_one_and_update(
+        {"$or": [
+            {"status": "queued", "run_at": {"$lte": now}},
+            {"status": "running", "locked_until": {"$lt": now}},  # 리스 만료 → 재시도
+        ]},
+        {"$set": {"status": "running", "locked_until": now + LEASE, "worker": worker_id},
+         "$inc": {"attempts": 1}},
+        sort=[("run_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+def run_one(db, worker_id: str = "cli") -> bool:
+    """작업 하나를 꺼내 실행. 꺼낼 작업이 없으면 False."""
+    job = _claim(db, worker_id)
+    if job is None:
+        return False
+    coll = db[COLLECTION]
+    fn = _handlers.get(job["type"])
+    try:
+        if fn is None:
+            raise LookupError(f"등록되지 않은 작업 종류: {job['type']}")
+        fn(job["payload"])
+        coll.update_one({"_id": job["_id"]}, {
+            "$set": {"status": "done", "finished_at": datetime.utcnow()},
+            "$unset": {"locked_until": "", "error": ""},
+        })
+    except Exception as e:
+        print(f"작업 실패 ({job['type']}, {job['_id']}, {job['attempts']}회차): {e}")
+        if job["attempts"] >= MAX_ATTEMPTS:
+            update = {"status": "failed", "error": str(e)}
+        else:
+            retry_at = datetime.utcnow() + timedelta(seconds=2 ** job["attempts"])
+            update = {"status": "queued", "run_at": retry_at, "error": str(e)}
+        coll.update_one({"_id": job["_id"]}, {"$set": update, "$unset": {"locked_until": ""}})
+    return True
+
+def enqueue_due(db) -> int:
+    """때가 된 주기 작업을 큐에 넣는다. 여러 프로세스가 동시에 불러도 주기당 한 번만."""
+    now = datetime.utcnow()
+    queued = 0
+    for job_type, seconds in _schedules.items():
+        try:
+            # 문서가 없으면 upsert, next_run 이 지났으면 갱신 → 둘 다 이쪽이 등록.
+            # 아직 때가 아니면 필터가 안 맞아 upsert 를 시도하다 _id 충돌.
+            db[SCHEDULES].update_one(
+                {"_id": job_type, "next_run": {"$lte": now}},
+                {"$set": {"next_run": now + timedelta(seconds=seconds)}},
+                upsert=True,
+            )
+        except errors.DuplicateKeyError:
+            continue
+        enqueue(db, job_type, {})
+        queued += 1
+    return queued
+
+_next_schedule_check = 0.0
+
+def _maybe_enqueue_due(db) -> None:
+    global _next_schedule_check
+    if not _schedules or time.monotonic() < _next_schedule_check:
+        return
+    _next_schedule_check = time.monotonic() + SCHEDULE_CHECK
+    enqueue_due(db)
+
+def _loop(db, worker_id: str, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            _maybe_enqueue_due(db)
+            if not run_one(db, worker_id):
+                stop.wait(POLL_INTERVAL)
+        except Exception as e:  # DB 일시 장애 등: 잠시 쉬었다가 계속
+            print(f"작업 워커 오류 ({worker_id}): {e}")
+            stop.wait(POLL_INTERVAL * 5)
+
+_lock = threading.Lock()
+_started_pid = None
+_stop = threading.Event()
+
+def start_workers(db, count: int) -> None:
+    """현재 프로세스에서 워커 스레드를 한 번만 띄운다 (fork 후 자식에서도 새로 띄움)."""
+    global _started_pid, _stop
+    if count <= 0 or _started_pid == os.getpid():
+        return
+    with _lock:
+        if _started_pid == os.getpid():
+            return
+        _stop = threading.Event()
+        for i in range(count):
+            worker_id = f"{socket.gethostname()}:{os.getpid()}:{i}"
+            threading.Thread(target=_loop, args=(db, worker_id, _stop),
+                             name=f"job-worker-{i}", daemon=True).start()
+        _started_pid = os.getpid()
+
+def stop_workers() -> None:
+    _stop.set()
+
+def run_forever(db, count: int) -> None:
+    """전용 워커 프로세스용 (flask run-jobs)"""
+    start_workers(db, count)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stop_workers()
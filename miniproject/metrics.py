@@ -0,0 +1,146 @@
+"""
+요청/DB 지표 수집과 Prometheus 텍스트 노출 (/api/metrics)
+
+- 요청: 엔드포인트별 지연 히스토그램, 상태 코드별 건수, 응답 크기 히스토그램
+- MongoDB: pymongo CommandListener 로 컬렉션/명령별 소요 시간, 실패 건수
+  SLOW_QUERY_MS(기본 100) 이상 걸린 명령은 컬렉션/명령 이름과 소요 시간만 로그로 남긴다
+  (필터나 update 내용에는 아이디, 비밀번호 해시가 들어갈 수 있으므로 찍지 않는다).
+
+외부 라이브러리 없이 Prometheus text format(0.0.4)을 직접 만든다.
+"""
+import os
+import time
+import threading
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels)
+    return "{" + inner + "}"
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}        # name -> (type, help)
+        self._counters = {}    # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> Histogram
+
+    def describe(self, name, kind, text):
+        self._help[name] = (kind, text)
+
+    def inc(self, name, labels=(), by=1):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + by
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        with self._lock:
+            hist = self._histograms.get((name, labels))
+            if hist is None:
+                hist = self._histograms[(name, labels)] = Histogram(buckets)
+            hist.observe(value)
+
+    def render(self, gauges=None) -> str:
+        """gauges: {(name, labels): value} — 렌더링 시점에 읽는 값(캐시 통계 등)"""
+        lines = []
+        seen = set()
+
+        def header(name):
+            if name not in seen and name in self._help:
+                kind, text = self._help[name]
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+            seen.add(name)
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name)
+                lines.append(f"{name}{_labels(labels)} {value}")
+            for (name, labels), hist in sorted(self._histograms.items(), key=lambda kv: kv[0]):
+                header(name)
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {hist.count}")
+                lines.append(f"{name}_sum{_labels(labels)} {hist.sum:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {hist.count}")
+        for (name, labels), value in sorted((gauges or {}).items()):
+            header(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+# ── HTTP 요청 ──
+def describe_http(registry: Registry):
+    registry.describe("http_request_duration_seconds", "histogram", "요청 처리 시간 (엔드포인트별)")
+    registry.describe("http_requests_total", "counter", "요청 수 (엔드포인트/메서드/상태 코드별)")
+    registry.describe("http_response_size_bytes", "histogram", "응답 본문 크기 (스트리밍 응답 제외)")
+    registry.describe("cache_hits_total", "counter", "읽기 캐시 적중 수")
+    registry.describe("cache_misses_total", "counter", "읽기 캐시 미스 수")
+    registry.describe("cache_evictions_total", "counter", "용량 초과로 밀려난 캐시 항목 수")
+    registry.describe("cache_entries", "gauge", "현재 캐시 항목 수")
+
+def observe_request(registry: Registry, endpoint: str, method: str, status: int,
+                    seconds: float, size=None):
+    registry.observe("http_request_duration_seconds", (("endpoint", endpoint), ("method", method)), seconds)
+    registry.inc("http_requests_total", (("endpoint", endpoint), ("method", method), ("status", status)))
+    if size is not None:
+        registry.observe("http_response_size_bytes", (("endpoint", endpoint),), size, SIZE_BUCKETS)
+
+# ── MongoDB 명령 ──
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self, registry: Registry, slow_ms: float = None):
+        self.registry = registry
+        self.slow_ms = float(os.getenv("SLOW_QUERY_MS", "100")) if slow_ms is None else slow_ms
+        self._pending = {}
+        self._lock = threading.Lock()
+        registry.describe("mongodb_command_duration_seconds", "histogram", "MongoDB 명령 소요 시간 (컬렉션/명령별)")
+        registry.describe("mongodb_command_failures_total", "counter", "실패한 MongoDB 명령 수")
+        registry.describe("mongodb_slow_commands_total", "counter", "SLOW_QUERY_MS 를 넘긴 MongoDB 명령 수")
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        if not isinstance(target, str):  # getMore 등: 컬렉션 이름이 별도 필드
+            target = event.command.get("collection", "-")
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = target
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            target = self._pending.pop((event.connection_id, event.request_id), "-")
+        labels = (("collection", target), ("command", event.command_name))
+        seconds = event.duration_micros / 1e6
+        self.registry.observe("mongodb_command_duration_seconds", labels, seconds)
+        if failed:
+            self.registry.inc("mongodb_command_failures_total", labels)
+        if seconds * 1000 >= self.slow_ms:
+            self.registry.inc("mongodb_slow_commands_total", labels)
+            print(f"[slow query] {seconds * 1000:.1f}ms {target}.{event.command_name}")
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+def now() -> float:
+    return time.perf_counter()
@@ -0,0 +1,183 @@
+"""
+버전 관리되는 스키마(인덱스, 파생 필드) 마이그레이션
+
+웹 워커는 인덱스를 만들지 않는다. 배포 때 한 번 `flask --app app migrate` 로 적용하고,
+적용한 버전은 schema_migrations 컬렉션에 기록한다 (이미 적용된 버전은 건너뜀).
+새 인덱스/필드가 필요하면 아래에 다음 번호로 @migration 을 추가한다. 번호는 바꾸지 않는다.
+데이터 이전(backfill)도 마이그레이션으로 둔다 → Gate 가 이전 전 데이터로 요청을 받지 않는다.
+마이그레이션은 중간에 끊겨도 다시 돌릴 수 있게 아직 처리 안 된 문서만 골라서 고친다.
+
+migrate 없이 뜬 워커는 Gate 가 첫 요청 때 알아채고 요청을 503 으로 거절한다
+(예: 좋아요 토글은 likes 의 유니크 인덱스가 없으면 중복 좋아요를 만든다).
+"""
+import os
+import time
+import threading
+from datetime import datetime
+
+from pymongo import InsertOne, UpdateOne, errors
+
+import hot
+import jobs
+import search
+
+COLLECTION = "schema_migrations"
+
+_MIGRATIONS = []  # (version, name, fn) 버전 순
+
+def migration(version: int, name: str):
+    def register(fn):
+        assert all(v != version for v, _, _ in _MIGRATIONS), f"중복 마이그레이션 버전 {version}"
+        _MIGRATIONS.append((version, name, fn))
+        _MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+@migration(1, "core indexes")
+def _core_indexes(db):
+    db["users"].create_index("username", unique=True)
+    # 목록 정렬(created_at, _id 내림차순)과 정확히 일치하는 인덱스
+    db["posts"].create_index([("board", 1), ("created_at", -1), ("_id", -1)])
+    db["posts"].create_index([("created_at", -1), ("_id", -1)])
+    db["posts"].create_index([("author", 1), ("created_at", -1)])
+    db["comments"].create_index([("post_id", 1), ("created_at", -1), ("_id", -1)])
+    db["likes"].create_index([("post_id", 1), ("username", 1)], unique=True)
+
+@migration(2, "user purge indexes")
+def _purge_indexes(db):
+    # 탈퇴 회원 정리(user.purge)용
+    db["comments"].create_index([("author", 1)])
+    db["likes"].create_index([("username", 1)])
+
+@migration(3, "job queue indexes")
+def _job_indexes(db):
+    jobs.ensure_indexes(db)
+
+@migration(4, "search text indexes")
+def _search_indexes(db):
+    search.ensure_indexes(db)
+
+@migration(5, "post excerpts")
+def _post_excerpts(db, batch_size=1000):
+    """목록 projection 이 content 대신 읽는 excerpt 필드를 기존 게시글에 채움"""
+    posts = db["posts"]
+    ops = []
+    for doc in posts.find({search.EXCERPT_FIELD: {"$exists": False}}, {"content": 1}).batch_size(batch_size):
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {search.EXCERPT_FIELD: search.excerpt(doc.get("content"))}}))
+        if len(ops) >= batch_size:
+            posts.bulk_write(ops, ordered=False)
+            ops.clear()
+    if ops:
+        posts.bulk_write(ops, ordered=False)
+
+@migration(6, "hot post ranking")
+def _hot_ranking(db):
+    hot.ensure_indexes(db)
+    hot.rebuild(db)
+
+@migration(7, "likes from posts.liked_by")
+def _move_liked_by(db, batch_size=1000):
+    """
+    예전 posts.liked_by 배열을 likes 컬렉션으로 옮기고 likes_count 재계산.
+    옮긴 글은 liked_by 를 지우므로 중간에 끊겨도 다시 돌리면 남은 글만 처리한다.
+    """
+    posts, likes = db["posts"], db["likes"]
+    for doc in posts.find({"liked_by": {"$exists": True}}, {"liked_by": 1}).batch_size(batch_size):
+        users = set(doc.get("liked_by") or [])
+        if users:
+            try:
+                likes.bulk_write([InsertOne({"post_id": doc["_id"], "username": u,
+                                             "created_at": doc["_id"].generation_time.replace(tzinfo=None)})
+                                  for u in users], ordered=False)
+            except errors.BulkWriteError as e:
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise  # 이미 옮겨진 (post_id, username) 은 유니크 인덱스가 걸러냄
+        count = likes.count_documents({"post_id": doc["_id"]})
+        posts.update_one({"_id": doc["_id"]}, {"$set": {"likes_count": count}, "$unset": {"liked_by": ""}})
+
+@migration(8, "search fields")
+def _search_fields(db, batch_size=1000):
+    """검색용 bigram 필드가 없는 게시글/댓글에 채움 (댓글은 게시판 필터용 board 도)"""
+    posts, comments = db["posts"], db["comments"]
+    ops = []
+    for doc in posts.find({search.TITLE_FIELD: {"$exists": False}}, {"title": 1, "content": 1}).batch_size(batch_size):
+        ops.append(UpdateOne({"_id": doc["_id"]},
+                             {"$set": search.post_fields(doc.get("title", ""), doc.get("content", ""))}))
+        if len(ops) >= batch_size:
+            posts.bulk_write(ops, ordered=False)
+            ops.clear()
+    if ops:
+        posts.bulk_write(ops, ordered=False)
+
+    def flush(batch):
+        ids = list({c["post_id"] for c in batch})
+        boards = {p["_id"]: p["board"] for p in posts.find({"_id": {"$in": ids}}, {"board": 1})}
+        ops = []
+        for c in batch:
+            fields = search.comment_fields(c.get("content", ""))
+            if c["post_id"] in boards:
+                fields["board"] = boards[c["post_id"]]
+            ops.append(UpdateOne({"_id": c["_id"]}, {"$set": fields}))
+        comments.bulk_write(ops, ordered=False)
+
+    batch = []
+    for doc in comments.find({search.BODY_FIELD: {"$exists": False}}, {"content": 1, "post_id": 1}).batch_size(batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+def applied_versions(db) -> set:
+    return {doc["_id"] for doc in db[COLLECTION].find({}, {"_id": 1})}
+
+def pending(db) -> list:
+    done = applied_versions(db)
+    return [(v, name) for v, name, _ in _MIGRATIONS if v not in done]
+
+def migrate(db, target: int = None) -> list:
+    """적용 안 된 마이그레이션을 순서대로 실행. 적용한 [(version, name)] 반환."""
+    done = applied_versions(db)
+    ran = []
+    for version, name, fn in _MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        fn(db)  # create_index 는 멱등 → 동시에 두 번 돌아도 안전
+        try:
+            db[COLLECTION].insert_one({"_id": version, "name": name, "applied_at": datetime.utcnow()})
+        except errors.DuplicateKeyError:
+            pass  # 다른 프로세스가 먼저 기록
+        ran.append((version, name))
+    return ran
+
+class Gate:
+    """
+    웹 워커용 확인: 프로세스마다 첫 요청 때 pending() 을 읽고, 남은 게 있으면 로그를 남긴다.
+    남아 있는 동안은 recheck 초마다 다시 읽으므로 `flask migrate` 후 재시작 없이 풀린다.
+    """
+
+    def __init__(self, recheck: float = 30):
+        self.recheck = recheck
+        self.pending = []
+        self._pid = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def needs_check(self) -> bool:
+        return self._pid != os.getpid() or (bool(self.pending) and time.monotonic() - self._checked >= self.recheck)
+
+    def check(self, db) -> list:
+        with self._lock:
+            if not self.needs_check():
+                return self.pending
+            todo = pending(db)
+            if todo and (self._pid != os.getpid() or todo != self.pending):
+                names = ", ".join(f"{v} {name}" for v, name in todo)
+                print(f"적용되지 않은 마이그레이션이 있어 요청을 거절합니다 (flask migrate 필요): {names}")
+            elif self.pending and not todo:
+                print("마이그레이션 적용 확인, 요청 처리를 시작합니다")
+            self.pending = todo
+            self._checked = time.monotonic()
+            self._pid = os.getpid()
+            return todo
@@ -0,0 +1,106 @@
+"""
+응답 직렬화, 조건부 요청, 압축
+
+- JSON: orjson 이 설치돼 있으면 app.json 을 orjson 기반 provider 로 교체 (없으면 Flask 기본 json)
+- 조건부 요청: versions.py 의 버전으로 만든 ETag/Last-Modified 로 본문을 만들기 전에 304 판단
+- 압축: Accept-Encoding 에 따라 br(brotli 설치 시) > gzip 으로, COMPRESS_MIN_BYTES 이상인 응답만 압축
+  스트리밍 응답(NDJSON 등)과 send_file 응답(direct_passthrough)은 건드리지 않는다.
+"""
+import os
+import gzip
+from datetime import timezone
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))  # 11 은 너무 느림, 4~6 이 동적 응답에 적당
+ENCODINGS = ["br", "gzip"] if brotli else ["gzip"]
+COMPRESSIBLE = ("application/json", "application/x-ndjson", "application/javascript",
+                "text/", "image/svg+xml")
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify/request.get_json 을 orjson 으로. 한글은 \\u 이스케이프 없이 UTF-8 그대로 나간다."""
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=self.default, option=self.option | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+# ── 조건부 요청 ──
+def set_validators(response, etag: str, last_modified):
+    # 약한 ETag: 같은 데이터라도 압축/직렬화에 따라 바이트가 달라질 수 있음
+    response.set_etag(etag, weak=True)
+    response.last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # 브라우저는 저장하되 매번 재검증, 공유 캐시는 금지 (liked 등 사용자별 필드)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Cookie")
+    return response
+
+def is_fresh(req, etag: str, last_modified) -> bool:
+    """If-None-Match / If-Modified-Since 가 현재 검증자와 맞는지 (Flask/Quart 요청 공용)"""
+    if req.if_none_match:
+        return req.if_none_match.contains_weak(etag)
+    if req.if_modified_since:
+        return last_modified.replace(tzinfo=timezone.utc) <= req.if_modified_since
+    return False
+
+def not_modified(etag: str, last_modified):
+    """검증자가 맞으면 304 응답, 아니면 None"""
+    if not is_fresh(request, etag, last_modified):
+        return None
+    return set_validators(Response(status=304), etag, last_modified)
+
+# ── 압축 ──
+def compress(data: bytes, accept_encodings):
+    """(압축된 바이트, 인코딩). 너무 작거나 클라이언트가 지원하는 인코딩이 없으면 None"""
+    if len(data) < COMPRESS_MIN_BYTES:
+        return None
+    coding = accept_encodings.best_match(ENCODINGS)
+    if coding is None:
+        return None
+    if coding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY), coding
+    return gzip.compress(data, compresslevel=GZIP_LEVEL), coding
+
+def compress_response(response):
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or not (response.mimetype or "").startswith(COMPRESSIBLE)):
+        return response
+    response.vary.add("Accept-Encoding")
+    compressed = compress(response.get_data(), request.accept_encodings)
+    if compressed is None:
+        return response
+    data, coding = compressed
+    response.set_data(data)
+    response.headers["Content-Encoding"] = coding
+    # 압축 전후 바이트가 다르므로 강한 ETag 는 약한 ETag 로 낮춘다
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_app(app) -> None:
+    if orjson:
+        app.json = OrjsonProvider(app)
+    app.after_request(compress_response)
@@ -0,0 +1,74 @@
+"""
+게시글/댓글 검색 (글자 bigram + MongoDB text 인덱스)
+
+MongoDB 기본 text 인덱스는 공백/구두점으로만 토큰을 나눠서 붙여 쓴 한국어
+("학식메뉴")나 조사가 붙은 단어("식당에서")를 부분 검색하지 못한다.
+그래서 쓰기 시점에 단어를 글자 bigram 으로 쪼갠 토큰 문자열을 함께 저장하고,
+형태소 처리를 끈(language "none") text 인덱스로 $text 검색 + textScore 랭킹을 한다.
+
+  "학식 메뉴"  → "학식 메뉴"          (2글자 이하 단어는 그대로)
+  "식당에서"   → "식당 당에 에서"
+  "Delivery"  → "de el li iv ve er ry"
+
+검색어도 같은 방식으로 쪼개므로 "식당" 으로 "식당에서" 가 찾아진다.
+$text 는 공백으로 나눈 단어를 OR 로 찾으므로 검색어 bigram 은 하나씩 따옴표로 감싼다
+(구절이 여러 개면 전부 들어 있는 문서만 찾는다 → "떡볶이" 가 "볶이" 만 있는 글에 걸리지 않음).
+"""
+import re
+
+from pymongo import TEXT
+
+TOKEN = re.compile(r"\w+", re.UNICODE)
+MAX_BODY_GRAMS = 4000   # 긴 본문이 인덱스/문서 크기를 키우지 않도록 상한
+MAX_QUERY_GRAMS = 32
+
+TITLE_FIELD = "search_title"
+BODY_FIELD = "search_body"
+
+def grams(text: str) -> list:
+    out = []
+    for word in TOKEN.findall((text or "").lower()):
+        if len(word) <= 2:
+            out.append(word)
+        else:
+            out.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return out
+
+def post_fields(title: str, content: str) -> dict:
+    """게시글 문서에 함께 저장할 검색용 필드"""
+    return {
+        TITLE_FIELD: " ".join(grams(title)),
+        BODY_FIELD: " ".join(grams(content)[:MAX_BODY_GRAMS]),
+    }
+
+def comment_fields(content: str) -> dict:
+    return {BODY_FIELD: " ".join(grams(content)[:MAX_BODY_GRAMS])}
+
+# ── 목록 카드용 본문 요약 (쓰기 시점에 함께 저장 → 목록은 content 를 읽지 않음) ──
+EXCERPT_FIELD = "excerpt"
+EXCERPT_CHARS = 120
+SPACES = re.compile(r"\s+")
+
+def excerpt(content: str) -> str:
+    text = SPACES.sub(" ", content or "").strip()
+    return text if len(text) <= EXCERPT_CHARS else text[:EXCERPT_CHARS].rstrip() + "…"
+
+def ensure_indexes(db) -> None:
+    # text 인덱스는 컬렉션당 하나 → 제목 가중치를 높여서 한 인덱스로
+    db["posts"].create_index(
+        [(TITLE_FIELD, TEXT), (BODY_FIELD, TEXT)],
+        name="post_search", default_language="none", weights={TITLE_FIELD: 5, BODY_FIELD: 1},
+    )
+    db["comments"].create_index(
+        [(BODY_FIELD, TEXT)], name="comment_search", default_language="none",
+    )
+
+def text_query(q: str):
+    """검색어 → $text 조건 (모든 bigram 을 포함해야 일치). 토큰이 없으면 None."""
+    tokens = list(dict.fromkeys(grams(q)))[:MAX_QUERY_GRAMS]
+    if not tokens:
+        return None
+    return {"$text": {"$search": " ".join(f'"{t}"' for t in tokens)}}
+
+SCORE = {"score": {"$meta": "textScore"}}
+BY_SCORE = [("score", {"$meta": "textScore"}), ("_id", -1)]
@@ -45,15 +45,24 @@
       .replace(/'/g, "&#039;");
 
   // 4) API 호출
-  async function loadPost() {
-    const { res, data } = await fetchJSON(`/api/posts/${encodeURIComponent(id)}`);
+  // 댓글은 커서 페이지 단위로 불러옴 (after 없으면 최신 페이지)
+  let commentsCursor = null;
+
+  // 첫 화면: 게시글 + 댓글 첫 페이지 + 좋아요 상태를 요청 한 번으로
+  async function loadView() {
+    const { res, data } = await fetchJSON(`/api/posts/${encodeURIComponent(id)}/view?per_page=20`);
     if (!res.ok || !data.success) throw new Error(data.msg || "게시글을 불러오지 못했습니다.");
-    return data.data; // { id, title, content, board, author, created_at, images[], likes_count, liked_by[] }
+    const { comments } = data.data;
+    commentsCursor = comments.has_next ? comments.next_cursor : null;
+    return data.data; // { post, comments: {items, ...}, comments_count, viewer }
   }
 
-  async function loadComments() {
-    const { res, data } = await fetchJSON(`/api/posts/${encodeURIComponent(id)}/comments`);
+  async function loadComments(after) {
+    const params = new URLSearchParams({ per_page: "20" });
+    if (after) params.set("after", after);
+    const { res, data } = await fetchJSON(`/api/posts/${encodeURIComponent(id)}/comments?${params.toString()}`);
     if (!res.ok || !data.success) throw new Error(data.msg || "댓글을 불러오지 못했습니다.");
+    commentsCursor = data.data.has_next ? data.data.next_cursor : null;
     return data.data.items || [];
   }
 
@@ -68,6 +77,7 @@
       alert(data.msg || "좋아요 처리 중 오류가 발생했습니다.");
       return;
     }
+    liveLiked = data.data.liked;
     applyLikeState(data.data.likes_count, data.data.liked);
   }
 
@@ -86,13 +96,16 @@
     }
   }
 
-  function renderComments(items) {
+  // append=true 면 기존 목록 뒤에 이어 붙임 ("더 보기")
+  function renderComments(items, append = false) {
     if (!cList) return;
-    cList.innerHTML = "";
-    if (!items.length) return;
+    if (!append) cList.innerHTML = "";
+    const oldMore = document.getElementById("comment-more");
+    if (oldMore) oldMore.remove();
     items.forEach((c) => {
       const box = document.createElement("div");
       box.className = "box has-background-grey-darker has-text-white mt-2";
+      box.dataset.id = c.id;
       const when = new Date(c.created_at).toLocaleString();
       box.innerHTML = `
         <p class="subtitle is-6 has-text-grey-light">${escapeHtml(c.author)} · ${when}</p>
@@ -100,6 +113,24 @@
       `;
       cList.appendChild(box);
     });
+    if (commentsCursor) {
+      const more = document.createElement("button");
+      more.id = "comment-more";
+      more.type = "button";
+      more.className = "button is-small is-dark mt-2";
+      more.textContent = "댓글 더 보기";
+      more.onclick = async () => {
+        more.disabled = true;
+        try {
+          renderComments(await loadComments(commentsCursor), true);
+        } catch (e) {
+          console.error(e);
+          more.disabled = false;
+          alert(e.message || "댓글을 불러오지 못했습니다.");
+        }
+      };
+      cList.appendChild(more);
+    }
   }
 
   async function createComment() {
@@ -126,9 +157,68 @@
     renderComments(await loadComments());
   }
 
+  // 실시간 반영: 새 댓글/좋아요 수를 서버가 SSE 로 밀어줌 (폴링 없음)
+  // 연결 하나가 서버 자원을 계속 잡으므로 탭이 안 보일 때는 끊고, 다시 보이면 새로 연결한다.
+  // 서버의 SSE 연결 수가 상한이면 204(+Retry-After)가 오고 EventSource 는 스스로 재접속하지 않는다.
+  // 그때는 RETRY_MS 뒤에 다시 연결해 본다 (연결될 때까지 폴링, 연결되면 snapshot 으로 맞춤).
+  const RETRY_MS = 30000;
+  let liveLiked = false;
+  let es = null;
+  let retryTimer = null;
+  function subscribeEvents() {
+    if (!window.EventSource) return;
+    if (!document.hidden) openEvents();
+    document.addEventListener("visibilitychange", () => {
+      if (document.hidden) {
+        closeEvents();
+      } else if (!es && !retryTimer) {
+        openEvents(); // 재연결 직후 snapshot 으로 놓친 좋아요 수를 맞춤
+      }
+    });
+  }
+
+  function closeEvents() {
+    if (es) { es.close(); es = null; }
+    clearTimeout(retryTimer);
+    retryTimer = null;
+  }
+
+  function openEvents() {
+    retryTimer = null;
+    es = new EventSource(`/api/posts/${encodeURIComponent(id)}/events`);
+    es.addEventListener("error", () => {
+      // 일시적인 끊김은 EventSource 가 알아서 재접속(CONNECTING). 닫혔으면(204/503) 나중에 다시
+      if (!es || es.readyState !== EventSource.CLOSED) return;
+      es = null;
+      const jitter = Math.random() * RETRY_MS / 2; // 여러 탭이 한꺼번에 몰리지 않게
+      if (!document.hidden) retryTimer = setTimeout(openEvents, RETRY_MS + jitter);
+    });
+    es.addEventListener("snapshot", (e) => {
+      const d = JSON.parse(e.data);
+      applyLikeState(d.likes_count, liveLiked);
+    });
+    es.addEventListener("like", (e) => {
+      const d = JSON.parse(e.data);
+      if (likeCount) likeCount.textContent = `(${d.likes_count || 0})`;
+    });
+    es.addEventListener("comment", (e) => {
+      const c = JSON.parse(e.data);
+      if (!cList || cList.querySelector(`[data-id="${CSS.escape(c.id)}"]`)) return; // 내가 쓴 댓글은 이미 그려짐
+      const box = document.createElement("div");
+      box.className = "box has-background-grey-darker has-text-white mt-2";
+      box.dataset.id = c.id;
+      box.innerHTML = `
+        <p class="subtitle is-6 has-text-grey-light">${escapeHtml(c.author)} · ${new Date(c.created_at).toLocaleString()}</p>
+        <p style="white-space:pre-wrap">${escapeHtml(c.content)}</p>
+      `;
+      cList.prepend(box); // 최신순
+    });
+  }
+
   // 6) 초기 로딩 플로우
   try {
-    const p = await loadPost();
+    const view = await loadView();
+    const p = view.post;
 
     if (titleEl) titleEl.textContent = p.title || "제목 없음";
     if (metaEl)  metaEl.textContent  = `게시판: ${p.board} · 작성자: ${p.author} · ${new Date(p.created_at).toLocaleString()}`;
@@ -158,15 +248,17 @@
       }
     }
 
-    // 좋아요 초기 상태 (로그인 사용자별 liked 여부는 서버에서 내려주거나 추가 호출로 확인 가능)
-    applyLikeState(p.likes_count || 0, false);
+    // 좋아요 초기 상태 (liked: 현재 로그인 사용자 기준, 서버 계산)
+    liveLiked = !!p.liked;
+    applyLikeState(p.likes_count || 0, p.liked);
 
     // 이벤트 바인딩
     if (likeBtn) likeBtn.onclick = toggleLike;
     if (cBtn && cInput) cBtn.onclick = createComment;
 
-    // 댓글
-    renderComments(await loadComments());
+    // 댓글 (첫 페이지는 이미 받아 옴)
+    renderComments(view.comments.items || []);
+    subscribeEvents();
   } catch (e) {
     console.error(e);
     alert(e.message || "게시글을 불러오는 중 오류가 발생했습니다.");
@@ -5,8 +5,10 @@
     board: "",       // "", "Cafeteria", "Outside", "Delivery"
     page: 1,
     per_page: 10,
-    total: 0,
+    total: null,     // null 이면 다음 요청에서 전체 개수를 함께 받음
     pages: 1,
+    nextCursor: null,
+    prevCursor: null,
   };
 
   // ---- DOM ----
@@ -61,11 +63,16 @@
   }
 
   // ---- API ----
-  async function fetchPosts() {
+  // cursor: { after } | { before } → 커서 모드, 없으면 page 기반(첫 진입/딥링크)
+  async function fetchPosts(cursor) {
     const params = new URLSearchParams();
-    params.set("page", String(state.page));
     params.set("per_page", String(state.per_page));
     if (state.board) params.set("board", state.board);
+    if (cursor && cursor.after) params.set("after", cursor.after);
+    else if (cursor && cursor.before) params.set("before", cursor.before);
+    else params.set("page", String(state.page));
+    // 전체 개수는 보드당 한 번만 집계
+    if (state.total !== null) params.set("include_total", "false");
 
     const res = await fetch(`/api/posts?${params.toString()}`);
     const ct = res.headers.get("content-type") || "";
@@ -77,7 +84,7 @@
     if (!res.ok || !json.success) {
       throw new Error(json.msg || "목록을 불러오지 못했습니다.");
     }
-    return json.data; // {items, page, per_page, total, pages}
+    return json.data; // {items, per_page, has_next, has_prev, next_cursor, prev_cursor, [page, total, pages]}
   }
 
   // ---- 렌더 ----
@@ -99,10 +106,15 @@
   }
 
   function renderList(data) {
-    const { items, page, total, pages } = data;
-    state.page  = page;
-    state.total = total;
-    state.pages = pages;
+    const { items } = data;
+    if (data.page) state.page = data.page;
+    if (data.total !== undefined) {
+      state.total = data.total;
+      state.pages = Math.max(data.pages, 1);
+    }
+    state.nextCursor = data.has_next ? data.next_cursor : null;
+    state.prevCursor = data.has_prev ? data.prev_cursor : null;
+    const page = state.page;
 
     listEl.innerHTML = "";
     if (!items || items.length === 0) {
@@ -113,9 +125,9 @@
     }
 
     // 페이징
-    if (pageInfo) pageInfo.textContent = `${page} / ${pages} 페이지`;
-    if (prevBtn) prevBtn.disabled = (page <= 1);
-    if (nextBtn) nextBtn.disabled = (page >= pages);
+    if (pageInfo) pageInfo.textContent = `${page} / ${state.pages} 페이지`;
+    if (prevBtn) prevBtn.disabled = !state.prevCursor;
+    if (nextBtn) nextBtn.disabled = !state.nextCursor;
   }
 
   // ---- 이벤트 ----
@@ -131,6 +143,7 @@
     r.addEventListener("change", async () => {
       state.board = r.value;     // "" | Cafeteria | Outside | Delivery
       state.page  = 1;           // 보드 바꾸면 1페이지부터
+      state.total = null;
       listTitle.textContent = titleByBoard(state.board);
       writeQuery();
       try {
@@ -144,11 +157,11 @@
   });
 
   if (prevBtn) prevBtn.addEventListener("click", async () => {
-    if (state.page <= 1) return;
-    state.page -= 1;
-    writeQuery();
+    if (!state.prevCursor) return;
     try {
-      const data = await fetchPosts();
+      const data = await fetchPosts({ before: state.prevCursor });
+      state.page = Math.max(state.page - 1, 1);
+      writeQuery();
       renderList(data);
     } catch (e) {
       console.error(e);
@@ -157,11 +170,11 @@
   });
 
   if (nextBtn) nextBtn.addEventListener("click", async () => {
-    if (state.page >= state.pages) return;
-    state.page += 1;
-    writeQuery();
+    if (!state.nextCursor) return;
     try {
-      const data = await fetchPosts();
+      const data = await fetchPosts({ after: state.nextCursor });
+      state.page += 1;
+      writeQuery();
       renderList(data);
     } catch (e) {
       console.error(e);
@@ -0,0 +1,82 @@
+"""
+asgi.Dispatcher: 비동기 앱에 있는 경로는 Quart 로, 나머지는 같은 프로세스의 동기 Flask 앱(WSGI)으로.
+mongomock 은 비동기 드라이버가 없으므로 DB 를 읽기 전에 끝나는 비동기 라우트만 부른다.
+"""
+import json
+import asyncio
+from urllib.parse import urlsplit
+
+import pytest
+from bson import ObjectId
+
+pytest.importorskip("quart")
+
+@pytest.fixture
+def dispatcher(flask_app, app_module, monkeypatch):
+    import asgi
+
+    monkeypatch.setattr(app_module, "create_app", lambda config=None: flask_app)
+    return asgi.create_asgi_app()
+
+def call(app, method: str, url: str, body: bytes = b"", headers: dict = None) -> tuple:
+    """ASGI 요청 한 번 → (status, headers, body)"""
+    parts = urlsplit(url)
+    headers = {"host": "localhost", "content-length": str(len(body)), **(headers or {})}
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": parts.path, "raw_path": parts.path.encode(), "root_path": "",
+        "query_string": parts.query.encode(), "client": ("127.0.0.1", 50000), "server": ("localhost", 80),
+        "headers": [(k.encode(), v.encode()) for k, v in headers.items()], "extensions": {},
+    }
+    sent = []
+
+    async def run():
+        incoming = [{"type": "http.request", "body": body, "more_body": False}]
+        closed = asyncio.Event()
+
+        async def receive():
+            if incoming:
+                return incoming.pop(0)
+            await closed.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        closed.set()
+
+    asyncio.run(run())
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    data = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return start["status"], {k.decode().lower(): v.decode() for k, v in start["headers"]}, data
+
+def test_routes_split_between_async_and_sync_apps(dispatcher):
+    post_path = f"/api/posts/{ObjectId()}"
+    async_routes = [("GET", "/api/posts"), ("GET", "/api/posts/hot"), ("GET", post_path),
+                    ("POST", post_path + "/like"), ("POST", "/api/login"), ("GET", "/api/search")]
+    sync_routes = [("POST", "/api/posts"), ("DELETE", post_path), ("POST", "/api/register"),
+                   ("GET", "/login"), ("GET", "/uploads/a.png"), ("GET", "/api/metrics"), ("GET", "/nope")]
+    for method, path in async_routes:
+        assert dispatcher.handles({"path": path, "method": method}), (method, path)
+    for method, path in sync_routes:
+        assert not dispatcher.handles({"path": path, "method": method}), (method, path)
+
+def test_async_route_is_served_by_quart(dispatcher):
+    status, headers, body = call(dispatcher, "GET", "/api/search?q=")
+    assert status == 400
+    assert json.loads(body) == {"success": False, "msg": "검색어를 입력해 주세요."}
+
+def test_unmatched_path_falls_back_to_flask(dispatcher, app_module):
+    payload = json.dumps({"username": "asgi_user", "password": "secret1", "confirm": "secret1"}).encode()
+    status, _, body = call(dispatcher, "POST", "/api/register", payload, {"content-type": "application/json"})
+    assert status == 200 and json.loads(body)["success"] is True
+    assert app_module.users.count_documents({"username": "asgi_user"}) == 1
+
+    status, headers, body = call(dispatcher, "GET", "/login")
+    assert status == 200 and headers["content-type"].startswith("text/html")
+
+def test_unknown_api_path_gets_the_sync_apps_404(dispatcher):
+    status, _, body = call(dispatcher, "GET", "/api/definitely-missing")
+    assert status == 404
+    assert json.loads(body)["msg"] == "리소스를 찾을 수 없습니다."
@@ -0,0 +1,70 @@
+import cache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_lru_evicts_least_recently_used():
+    backend = cache.MemoryBackend(max_entries=2, ttl=60)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    assert backend.get("a") == 1  # a 가 최근 사용 → b 가 밀려난다
+    backend.set("c", 3)
+    assert backend.get("b") is cache.MISS
+    assert backend.get("a") == 1 and backend.get("c") == 3
+    assert backend.evictions == 1
+    assert backend.size() == 2
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    backend = cache.MemoryBackend(ttl=30)
+    backend.set("default", "x")
+    backend.set("short", "y", ttl=5)
+
+    clock.now += 10
+    assert backend.get("short") is cache.MISS
+    assert backend.get("default") == "x"
+
+    clock.now += 25
+    assert backend.get("default") is cache.MISS
+    assert backend.size() == 0  # 만료된 항목은 읽을 때 지워진다
+
+def test_get_or_load_counts_hits_and_misses():
+    c = cache.Cache(cache.MemoryBackend())
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return {"v": 1}
+
+    assert c.get_or_load("k", loader) == {"v": 1}
+    assert c.get_or_load("k", loader) == {"v": 1}
+    assert len(calls) == 1
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"], stats["size"]) == (1, 1, 0.5, 1)
+
+def test_get_or_load_does_not_store_none():
+    c = cache.Cache(cache.MemoryBackend())
+    assert c.get_or_load("missing", lambda: None) is None
+    assert c.get_or_load("missing", lambda: "found") == "found"
+
+def test_keys_change_with_version():
+    assert cache.post_key("p1", 3) != cache.post_key("p1", 4)
+    assert cache.list_key("Outside", "2.100", 10, "p1") == "posts:Outside:v2.100:10:p1"
+    assert cache.list_key(None, 1, "hot", 10).startswith("posts::")
+
+def test_detail_is_served_from_cache_until_version_changes(client, app_module):
+    from conftest import make_post
+
+    post = make_post(app_module, title="처음")
+    assert client.get(f"/api/posts/{post['_id']}").get_json()["data"]["title"] == "처음"
+
+    app_module.posts.update_one({"_id": post["_id"]}, {"$set": {"title": "수정"}})
+    assert client.get(f"/api/posts/{post['_id']}").get_json()["data"]["title"] == "처음"
+
+    app_module.versions.bump_post(app_module.db, post["_id"], post["board"])
+    assert client.get(f"/api/posts/{post['_id']}").get_json()["data"]["title"] == "수정"
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+from conftest import login, make_post
+
+import versions
+
+def test_missing_version_is_zero():
+    assert versions.from_doc(None) == (0, versions.EPOCH)
+
+def test_list_state_shares_cache_version_across_users():
+    now = 1_000_000.0
+    docs = {
+        versions.board_key("Outside"): {"v": 4, "at": datetime(2024, 1, 1)},
+        versions.user_key("kim"): {"v": 2, "at": datetime(2024, 1, 2)},
+    }
+    shared, version, modified = versions.list_state(docs, "Outside", "kim", now)
+    anon_shared, anon_version, _ = versions.list_state(docs, "Outside", None, now)
+    assert shared == anon_shared
+    assert version != anon_version
+    assert modified == datetime(2024, 1, 2)  # 게시판/사용자/시간 창 중 가장 늦은 것
+
+def test_list_state_moves_with_count_window():
+    docs = {}
+    first = versions.list_state(docs, None, None, now=0.0)
+    same = versions.list_state(docs, None, None, now=versions.COUNT_WINDOW - 1)
+    later = versions.list_state(docs, None, None, now=versions.COUNT_WINDOW)
+    assert first == same
+    assert later[0] != first[0]
+    assert later[2] > first[2]
+
+def get(client, path, etag=None):
+    return client.get(path, headers={"If-None-Match": etag} if etag else {})
+
+def test_detail_returns_304_until_post_changes(client, app_module):
+    post = make_post(app_module)
+    path = f"/api/posts/{post['_id']}"
+    first = get(client, path)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = get(client, path, etag)
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+    app_module.versions.bump_post(app_module.db, post["_id"], post["board"])
+    changed = get(client, path, etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+def test_never_bumped_post_is_modified_at_creation(client, app_module):
+    post = make_post(app_module)  # 버전 문서 없음 (작성 때 버전을 올리기 전에 만든 글)
+    resp = get(client, f"/api/posts/{post['_id']}")
+    assert resp.last_modified.replace(tzinfo=None) == post["_id"].generation_time.replace(tzinfo=None)
+
+def test_created_post_has_a_version(client, app_module):
+    login(client)
+    resp = client.post("/api/posts", data={"title": "제목", "content": "본문", "board": "Outside"},
+                       content_type="multipart/form-data")
+    post_id = app_module.posts.find_one({})["_id"]
+    assert resp.status_code == 201
+    version, modified = versions.get(app_module.db, versions.post_key(post_id))
+    assert version == 1 and modified > versions.EPOCH
+    assert versions.get(app_module.db, versions.board_key("Outside"))[0] == 1
+
+def test_etag_differs_per_viewer(client, app_module):
+    post = make_post(app_module)
+    path = f"/api/posts/{post['_id']}"
+    anon = get(client, path).headers["ETag"]
+    login(client)
+    assert get(client, path, anon).status_code == 200
+
+def test_if_modified_since_without_etag(client, app_module):
+    post = make_post(app_module)
+    path = f"/api/posts/{post['_id']}"
+    app_module.versions.bump_post(app_module.db, post["_id"], post["board"])
+    last_modified = get(client, path).headers["Last-Modified"]
+    assert client.get(path, headers={"If-Modified-Since": last_modified}).status_code == 304
+
+def test_like_changes_post_and_own_list_etag_but_not_board_version(client, app_module):
+    post = make_post(app_module, board="Outside")
+    login(client)
+    list_etag = get(client, "/api/posts?board=Outside").headers["ETag"]
+    detail_etag = get(client, f"/api/posts/{post['_id']}").headers["ETag"]
+    board_before = versions.get(app_module.db, versions.board_key("Outside"))[0]
+
+    client.post(f"/api/posts/{post['_id']}/like")
+
+    assert versions.get(app_module.db, versions.board_key("Outside"))[0] == board_before
+    assert get(client, f"/api/posts/{post['_id']}", detail_etag).status_code == 200
+    relisted = get(client, "/api/posts?board=Outside", list_etag)
+    assert relisted.status_code == 200  # 내 liked 가 바뀌었으므로 새 본문
+    assert relisted.get_json()["data"]["items"][0]["liked"] is True
+
+    login(client, "someone_else")
+    other = get(client, "/api/posts?board=Outside").headers["ETag"]
+    assert get(client, "/api/posts?board=Outside", other).status_code == 304
+
+def test_comment_does_not_bump_board_version(client, app_module):
+    post = make_post(app_module, board="Outside")
+    login(client)
+    before = versions.get(app_module.db, versions.board_key("Outside"))[0]
+    resp = client.post(f"/api/posts/{post['_id']}/comments", json={"content": "댓글"})
+    assert resp.status_code == 201
+    assert versions.get(app_module.db, versions.board_key("Outside"))[0] == before
+    assert versions.get(app_module.db, versions.post_key(post["_id"]))[0] == 1
+
+def test_comment_list_304(client, app_module):
+    post = make_post(app_module)
+    path = f"/api/posts/{post['_id']}/comments"
+    etag = get(client, path).headers["ETag"]
+    assert get(client, path, etag).status_code == 304
@@ -0,0 +1,63 @@
+import counters
+from conftest import login, make_post
+
+def comment(client, post_id):
+    return client.post(f"/api/posts/{post_id}/comments", json={"content": "댓글"})
+
+def test_comment_counts_after_insert(client, app_module):
+    post = make_post(app_module)
+    login(client)
+    assert comment(client, post["_id"]).status_code == 201
+    assert app_module.posts.find_one({"_id": post["_id"]})["comments_count"] == 1
+    assert app_module.comments.count_documents({"post_id": post["_id"]}) == 1
+
+def test_failed_comment_insert_leaves_count(client, app_module, monkeypatch):
+    post = make_post(app_module)
+    login(client)
+
+    def fail(doc):
+        raise RuntimeError("insert failed")
+
+    monkeypatch.setattr(app_module.db["comments"], "insert_one", fail)
+    assert comment(client, post["_id"]).status_code == 500
+    assert app_module.posts.find_one({"_id": post["_id"]})["comments_count"] == 0
+
+def test_comment_on_post_deleted_meanwhile_is_removed(client, app_module, monkeypatch):
+    post = make_post(app_module)
+    login(client)
+    coll = app_module.db["comments"]  # LazyCollection 이 아니라 실제 컬렉션에 패치 (undo 가 깨끗함)
+    insert = coll.insert_one
+
+    def insert_then_delete_post(doc):
+        app_module.posts.delete_one({"_id": post["_id"]})
+        return insert(doc)
+
+    monkeypatch.setattr(coll, "insert_one", insert_then_delete_post)
+    assert comment(client, post["_id"]).status_code == 404
+    assert app_module.comments.count_documents({}) == 0
+
+def test_rebuild_restores_corrupted_counts(app_module):
+    db = app_module.db
+    first = make_post(app_module, board="Cafeteria")
+    second = make_post(app_module, board="Dorm")
+    app_module.users.insert_many([{"username": "a_user"}, {"username": "b_user"}])
+    app_module.comments.insert_many([{"post_id": first["_id"], "content": "c"} for _ in range(3)])
+    app_module.likes.insert_one({"post_id": second["_id"], "username": "a_user"})
+
+    # 어긋난 값: 없는 댓글/좋아요 수, 틀린 카운터, 사라진 게시판 카운터
+    app_module.posts.update_one({"_id": first["_id"]}, {"$set": {"comments_count": 7, "likes_count": 2}})
+    counters.incr(db, counters.POSTS, counters.USERS, by=5)
+    counters.incr(db, counters.board_key("Gone"), by=4)
+
+    summary = counters.rebuild(db, batch_size=1)
+
+    assert summary["comment_counts_fixed"] == 1
+    assert summary["like_counts_fixed"] == 2
+    assert app_module.posts.find_one({"_id": first["_id"]})["comments_count"] == 3
+    assert app_module.posts.find_one({"_id": first["_id"]})["likes_count"] == 0
+    assert app_module.posts.find_one({"_id": second["_id"]})["likes_count"] == 1
+    assert counters.get(db, counters.POSTS) == 2
+    assert counters.get(db, counters.USERS) == 2
+    assert counters.get(db, counters.board_key("Cafeteria")) == 1
+    assert counters.get(db, counters.board_key("Dorm")) == 1
+    assert counters.get(db, counters.board_key("Gone")) == 0
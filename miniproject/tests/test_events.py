@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+import events
+from conftest import make_post
+
+def test_publish_reaches_only_topic_subscribers():
+    broker = events.Broker()
+    a, b = broker.subscribe("a"), broker.subscribe("b")
+    assert broker.publish("a", "like", {"likes_count": 1}) == 1
+    assert a.get(timeout=0) == ("like", {"likes_count": 1})
+    assert b.get(timeout=0) is None
+
+def test_close_unsubscribes_once():
+    broker = events.Broker()
+    sub = broker.subscribe("a")
+    sub.close()
+    sub.close()
+    assert broker.subscriber_count() == 0
+    assert broker.publish("a", "like", {}) == 0
+
+def test_slow_subscriber_drops_oldest(monkeypatch):
+    monkeypatch.setattr(events, "QUEUE_SIZE", 2)
+    broker = events.Broker()
+    sub = broker.subscribe("a")
+    for n in range(3):
+        broker.publish("a", "like", {"likes_count": n})
+    assert [sub.get(timeout=0)[1]["likes_count"] for _ in range(2)] == [1, 2]
+
+def test_limit_counts_sync_and_async_separately():
+    broker = events.Broker()
+    first = broker.subscribe("a", limit=1)
+    with pytest.raises(events.Full):
+        broker.subscribe("b", limit=1)
+
+    async def subscribe_async():
+        return broker.subscribe("a", asyncio.get_running_loop(), limit=1)
+
+    assert isinstance(asyncio.run(subscribe_async()), events.AsyncSubscription)
+    first.close()
+    broker.subscribe("b", limit=1)  # 자리가 나면 다시 받음
+
+def test_async_subscription_receives_from_other_thread():
+    broker = events.Broker()
+
+    async def run():
+        sub = broker.subscribe("a", asyncio.get_running_loop())
+        await asyncio.to_thread(broker.publish, "a", "comment", {"id": "x"})
+        try:
+            return await sub.get(timeout=1)
+        finally:
+            sub.close()
+
+    assert asyncio.run(run()) == ("comment", {"id": "x"})
+    assert broker.subscriber_count() == 0
+
+# ── SSE 라우트 ──
+def test_stream_sends_snapshot_and_releases_slot(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "event_broker", events.Broker())
+    monkeypatch.setattr(app_module, "EVENT_HEARTBEAT", 0.01)
+    monkeypatch.setattr(app_module, "EVENT_STREAM_MAX", 0.05)
+    post = make_post(app_module, likes_count=3)
+
+    resp = client.get(f"/api/posts/{post['_id']}/events")
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    assert 'event: snapshot\ndata: {"likes_count": 3, "comments_count": 0}' in resp.get_data(as_text=True)
+    assert app_module.event_broker.subscriber_count() == 0
+
+def test_stream_over_cap_gets_204_with_retry_after(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "event_broker", events.Broker())
+    monkeypatch.setattr(app_module, "MAX_EVENT_STREAMS", 1)
+    post = make_post(app_module)
+    app_module.event_broker.subscribe("other")
+
+    resp = client.get(f"/api/posts/{post['_id']}/events")
+    assert resp.status_code == 204
+    assert resp.headers["Retry-After"] == str(events.FULL_RETRY_AFTER)
@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+import hashing
+
+@pytest.fixture
+def pool():
+    return hashing.HashPool(rounds=4, workers=1, queue_limit=0, timeout=5)
+
+def block(pool):
+    """풀의 유일한 슬롯을 잡아 두는 작업. 반환된 이벤트를 set 하면 풀린다."""
+    release = threading.Event()
+    future = pool._submit(release.wait)
+    return release, future
+
+def test_hash_and_verify(pool):
+    hashed = pool.hash("secret-pw")
+    assert hashing.cost_of(hashed) == 4
+    assert pool.verify("secret-pw", hashed)
+    assert not pool.verify("wrong-pw", hashed)
+
+def test_needs_rehash_when_cost_changes(pool):
+    hashed = pool.hash("secret-pw")
+    assert not pool.needs_rehash(hashed)
+    assert hashing.HashPool(rounds=5).needs_rehash(hashed)
+
+def test_full_pool_raises_pool_busy_immediately(pool):
+    release, future = block(pool)
+    try:
+        with pytest.raises(hashing.PoolBusy):
+            pool.verify("pw", b"$2b$04$" + b"x" * 53)
+    finally:
+        release.set()
+        future.result()
+    # 슬롯이 반환되면 다시 받는다
+    assert pool.verify("pw", pool.hash("pw"))
+
+def test_wait_longer_than_timeout_is_pool_busy():
+    pool = hashing.HashPool(rounds=4, workers=1, queue_limit=1, timeout=0.05)
+    release, future = block(pool)
+    try:
+        with pytest.raises(hashing.PoolBusy):
+            pool.hash("pw")  # 대기열에는 들어가지만 timeout 안에 차례가 오지 않음
+    finally:
+        release.set()
+        future.result()
+
+def test_rehash_later_skips_when_busy(pool):
+    release, future = block(pool)
+    try:
+        assert pool.rehash_later("pw", lambda new_hash: None) is False
+    finally:
+        release.set()
+        future.result()
+
+def test_rehash_later_calls_back_with_new_hash(pool):
+    done = threading.Event()
+    result = {}
+
+    def on_done(new_hash):
+        result["hash"] = new_hash
+        done.set()
+
+    assert pool.rehash_later("pw", on_done) is True
+    assert done.wait(5)
+    assert hashing.cost_of(result["hash"]) == 4
+
+def test_login_returns_503_when_pool_is_busy(client, app_module, monkeypatch):
+    app_module.users.insert_one({"username": "tester", "passwordHash": app_module.hash_pool.hash("secret-pw")})
+
+    def busy(*args):
+        raise hashing.PoolBusy()
+
+    monkeypatch.setattr(app_module.hash_pool, "verify", busy)
+    resp = client.post("/api/login", json={"username": "tester", "password": "secret-pw"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+    assert resp.get_json()["success"] is False
+
+def test_login_rehashes_old_cost(client, app_module):
+    old = hashing.HashPool(rounds=5).hash("secret-pw")
+    app_module.users.insert_one({"username": "tester", "passwordHash": old})
+    resp = client.post("/api/login", json={"username": "tester", "password": "secret-pw"})
+    assert resp.status_code == 200
+    app_module.hash_pool._executor.shutdown(wait=True)  # 백그라운드 재해시 완료 대기
+    assert hashing.cost_of(app_module.users.find_one({"username": "tester"})["passwordHash"]) == 4
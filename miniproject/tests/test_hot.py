@@ -0,0 +1,65 @@
+import math
+from datetime import datetime, timedelta
+
+import pytest
+
+import hot
+import versions
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+def entry(post_id, board, score, at):
+    return {"_id": post_id, "board": board, "score": score, "at": at,
+            "rank": math.log2(score) + hot._time_term(at)}
+
+def test_score_halves_every_half_life():
+    doc = {"score": 8.0, "at": NOW}
+    assert hot.current_score(doc, NOW) == pytest.approx(8.0)
+    assert hot.current_score(doc, NOW + hot.HALF_LIFE) == pytest.approx(4.0)
+    assert hot.current_score(doc, NOW + 3 * hot.HALF_LIFE) == pytest.approx(1.0)
+
+def test_rank_order_matches_current_score_order():
+    # 오래전에 점수가 높았던 글 vs 최근에 점수가 낮은 글
+    docs = [
+        entry("old_big", "A", 10.0, NOW - 4 * hot.HALF_LIFE),   # 지금 0.625
+        entry("new_small", "A", 1.0, NOW),                        # 지금 1.0
+        entry("mid", "A", 3.0, NOW - hot.HALF_LIFE),              # 지금 1.5
+    ]
+    later = NOW + timedelta(hours=5)
+    by_rank = [d["_id"] for d in sorted(docs, key=lambda d: d["rank"], reverse=True)]
+    by_score = [d["_id"] for d in sorted(docs, key=lambda d: hot.current_score(d, later), reverse=True)]
+    assert by_rank == by_score == ["mid", "new_small", "old_big"]
+
+def test_record_pipeline_adds_weight_to_decayed_score():
+    stage = hot.record_pipeline("Outside", 2.0)[0]["$set"]
+    assert stage["board"] == "Outside"
+    assert stage["score"]["$max"][0]["$add"][1] == 2.0
+    assert stage["at"] == "$$NOW"
+
+def test_top_returns_rank_order_per_board(mongo):
+    db = mongo.get_default_database()
+    db[hot.COLLECTION].insert_many([
+        entry(1, "A", 1.0, NOW), entry(2, "A", 5.0, NOW), entry(3, "B", 9.0, NOW),
+    ])
+    assert [pid for pid, _ in hot.top(db, "A", 10)] == [2, 1]
+    assert [pid for pid, _ in hot.top(db, None, 2)] == [3, 2]
+
+def test_compact_drops_cold_and_overflow_and_bumps_boards(mongo):
+    db = mongo.get_default_database()
+    now = datetime.utcnow()
+    db[hot.COLLECTION].insert_many([
+        entry(1, "A", 5.0, now), entry(2, "A", 4.0, now), entry(3, "A", 3.0, now),
+        entry(4, "B", 5.0, now),
+        entry(5, "C", 1.0, now - 20 * hot.HALF_LIFE),  # MIN_SCORE 아래로 식음
+    ])
+    removed = hot.compact(db, keep=2)
+    assert removed == 2
+    assert sorted(d["_id"] for d in db[hot.COLLECTION].find()) == [1, 2, 4]
+    bumped = {d["_id"] for d in db[versions.COLLECTION].find()}
+    assert bumped == {versions.board_key("A"), versions.board_key("C"), versions.board_key(None)}
+
+def test_compact_with_nothing_to_drop_bumps_nothing(mongo):
+    db = mongo.get_default_database()
+    db[hot.COLLECTION].insert_one(entry(1, "A", 5.0, datetime.utcnow()))
+    assert hot.compact(db) == 0
+    assert db[versions.COLLECTION].count_documents({}) == 0
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import jobs
+from conftest import make_post
+
+@pytest.fixture
+def db(mongo, monkeypatch):
+    monkeypatch.setattr(jobs, "_handlers", {})
+    monkeypatch.setattr(jobs, "_schedules", {})
+    return mongo.get_default_database()
+
+def only_job(db):
+    (job,) = db[jobs.COLLECTION].find()
+    return job
+
+def test_run_one_runs_handler_and_marks_done(db):
+    seen = []
+    jobs.handler("test.ok")(seen.append)
+    jobs.enqueue(db, "test.ok", {"n": 1})
+
+    assert jobs.run_one(db) is True
+    assert seen == [{"n": 1}]
+    job = only_job(db)
+    assert job["status"] == "done" and job["attempts"] == 1
+    assert "locked_until" not in job and job["finished_at"]
+    assert jobs.run_one(db) is False  # 더 꺼낼 작업 없음
+
+def test_delayed_job_waits_for_run_at(db):
+    jobs.enqueue(db, "test.ok", {}, delay=60)
+    assert jobs._claim(db, "w") is None
+
+def test_running_job_is_reclaimed_only_after_lease_expires(db):
+    jobs.enqueue(db, "test.ok", {})
+    first = jobs._claim(db, "w1")
+    assert first["status"] == "running" and first["worker"] == "w1"
+    assert jobs._claim(db, "w2") is None  # 리스 유지 중
+
+    db[jobs.COLLECTION].update_one({"_id": first["_id"]},
+                                   {"$set": {"locked_until": datetime.utcnow() - timedelta(seconds=1)}})
+    again = jobs._claim(db, "w2")
+    assert again["_id"] == first["_id"]
+    assert again["worker"] == "w2" and again["attempts"] == 2
+
+def test_failure_requeues_with_backoff(db):
+    def boom(payload):
+        raise RuntimeError("잠깐 실패")
+    jobs.handler("test.fail")(boom)
+    jobs.enqueue(db, "test.fail", {})
+
+    started = datetime.utcnow().replace(microsecond=0)  # Mongo 는 밀리초까지만 저장
+    jobs.run_one(db)
+    job = only_job(db)
+    assert job["status"] == "queued" and job["error"] == "잠깐 실패"
+    assert "locked_until" not in job
+    # 1회차 실패 → 2초 뒤 재시도
+    assert started + timedelta(seconds=2) <= job["run_at"] <= datetime.utcnow() + timedelta(seconds=2)
+    assert jobs.run_one(db) is False
+
+def test_job_fails_after_max_attempts(db):
+    jobs.enqueue(db, "test.missing", {})  # 핸들러 없음 → 매번 실패
+    for _ in range(jobs.MAX_ATTEMPTS):
+        db[jobs.COLLECTION].update_many({}, {"$set": {"run_at": datetime.utcnow()}})
+        assert jobs.run_one(db) is True
+    job = only_job(db)
+    assert job["status"] == "failed" and job["attempts"] == jobs.MAX_ATTEMPTS
+    assert "등록되지 않은 작업 종류" in job["error"]
+    assert jobs.run_one(db) is False
+
+def test_every_enqueues_once_per_interval(db):
+    jobs.every("test.tick", 600)
+    assert jobs.enqueue_due(db) == 1
+    assert jobs.enqueue_due(db) == 0  # 다른 워커/다음 확인: 아직 주기 전
+    assert db[jobs.COLLECTION].count_documents({"type": "test.tick"}) == 1
+
+    db[jobs.SCHEDULES].update_one({"_id": "test.tick"}, {"$set": {"next_run": datetime.utcnow()}})
+    assert jobs.enqueue_due(db) == 1
+    assert db[jobs.COLLECTION].count_documents({"type": "test.tick"}) == 2
+
+# ── user.purge ──
+def comment(app_module, post, author, at):
+    doc = {"_id": ObjectId(), "post_id": post["_id"], "author": author, "content": "댓글", "created_at": at}
+    app_module.comments.insert_one(doc)
+    app_module.posts.update_one({"_id": post["_id"]}, {"$inc": {"comments_count": 1}})
+
+def like(app_module, post, username, at):
+    app_module.likes.insert_one({"post_id": post["_id"], "username": username, "created_at": at})
+    app_module.posts.update_one({"_id": post["_id"]}, {"$inc": {"likes_count": 1}})
+
+def test_purge_removes_only_data_from_before_deletion(app_module):
+    deleted_at = datetime.utcnow()
+    old, new = deleted_at - timedelta(days=1), deleted_at + timedelta(seconds=1)
+    own_old = make_post(app_module, author="leaver", created_at=old)
+    own_new = make_post(app_module, author="leaver", created_at=new)  # 같은 아이디로 재가입 후 작성
+    other = make_post(app_module, author="stayer")
+    comment(app_module, other, "leaver", old)
+    comment(app_module, other, "leaver", old)
+    comment(app_module, other, "leaver", new)
+    comment(app_module, other, "stayer", old)
+    like(app_module, other, "leaver", old)
+    like(app_module, own_new, "stayer", new)
+
+    app_module.purge_user_job({"username": "leaver", "deleted_at": deleted_at})
+
+    assert app_module.posts.find_one({"_id": own_old["_id"]}) is None
+    assert app_module.posts.find_one({"_id": own_new["_id"]}) is not None
+    remaining = app_module.posts.find_one({"_id": other["_id"]})
+    assert remaining["comments_count"] == 2 and remaining["likes_count"] == 0
+    assert sorted(c["author"] for c in app_module.comments.find({"post_id": other["_id"]})) == ["leaver", "stayer"]
+    assert app_module.likes.count_documents({"username": "leaver"}) == 0
+    assert app_module.db[jobs.COLLECTION].count_documents({"type": "post.cascade"}) == 1
+    assert app_module.db[jobs.COLLECTION].count_documents({"type": "user.purge"}) == 0
+
+def test_purge_requeues_until_done(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "PURGE_BATCH", 2)
+    post = make_post(app_module, author="stayer")
+    at = datetime.utcnow() - timedelta(days=1)
+    for _ in range(3):
+        comment(app_module, post, "leaver", at)
+    payload = {"username": "leaver", "deleted_at": datetime.utcnow()}
+
+    app_module.purge_user_job(payload)
+    assert app_module.db[jobs.COLLECTION].count_documents({"type": "user.purge"}) == 1
+    assert app_module.posts.find_one({"_id": post["_id"]})["comments_count"] == 1
+
+    app_module.purge_user_job(payload)
+    assert app_module.posts.find_one({"_id": post["_id"]})["comments_count"] == 0
+    assert app_module.comments.count_documents({}) == 0
+
+def test_delete_counted_recounts_when_some_docs_are_already_gone(app_module):
+    post = make_post(app_module)
+    at = datetime.utcnow()
+    for author in ("a_user", "b_user", "c_user"):
+        comment(app_module, post, author, at)
+    docs = list(app_module.comments.find({"author": {"$in": ["a_user", "b_user"]}}, {"post_id": 1}))
+    app_module.comments.delete_one({"_id": docs[0]["_id"]})  # 다른 곳에서 먼저 지움 (카운터는 그대로)
+
+    app_module.delete_counted(app_module.comments, docs, "comments_count")
+    assert app_module.posts.find_one({"_id": post["_id"]})["comments_count"] == 1
@@ -0,0 +1,42 @@
+from conftest import login, make_post
+
+def like(client, post_id):
+    return client.post(f"/api/posts/{post_id}/like")
+
+def test_like_requires_login(client, app_module):
+    post = make_post(app_module)
+    assert like(client, post["_id"]).status_code == 401
+
+def test_like_toggles_and_keeps_count(client, app_module):
+    post = make_post(app_module)
+    login(client)
+
+    first = like(client, post["_id"]).get_json()["data"]
+    assert first == {"likes_count": 1, "liked": True}
+    assert app_module.likes.count_documents({"post_id": post["_id"], "username": "tester"}) == 1
+
+    second = like(client, post["_id"]).get_json()["data"]
+    assert second == {"likes_count": 0, "liked": False}
+    assert app_module.likes.count_documents({"post_id": post["_id"]}) == 0
+    assert app_module.posts.find_one({"_id": post["_id"]})["likes_count"] == 0
+
+def test_likes_from_different_users_add_up(client, app_module):
+    post = make_post(app_module)
+    for name in ("a_user", "b_user", "c_user"):
+        login(client, name)
+        like(client, post["_id"])
+    assert app_module.posts.find_one({"_id": post["_id"]})["likes_count"] == 3
+
+def test_like_on_missing_post_leaves_no_like(client, app_module):
+    login(client)
+    resp = like(client, "0" * 24)
+    assert resp.status_code == 404
+    assert app_module.likes.count_documents({}) == 0
+
+def test_detail_reports_viewer_like(client, app_module):
+    post = make_post(app_module)
+    login(client)
+    like(client, post["_id"])
+    data = client.get(f"/api/posts/{post['_id']}").get_json()["data"]
+    assert data["liked"] is True
+    assert data["likes_count"] == 1
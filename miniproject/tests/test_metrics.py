@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+import metrics
+from conftest import make_post
+
+@pytest.fixture
+def registry(app_module, monkeypatch):
+    registry = metrics.Registry()
+    metrics.describe_http(registry)
+    monkeypatch.setattr(app_module, "app_metrics", registry)
+    return registry
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    registry.describe("t_seconds", "histogram", "테스트")
+    for value in (0.001, 0.02, 0.02, 20):
+        registry.observe("t_seconds", (("endpoint", "a"),), value)
+    text = registry.render()
+
+    assert text.count("# TYPE t_seconds histogram") == 1
+    assert 't_seconds_bucket{endpoint="a",le="0.001"} 1' in text
+    assert 't_seconds_bucket{endpoint="a",le="0.025"} 3' in text
+    assert 't_seconds_bucket{endpoint="a",le="10"} 3' in text
+    assert 't_seconds_bucket{endpoint="a",le="+Inf"} 4' in text
+    assert 't_seconds_count{endpoint="a"} 4' in text
+    assert 't_seconds_sum{endpoint="a"} 20.041000' in text
+
+def test_label_values_are_escaped():
+    registry = metrics.Registry()
+    registry.inc("c_total", (("path", 'a"b\\c'),))
+    assert 'c_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+def test_requests_are_labelled_by_route_not_path(client, app_module, registry):
+    for _ in range(2):
+        client.get(f"/api/posts/{make_post(app_module)['_id']}")
+    client.get("/api/posts/" + "0" * 24)
+    text = registry.render()
+
+    assert 'http_requests_total{endpoint="main.get_post_api",method="GET",status="200"} 2' in text
+    assert 'http_requests_total{endpoint="main.get_post_api",method="GET",status="404"} 1' in text
+    assert 'http_request_duration_seconds_count{endpoint="main.get_post_api",method="GET"} 3' in text
+    assert 'http_response_size_bytes_count{endpoint="main.get_post_api"} 3' in text
+    assert "0" * 24 not in text
+
+def test_unmatched_requests_share_one_label(client, registry):
+    client.get("/api/no-such-route")
+    client.get("/api/another-missing")
+    assert 'http_requests_total{endpoint="unmatched",method="GET",status="404"} 2' in registry.render()
+
+def test_metrics_endpoint_exposes_text_format(client, registry):
+    client.get("/api/posts")
+    resp = client.get("/api/metrics")
+    text = resp.get_data(as_text=True)
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/plain"
+    assert resp.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'endpoint="main.list_posts_api"' in text
+    assert "# TYPE cache_entries gauge" in text
+    assert "\ncache_hits_total " in text
+
+def event(command_name, command, micros, request_id=1):
+    return SimpleNamespace(command_name=command_name, command=command, connection_id=("db", 27017),
+                           request_id=request_id, duration_micros=micros)
+
+def test_mongo_listener_times_commands_per_collection(capsys):
+    registry = metrics.Registry()
+    listener = metrics.MongoCommandListener(registry, slow_ms=100)
+    listener.started(event("find", {"find": "posts", "filter": {"author": "secret"}}, 0))
+    listener.succeeded(event("find", {}, 250_000))
+    listener.started(event("getMore", {"getMore": 1, "collection": "comments"}, 0, request_id=2))
+    listener.failed(event("getMore", {}, 1000, request_id=2))
+    text = registry.render()
+
+    assert 'mongodb_command_duration_seconds_count{collection="posts",command="find"} 1' in text
+    assert 'mongodb_slow_commands_total{collection="posts",command="find"} 1' in text
+    assert 'mongodb_command_failures_total{collection="comments",command="getMore"} 1' in text
+    out = capsys.readouterr().out
+    assert "posts.find" in out and "secret" not in out
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+import migrations
+import search
+
+def legacy_db(mongo):
+    """likes/검색 필드 이전 전에 1~6 까지만 적용된 DB"""
+    db = mongo.get_default_database()
+    migrations.migrate(db, target=6)
+    post_id = ObjectId()
+    db["posts"].insert_one({"_id": post_id, "title": "학식메뉴", "content": "오늘 식당에서", "board": "Cafeteria",
+                            "author": "writer", "created_at": datetime.utcnow(), "excerpt": "오늘 식당에서",
+                            "liked_by": ["a_user", "b_user", "a_user"], "comments_count": 1})
+    db["comments"].insert_one({"post_id": post_id, "author": "a_user", "content": "맛있어요",
+                               "created_at": datetime.utcnow()})
+    return db, post_id
+
+def test_backfills_are_pending_on_upgraded_db(mongo):
+    db, _ = legacy_db(mongo)
+    assert [v for v, _ in migrations.pending(db)] == [7, 8]
+    assert migrations.Gate().check(db)  # 이전 전에는 요청을 거절
+
+def test_migrate_moves_liked_by_into_likes(mongo):
+    db, post_id = legacy_db(mongo)
+    db["likes"].insert_one({"post_id": post_id, "username": "b_user", "created_at": datetime.utcnow()})
+
+    assert [v for v, _ in migrations.migrate(db)] == [7, 8]
+    post = db["posts"].find_one({"_id": post_id})
+    assert "liked_by" not in post
+    assert post["likes_count"] == 2
+    assert sorted(l["username"] for l in db["likes"].find({"post_id": post_id})) == ["a_user", "b_user"]
+    assert migrations.pending(db) == []
+
+def test_migrate_fills_search_fields(mongo):
+    db, post_id = legacy_db(mongo)
+    migrations.migrate(db)
+    post = db["posts"].find_one({"_id": post_id})
+    assert post[search.TITLE_FIELD] == "학식 식메 메뉴"
+    comment = db["comments"].find_one({"post_id": post_id})
+    assert comment[search.BODY_FIELD] == "맛있 있어 어요"
+    assert comment["board"] == "Cafeteria"
+
+def test_backfills_can_run_again(mongo):
+    db, post_id = legacy_db(mongo)
+    migrations.migrate(db)
+    before = list(db["likes"].find({}, {"_id": 0}))
+    # 중간에 끊긴 뒤 다시 돌리는 경우: 남은 문서만 처리하고 이미 옮긴 것은 그대로
+    db["posts"].update_one({"_id": post_id}, {"$set": {"liked_by": ["a_user"]}})
+    migrations._move_liked_by(db)
+    migrations._search_fields(db)
+    assert list(db["likes"].find({}, {"_id": 0})) == before
+    assert db["posts"].find_one({"_id": post_id})["likes_count"] == 2
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+import api
+from conftest import login, make_post
+
+def test_cursor_round_trip_truncates_to_milliseconds():
+    doc = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456)}
+    created_at, oid = api.decode_cursor(api.encode_cursor(doc))
+    assert created_at == datetime(2024, 5, 1, 12, 30, 15, 123000)
+    assert oid == doc["_id"]
+
+def test_cursor_normalises_aware_datetimes_to_utc():
+    oid = ObjectId()
+    kst = timezone(timedelta(hours=9))
+    aware = {"_id": oid, "created_at": datetime(2024, 5, 1, 21, 0, tzinfo=kst)}
+    naive = {"_id": oid, "created_at": datetime(2024, 5, 1, 12, 0)}
+    assert api.encode_cursor(aware) == api.encode_cursor(naive)
+
+@pytest.mark.parametrize("token", ["", "not-base64!", "MTIzNDU", "MTIzOnh5eg"])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(ValueError):
+        api.decode_cursor(token)
+
+def test_keyset_filter_breaks_ties_on_id():
+    key = (datetime(2024, 1, 1), ObjectId())
+    assert api.keyset_filter(key, forward=True) == {"$or": [
+        {"created_at": {"$lt": key[0]}},
+        {"created_at": key[0], "_id": {"$lt": key[1]}},
+    ]}
+    assert api.keyset_filter(key, forward=False)["$or"][0] == {"created_at": {"$gt": key[0]}}
+
+def seed_comments(app_module, post_id, n, same_time_every=3):
+    base = datetime(2024, 1, 1)
+    docs = [{"_id": ObjectId(), "post_id": post_id, "author": "u", "content": f"c{i}",
+             # 여러 댓글이 같은 시각 → _id 로 순서가 갈려야 한다
+             "created_at": base + timedelta(seconds=i // same_time_every)} for i in range(n)]
+    app_module.comments.insert_many(docs)
+    return sorted(docs, key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+
+def test_keyset_page_walks_forward_and_back_without_gaps(app_module):
+    post_id = ObjectId()
+    expected = seed_comments(app_module, post_id, 23)
+    query = {"post_id": post_id}
+
+    seen, after = [], None
+    pages = []
+    while True:
+        docs, has_next, has_prev = app_module.keyset_page(app_module.comments, query, 5, after=after)
+        assert has_prev == (after is not None)
+        pages.append(docs)
+        seen += [d["_id"] for d in docs]
+        if not has_next:
+            break
+        after = api.decode_cursor(api.encode_cursor(docs[-1]))
+    assert seen == [d["_id"] for d in expected]
+
+    # 마지막 페이지 첫 항목 기준으로 before → 직전 페이지 그대로
+    before = api.decode_cursor(api.encode_cursor(pages[-1][0]))
+    docs, has_next, has_prev = app_module.keyset_page(app_module.comments, query, 5, before=before)
+    assert [d["_id"] for d in docs] == [d["_id"] for d in pages[-2]]
+    assert has_next is True and has_prev is True
+
+def test_comment_api_pages_with_cursors(client, app_module):
+    post = make_post(app_module)
+    expected = seed_comments(app_module, post["_id"], 12)
+
+    first = client.get(f"/api/posts/{post['_id']}/comments?per_page=5").get_json()["data"]
+    assert [c["id"] for c in first["items"]] == [str(d["_id"]) for d in expected[:5]]
+    assert first["has_next"] and not first["has_prev"] and first["prev_cursor"] is None
+
+    second = client.get(f"/api/posts/{post['_id']}/comments?per_page=5&after={first['next_cursor']}").get_json()["data"]
+    assert [c["id"] for c in second["items"]] == [str(d["_id"]) for d in expected[5:10]]
+    assert second["has_prev"]
+
+    back = client.get(f"/api/posts/{post['_id']}/comments?per_page=5&before={second['prev_cursor']}").get_json()["data"]
+    assert back["items"] == first["items"]
+
+def test_comment_api_rejects_bad_cursor(client, app_module):
+    post = make_post(app_module)
+    resp = client.get(f"/api/posts/{post['_id']}/comments?after=garbage")
+    assert resp.status_code == 400
+
+def test_comment_api_streams_ndjson(client, app_module):
+    post = make_post(app_module)
+    seed_comments(app_module, post["_id"], 4)
+    resp = client.get(f"/api/posts/{post['_id']}/comments?stream=true")
+    assert resp.mimetype == "application/x-ndjson"
+    assert len(resp.get_data(as_text=True).splitlines()) == 4
+
+def test_post_list_cursor_pages(client, app_module):
+    made = [make_post(app_module, created_at=datetime(2024, 1, 1) + timedelta(minutes=i)) for i in range(7)]
+    login(client)
+    first = client.get("/api/posts?per_page=3&include_total=false").get_json()["data"]
+    second = client.get(f"/api/posts?per_page=3&include_total=false&after={first['next_cursor']}").get_json()["data"]
+    ids = [p["id"] for p in first["items"] + second["items"]]
+    assert ids == [str(d["_id"]) for d in reversed(made)][:6]
@@ -0,0 +1,92 @@
+import gzip
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+from flask import Response
+
+import responses
+from conftest import login, make_post
+
+@pytest.fixture
+def small_threshold(monkeypatch):
+    monkeypatch.setattr(responses, "COMPRESS_MIN_BYTES", 64)
+
+def listing(client, encoding=None):
+    return client.get("/api/posts", headers={"Accept-Encoding": encoding} if encoding else {})
+
+# ── 압축 ──
+def test_brotli_preferred_when_accepted(client, app_module, small_threshold):
+    brotli = pytest.importorskip("brotli")
+    make_post(app_module)
+    plain = listing(client)
+    resp = listing(client, "gzip, deflate, br")
+    assert resp.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(resp.get_data()) == plain.get_data()
+    assert "Accept-Encoding" in resp.headers["Vary"]
+
+def test_gzip_when_brotli_not_accepted(client, app_module, small_threshold):
+    make_post(app_module)
+    resp = listing(client, "gzip")
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resp.get_data()) == listing(client).get_data()
+
+def test_identity_and_small_bodies_still_vary(client, app_module, monkeypatch):
+    make_post(app_module)
+    monkeypatch.setattr(responses, "COMPRESS_MIN_BYTES", 10 ** 6)
+    small = listing(client, "gzip, br")
+    assert "Content-Encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["Vary"]
+
+    monkeypatch.setattr(responses, "COMPRESS_MIN_BYTES", 64)
+    identity = listing(client, "identity")
+    assert "Content-Encoding" not in identity.headers
+    assert "Accept-Encoding" in identity.headers["Vary"]
+
+def test_not_modified_and_streams_are_left_alone(client, app_module, small_threshold):
+    post = make_post(app_module)
+    for i in range(5):
+        app_module.comments.insert_one({"post_id": post["_id"], "author": "a", "content": "댓글" * 20,
+                                        "created_at": datetime.utcnow()})
+    etag = listing(client).headers["ETag"]
+    unchanged = client.get("/api/posts", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+    assert unchanged.status_code == 304 and "Content-Encoding" not in unchanged.headers
+
+    stream = client.get(f"/api/posts/{post['_id']}/comments?stream=true", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in stream.headers
+    assert len(stream.get_data().splitlines()) == 5
+
+def test_strong_etag_is_weakened_after_compression(flask_app, small_threshold):
+    with flask_app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        resp = Response(b"{}" * 100, mimetype="application/json")
+        resp.set_etag("abc")
+        resp = responses.compress_response(resp)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.get_etag() == ("abc", True)
+
+def test_images_are_not_compressed(flask_app, small_threshold):
+    with flask_app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        resp = responses.compress_response(Response(b"\0" * 1000, mimetype="image/png"))
+    assert "Content-Encoding" not in resp.headers
+
+# ── orjson ──
+def test_orjson_provider_round_trip(flask_app):
+    pytest.importorskip("orjson")
+    assert isinstance(flask_app.json, responses.OrjsonProvider)
+    oid = ObjectId()
+    data = {"title": "한글 제목", "n": 3, "nested": [1.5, None, True], 7: "int key"}
+    text = flask_app.json.dumps(data)
+    assert "한글 제목" in text  # \u 이스케이프 없이
+    assert flask_app.json.loads(text) == {**{k: v for k, v in data.items() if k != 7}, "7": "int key"}
+    with flask_app.app_context():
+        body = flask_app.json.response({"id": str(oid)}).get_data()
+    assert body.endswith(b"\n") and flask_app.json.loads(body) == {"id": str(oid)}
+
+def test_request_json_round_trips_through_routes(client, app_module):
+    post = make_post(app_module)
+    login(client)
+    content = "첫 줄\n\"따옴표\" 와 이모지 🙂"
+    resp = client.post(f"/api/posts/{post['_id']}/comments", json={"content": content})
+    assert resp.status_code == 201
+    assert resp.get_json()["data"]["content"] == content
+    assert "따옴표".encode("utf-8") in resp.get_data()
@@ -0,0 +1,41 @@
+import pytest
+
+import search
+
+@pytest.mark.parametrize("text, expected", [
+    ("학식 메뉴", ["학식", "메뉴"]),
+    ("식당에서", ["식당", "당에", "에서"]),
+    ("Delivery", ["de", "el", "li", "iv", "ve", "er", "ry"]),
+    ("떡볶이, 김밥!", ["떡볶", "볶이", "김밥"]),
+    ("a 1", ["a", "1"]),
+    ("", []),
+    (None, []),
+])
+def test_grams(text, expected):
+    assert search.grams(text) == expected
+
+def test_post_fields_cap_body_grams(monkeypatch):
+    monkeypatch.setattr(search, "MAX_BODY_GRAMS", 3)
+    fields = search.post_fields("학식메뉴", "가나다라마바")
+    assert fields == {search.TITLE_FIELD: "학식 식메 메뉴", search.BODY_FIELD: "가나 나다 다라"}
+
+def test_text_query_quotes_every_gram_so_all_are_required():
+    assert search.text_query("떡볶이") == {"$text": {"$search": '"떡볶" "볶이"'}}
+
+def test_text_query_dedupes_and_caps(monkeypatch):
+    monkeypatch.setattr(search, "MAX_QUERY_GRAMS", 2)
+    assert search.text_query("ab ab cd ef") == {"$text": {"$search": '"ab" "cd"'}}
+
+@pytest.mark.parametrize("q", ["", "   ", "!!! ?"])
+def test_text_query_without_tokens_is_none(q):
+    assert search.text_query(q) is None
+
+def test_excerpt_collapses_whitespace_and_truncates():
+    assert search.excerpt("  a\n\n b\tc ") == "a b c"
+    long = "가" * (search.EXCERPT_CHARS + 10)
+    assert search.excerpt(long) == "가" * search.EXCERPT_CHARS + "…"
+
+def test_search_api_validates_query(client):
+    assert client.get("/api/search?q=%20").status_code == 400
+    assert client.get("/api/search?q=abc&scope=users").status_code == 400
+    assert client.get("/api/search?q=abc&page=200&per_page=50").status_code == 400
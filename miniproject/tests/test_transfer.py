@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+import migrations
+import transfer
+
+def seed(db):
+    migrations.migrate(db)
+    post_id = ObjectId()
+    db["users"].insert_one({"username": "writer", "password": "x"})
+    db["posts"].insert_one({"_id": post_id, "title": "점심 메뉴", "content": "본문", "board": "Cafeteria",
+                            "author": "writer", "created_at": datetime.utcnow(), "images": []})
+    db["likes"].insert_one({"post_id": post_id, "username": "writer", "created_at": datetime.utcnow()})
+    return post_id
+
+def index_keys(coll) -> list:
+    return [tuple(spec["key"]) for spec in coll.index_information().values()]
+
+def test_import_with_drop_recreates_indexes(mongo, tmp_path):
+    import mongomock
+
+    source = mongo.get_default_database()
+    post_id = seed(source)
+    transfer.export_bundle(source, str(tmp_path), log=lambda *a, **k: None)
+
+    target = mongomock.MongoClient("mongodb://localhost/miniproject_restore").get_default_database()
+    seed(target)  # 이미 마이그레이션된 DB 를 --drop 으로 덮어쓰는 경우
+    summary = transfer.import_bundle(target, str(tmp_path), drop=True, log=lambda *a, **k: None)
+
+    assert summary["posts"] == 1 and summary["likes"] == 1
+    assert migrations.pending(target) == []
+    users = target["users"].index_information()
+    assert any(spec.get("unique") and spec["key"] == [("username", 1)] for spec in users.values())
+    likes = target["likes"].index_information()
+    assert any(spec.get("unique") and spec["key"] == [("post_id", 1), ("username", 1)] for spec in likes.values())
+    assert (("post_id", 1), ("created_at", -1), ("_id", -1)) in index_keys(target["comments"])
+    assert (("board", 1), ("rank", -1)) in index_keys(target["hot_posts"])
+    assert target["posts"].find_one({"_id": post_id})["likes_count"] == 1
+
+def test_import_without_drop_keeps_existing_documents(mongo, tmp_path):
+    source = mongo.get_default_database()
+    seed(source)
+    transfer.export_bundle(source, str(tmp_path), log=lambda *a, **k: None)
+    summary = transfer.import_bundle(source, str(tmp_path), log=lambda *a, **k: None)
+    assert summary["posts"] == 0  # _id 중복은 건너뜀
+    assert source["posts"].count_documents({}) == 1
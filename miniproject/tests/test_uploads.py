@@ -0,0 +1,156 @@
+import io
+
+import pytest
+from bson import ObjectId
+from werkzeug.datastructures import FileStorage
+
+import images
+import uploads
+from conftest import login
+
+@pytest.fixture
+def folder(app_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "UPLOAD_FOLDER", str(tmp_path))
+    return tmp_path
+
+@pytest.fixture
+def scheduled(app_module, monkeypatch):
+    """images.schedule 대신 on_done 콜백을 모아 둔다 (워커 프로세스 없이)"""
+    calls = []
+    monkeypatch.setattr(app_module.images, "schedule", lambda src_path, on_done: calls.append((src_path, on_done)))
+    return calls
+
+def create_post(client, *files):
+    data = {"title": "제목", "content": "본문", "board": "Cafeteria",
+            "images": [(io.BytesIO(body), name) for name, body in files]}
+    return client.post("/api/posts", data=data, content_type="multipart/form-data")
+
+def test_limited_spool_stops_past_max_bytes():
+    spool = uploads.LimitedSpool(10, max_size=4)
+    spool.write(b"12345")
+    spool.write(b"67890")
+    with pytest.raises(uploads.FileTooLarge):
+        spool.write(b"x")
+
+def test_oversized_file_is_rejected_while_parsing(client, app_module, folder, scheduled, monkeypatch):
+    monkeypatch.setattr(app_module, "MAX_FILE_MB", 1)
+    monkeypatch.setattr(uploads, "store", lambda *args: pytest.fail("파싱 단계에서 끊겨야 함"))
+    login(client)
+    resp = create_post(client, ("big.png", b"\0" * (1024 * 1024 + 1)))
+    assert resp.status_code == 400
+    assert "1MB" in resp.get_json()["msg"]
+    assert app_module.posts.count_documents({}) == 0
+    assert list(folder.iterdir()) == []
+
+def test_variants_are_recorded_for_live_upload(client, app_module, folder, scheduled):
+    login(client)
+    assert create_post(client, ("a.png", b"image-bytes")).status_code == 201
+    post = app_module.posts.find_one({})
+    filename = post["images"][0].rsplit("/", 1)[1]
+
+    (_, on_done), = scheduled
+    names = images.variant_names(filename)
+    for name in names.values():
+        (folder / name).write_bytes(b"webp")
+    on_done(names)
+
+    assert app_module.db.uploads.find_one({"_id": filename})["variants"] == names
+    assert app_module.posts.find_one({"_id": post["_id"]})["image_variants"] == [app_module.variant_urls(filename, names)]
+    assert all((folder / name).exists() for name in names.values())
+
+def test_variants_finished_after_post_deleted_are_unlinked(client, app_module, folder, scheduled):
+    login(client)
+    assert create_post(client, ("a.png", b"image-bytes")).status_code == 201
+    post = app_module.posts.find_one({})
+    filename = post["images"][0].rsplit("/", 1)[1]
+
+    # 변형본 생성 중에 글이 지워져 마지막 참조가 풀림
+    app_module.posts.delete_one({"_id": post["_id"]})
+    app_module.release_upload(post["images"][0], post["_id"])
+    assert not (folder / filename).exists()
+
+    (_, on_done), = scheduled
+    names = images.variant_names(filename)
+    for name in names.values():
+        (folder / name).write_bytes(b"webp")
+    on_done(names)
+
+    assert list(folder.iterdir()) == []
+    assert app_module.db.uploads.find_one({"_id": filename}) is None
+
+def test_set_variants_needs_an_owner(app_module):
+    app_module.db.uploads.insert_one({"_id": "a" * 64 + ".png", "owners": []})
+    assert not uploads.set_variants(app_module.db, "a" * 64 + ".png", {"thumb": "t"})
+    app_module.db.uploads.update_one({"_id": "a" * 64 + ".png"}, {"$push": {"owners": ObjectId()}})
+    assert uploads.set_variants(app_module.db, "a" * 64 + ".png", {"thumb": "t"})
+
+# ── 내용 주소 저장: 중복 제거, 참조 수, 해제 ──
+def store(app_module, folder, body, owner):
+    return uploads.store(app_module.db, FileStorage(io.BytesIO(body), "a.png"), str(folder), "png", 1024, owner)
+
+def test_same_content_is_stored_once(app_module, folder):
+    first, second = ObjectId(), ObjectId()
+    a = store(app_module, folder, b"same", first)
+    b = store(app_module, folder, b"same", second)
+    assert a["_id"] == b["_id"]
+    assert b["owners"] == [first, second]
+    assert [p.name for p in folder.iterdir()] == [a["_id"]]
+
+def test_store_is_idempotent_per_owner(app_module, folder):
+    owner = ObjectId()
+    store(app_module, folder, b"same", owner)
+    entry = store(app_module, folder, b"same", owner)
+    assert entry["owners"] == [owner]
+
+def test_release_deletes_only_after_last_owner(app_module, folder):
+    first, second = ObjectId(), ObjectId()
+    name = store(app_module, folder, b"same", first)["_id"]
+    store(app_module, folder, b"same", second)
+
+    app_module.release_upload(f"/uploads/{name}", first)
+    assert (folder / name).exists()
+    assert app_module.db.uploads.find_one({"_id": name})["owners"] == [second]
+
+    app_module.release_upload(f"/uploads/{name}", first)  # 재시도돼도 참조 수는 그대로
+    assert app_module.db.uploads.find_one({"_id": name})["owners"] == [second]
+
+    app_module.release_upload(f"/uploads/{name}", second)
+    assert app_module.db.uploads.find_one({"_id": name}) is None
+    assert list(folder.iterdir()) == []
+
+def test_release_keeps_document_reclaimed_before_delete(app_module, folder, monkeypatch):
+    owner, newcomer = ObjectId(), ObjectId()
+    name = store(app_module, folder, b"same", owner)["_id"]
+    coll = app_module.db.uploads
+    pull = coll.find_one_and_update
+
+    def pull_then_store(*args, **kwargs):
+        entry = pull(*args, **kwargs)
+        coll.update_one({"_id": name}, {"$addToSet": {"owners": newcomer}})  # $pull 과 삭제 사이에 store
+        return entry
+
+    monkeypatch.setattr(coll, "find_one_and_update", pull_then_store)
+    assert not uploads.release(app_module.db, name, owner)
+    monkeypatch.undo()
+    assert coll.find_one({"_id": name})["owners"] == [newcomer]
+
+def test_store_recreates_missing_file(app_module, folder):
+    owner = ObjectId()
+    name = store(app_module, folder, b"same", owner)["_id"]
+    (folder / name).unlink()
+    store(app_module, folder, b"same", ObjectId())
+    assert (folder / name).read_bytes() == b"same"
+
+def test_discard_restores_files_of_revived_upload(app_module, folder):
+    owner = ObjectId()
+    name = store(app_module, folder, b"same", owner)["_id"]
+    variant = images.variant_names(name)["thumb"]
+    (folder / variant).write_bytes(b"webp")
+
+    # release() 는 True 였지만 파일을 지우기 전에 다른 글이 같은 내용을 다시 올림
+    assert not uploads.discard(app_module.db, str(folder), name, [variant])
+    assert sorted(p.name for p in folder.iterdir()) == sorted([name, variant])
+
+    app_module.db.uploads.delete_one({"_id": name})
+    assert uploads.discard(app_module.db, str(folder), name, [variant])
+    assert list(folder.iterdir()) == []
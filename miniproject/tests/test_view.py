@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import api
+from conftest import login, make_post
+
+# ── 집계 파이프라인 / 응답 모양 (DB 없이) ──
+def aggregated(n_comments, username_liked=False, **fields):
+    """post_view_pipeline 결과 한 건과 같은 모양 (댓글은 최신순)"""
+    start = datetime(2024, 1, 1)
+    comments = [{"_id": ObjectId(), "author": f"user{i}", "content": f"댓글 {i}",
+                 "created_at": start + timedelta(seconds=i)} for i in reversed(range(n_comments))]
+    doc = {"_id": ObjectId(), "title": "제목", "content": "본문", "board": "Cafeteria", "author": "writer",
+           "created_at": start, "likes_count": 1, "comments_count": n_comments, "_comments": comments, **fields}
+    if username_liked:
+        doc["_liked"] = [{"_id": ObjectId()}]
+    return doc
+
+def test_pipeline_fetches_one_extra_comment():
+    oid = ObjectId()
+    pipeline = api.post_view_pipeline(oid, 20)
+    assert pipeline[0] == {"$match": {"_id": oid}}
+    comments = pipeline[2]["$lookup"]
+    assert comments["from"] == "comments" and comments["as"] == "_comments"
+    assert {"$limit": 21} in comments["pipeline"]
+    assert {"$sort": {"created_at": -1, "_id": -1}} in comments["pipeline"]
+    assert len(pipeline) == 3  # 익명: 좋아요 조회 없음
+
+def test_pipeline_looks_up_viewer_like():
+    likes = api.post_view_pipeline(ObjectId(), 20, "tester")[3]["$lookup"]
+    assert likes["from"] == "likes" and likes["as"] == "_liked"
+    assert {"$eq": ["$username", "tester"]} in likes["pipeline"][0]["$match"]["$expr"]["$and"]
+
+def test_view_json_limits_comments_and_sets_cursor():
+    doc = aggregated(3)
+    data = api.post_view_to_json(doc, per_page=2)
+    assert set(data) == {"post", "comments", "comments_count", "viewer"}
+    assert [c["content"] for c in data["comments"]["items"]] == ["댓글 2", "댓글 1"]
+    assert data["comments"]["has_next"] is True
+    assert api.decode_cursor(data["comments"]["next_cursor"])[1] == doc["_comments"][1]["_id"]
+    assert data["comments_count"] == 3
+
+def test_view_json_last_page_has_no_cursor():
+    data = api.post_view_to_json(aggregated(2), per_page=2)
+    assert data["comments"]["has_next"] is False and data["comments"]["next_cursor"] is None
+
+@pytest.mark.parametrize("username, liked, expected", [
+    (None, False, {"username": None, "liked": False, "is_author": False}),
+    ("writer", True, {"username": "writer", "liked": True, "is_author": True}),
+    ("reader", False, {"username": "reader", "liked": False, "is_author": False}),
+])
+def test_view_json_viewer(username, liked, expected):
+    data = api.post_view_to_json(aggregated(0, username_liked=liked), 20, username)
+    assert data["viewer"] == expected
+    assert data["post"]["liked"] is liked
+
+# ── 라우트 (실제 MongoDB 필요: MONGODB_TEST_URI) ──
+
+def add_comments(app_module, post, n):
+    start = datetime.utcnow()
+    docs = [{"post_id": post["_id"], "author": f"user{i}", "content": f"댓글 {i}",
+             "created_at": start + timedelta(seconds=i)} for i in range(n)]
+    app_module.comments.insert_many(docs)
+    app_module.posts.update_one({"_id": post["_id"]}, {"$set": {"comments_count": n}})
+
+def view(client, post_id, query=""):
+    return client.get(f"/api/posts/{post_id}/view{query}")
+
+def test_view_shape_for_anonymous_viewer(client, app_module, lookup_pipelines):
+    post = make_post(app_module, title="점심 메뉴")
+    add_comments(app_module, post, 2)
+    other = make_post(app_module)
+    add_comments(app_module, other, 1)
+
+    resp = view(client, post["_id"])
+    assert resp.status_code == 200
+    data = resp.get_json()["data"]
+    assert set(data) == {"post", "comments", "comments_count", "viewer"}
+    assert data["post"]["id"] == str(post["_id"]) and data["post"]["title"] == "점심 메뉴"
+    assert data["comments_count"] == 2
+    assert [c["content"] for c in data["comments"]["items"]] == ["댓글 1", "댓글 0"]  # 최신순, 이 글 것만
+    assert data["comments"]["has_next"] is False and data["comments"]["next_cursor"] is None
+    assert data["viewer"] == {"username": None, "liked": False, "is_author": False}
+
+def test_view_limits_first_comment_page(client, app_module, lookup_pipelines):
+    post = make_post(app_module)
+    add_comments(app_module, post, 5)
+
+    comments = view(client, post["_id"], "?per_page=2").get_json()["data"]["comments"]
+    assert [c["content"] for c in comments["items"]] == ["댓글 4", "댓글 3"]
+    assert comments["per_page"] == 2 and comments["has_next"] is True
+
+    # next_cursor 로 이어지는 댓글 목록 API 가 바로 다음 댓글부터 준다
+    rest = client.get(f"/api/posts/{post['_id']}/comments?per_page=10&after={comments['next_cursor']}")
+    assert [c["content"] for c in rest.get_json()["data"]["items"]] == ["댓글 2", "댓글 1", "댓글 0"]
+
+def test_view_per_page_is_capped(client, app_module, lookup_pipelines):
+    post = make_post(app_module)
+    add_comments(app_module, post, 3)
+    comments = view(client, post["_id"], "?per_page=1000").get_json()["data"]["comments"]
+    assert comments["per_page"] == 100 and len(comments["items"]) == 3
+
+def test_view_reports_viewer_state(client, app_module, lookup_pipelines):
+    post = make_post(app_module, author="tester")
+    app_module.likes.insert_one({"post_id": post["_id"], "username": "tester", "created_at": datetime.utcnow()})
+    app_module.likes.insert_one({"post_id": make_post(app_module)["_id"], "username": "other"})
+    login(client)
+
+    data = view(client, post["_id"]).get_json()["data"]
+    assert data["viewer"] == {"username": "tester", "liked": True, "is_author": True}
+    assert data["post"]["liked"] is True
+
+    login(client, "other")
+    assert view(client, post["_id"]).get_json()["data"]["viewer"] == {
+        "username": "other", "liked": False, "is_author": False}
+
+def test_view_missing_post_is_404(client, lookup_pipelines):
+    resp = view(client, "0" * 24)
+    assert resp.status_code == 404
+    assert resp.get_json()["success"] is False
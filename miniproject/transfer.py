@@ -0,0 +1,222 @@
+"""
+대량 내보내기/가져오기 (flask export / flask import)
+
+번들 디렉터리 구성
+  manifest.json       : 형식 버전, 내보낸 시각, 컬렉션별 문서 수
+  <collection>.ndjson : 한 줄에 문서 하나 (bson.json_util Extended JSON → ObjectId/날짜 보존)
+  files/              : UPLOAD_FOLDER 의 원본/변형 이미지
+  .export-checkpoint / .import-checkpoint : 중단 후 재실행 시 이어서 진행하기 위한 위치 기록
+
+- 컬렉션을 _id 순 커서 하나로 읽고 batch 단위로 쓰므로 메모리는 batch 크기만큼만 쓴다.
+- 파생 필드(검색 bigram, excerpt, likes_count, comments_count)는 내보내지 않고 가져올 때 다시 만든다.
+- 가져오기는 insert_many(ordered=False) 로 넣고 _id 중복은 건너뛴다 → 같은 배치를 다시 넣어도 안전.
+- 작업 큐/인기글/버전/마이그레이션 기록 같은 운영용 컬렉션은 옮기지 않는다.
+  --drop 은 마이그레이션 기록도 지워서 지워진 인덱스를 가져오기 전에 다시 만든다.
+- 가져오기가 끝나면 모든 버전(versions.py)을 올린다. 지우면 0 으로 돌아가 예전 ETag 와 다시
+  맞을 수 있으므로 --drop 때도 지우지 않는다 → 가져오기 전의 ETag/캐시 본문이 다시 쓰이지 않음.
+"""
+import os
+import json
+import shutil
+from datetime import datetime
+
+from bson import json_util
+from pymongo import errors
+
+import counters
+import hot
+import migrations
+import search
+import versions
+
+FORMAT = 1
+COLLECTIONS = ["users", "posts", "comments", "likes", "uploads"]
+DERIVED = {
+    "posts": [search.TITLE_FIELD, search.BODY_FIELD, search.EXCERPT_FIELD, "likes_count", "comments_count"],
+    "comments": [search.BODY_FIELD],
+}
+MANIFEST = "manifest.json"
+FILES_DIR = "files"
+EXPORT_CHECKPOINT = ".export-checkpoint"
+IMPORT_CHECKPOINT = ".import-checkpoint"
+JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS
+
+class Checkpoint:
+    """작업별 진행 위치. 배치마다 임시 파일에 쓰고 교체해서 중간에 죽어도 깨지지 않는다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.state = json_util.loads(f.read())
+
+    def get(self, name: str) -> dict:
+        return self.state.get(name, {})
+
+    def set(self, name: str, **values) -> None:
+        self.state[name] = {**self.get(name), **values}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json_util.dumps(self.state, json_options=JSON_OPTIONS))
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def copy_files(src: str, dst: str) -> int:
+    """src 의 파일을 dst 로 (같은 크기로 이미 있으면 건너뜀 → 재실행 시 이어서). 복사한 수 반환."""
+    if not os.path.isdir(src):
+        return 0
+    os.makedirs(dst, exist_ok=True)
+    copied = 0
+    with os.scandir(src) as it:
+        for entry in it:
+            if not entry.is_file() or entry.name.startswith(".") or entry.name.endswith((".part", ".tmp")):
+                continue  # 업로드 중인 임시 파일 등
+            target = os.path.join(dst, entry.name)
+            if os.path.exists(target) and os.path.getsize(target) == entry.stat().st_size:
+                continue
+            shutil.copyfile(entry.path, target + ".part")
+            os.replace(target + ".part", target)
+            copied += 1
+    return copied
+
+# ── 내보내기 ──
+def export_bundle(db, out_dir: str, upload_folder: str = None, batch_size: int = 1000, log=print) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    cp = Checkpoint(os.path.join(out_dir, EXPORT_CHECKPOINT))
+    summary = {}
+
+    for name in COLLECTIONS:
+        state = cp.get(name)
+        if state.get("done"):
+            summary[name] = state["count"]
+            continue
+        count = state.get("count", 0)
+        query = {"_id": {"$gt": state["after"]}} if "after" in state else {}
+        projection = {field: 0 for field in DERIVED.get(name, [])} or None
+        cursor = db[name].find(query, projection).sort("_id", 1).batch_size(batch_size)
+
+        with open(os.path.join(out_dir, f"{name}.ndjson"), "ab") as out:
+            out.truncate(state.get("offset", 0))  # 기록된 위치 이후(마지막 배치 도중에 끊긴 부분) 버림
+            lines = []
+            last_id = None
+
+            def flush():
+                nonlocal count
+                out.write(b"".join(lines))
+                out.flush()
+                count += len(lines)
+                lines.clear()
+                cp.set(name, after=last_id, offset=out.tell(), count=count)
+                log(f"\r내보내기 {name}: {count}", end="", flush=True)
+
+            for doc in cursor:
+                lines.append(json_util.dumps(doc, json_options=JSON_OPTIONS).encode("utf-8") + b"\n")
+                last_id = doc["_id"]
+                if len(lines) >= batch_size:
+                    flush()
+            if lines:
+                flush()
+        cp.set(name, done=True, count=count)
+        summary[name] = count
+        log(f"\r내보내기 {name}: {count} 완료")
+
+    if upload_folder:
+        summary["files"] = copy_files(upload_folder, os.path.join(out_dir, FILES_DIR))
+        log(f"업로드 파일 {summary['files']}개 복사")
+
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT, "exported_at": datetime.utcnow().isoformat() + "Z",
+                   "collections": {k: v for k, v in summary.items() if k in COLLECTIONS}}, f, indent=2)
+    cp.clear()
+    return summary
+
+# ── 가져오기 ──
+def _prepare(name: str, doc: dict) -> dict:
+    """내보낼 때 뺀 파생 필드를 다시 만든다 (likes/comments 수는 마지막에 전수 집계)"""
+    if name == "posts":
+        doc.update(search.post_fields(doc.get("title", ""), doc.get("content", "")))
+        doc[search.EXCERPT_FIELD] = search.excerpt(doc.get("content", ""))
+        doc["likes_count"] = 0
+        doc["comments_count"] = 0
+    elif name == "comments":
+        doc.update(search.comment_fields(doc.get("content", "")))
+    return doc
+
+def _insert(coll, docs: list) -> int:
+    """넣은 수 반환. 이미 있는 문서(중복 키)는 건너뜀."""
+    try:
+        return len(coll.insert_many(docs, ordered=False).inserted_ids)
+    except errors.BulkWriteError as e:
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+        return e.details.get("nInserted", 0)
+
+def _bump_versions(db, batch_size: int) -> int:
+    """기존 버전 키 전부 + 가져온 게시글/게시판 키를 올린다. 올린 키 수 반환."""
+    coll = db[versions.COLLECTION]
+    bumped = coll.update_many({}, {"$inc": {"v": 1}, "$set": {"at": datetime.utcnow().replace(microsecond=0)}})
+    keys = [versions.board_key(None), *(versions.board_key(b) for b in db["posts"].distinct("board"))]
+    count = bumped.modified_count
+    for doc in db["posts"].find({}, {"_id": 1}).batch_size(batch_size):
+        keys.append(versions.post_key(doc["_id"]))
+        if len(keys) >= batch_size:
+            versions.bump(db, *keys)
+            count += len(keys)
+            keys = []
+    versions.bump(db, *keys)
+    return count + len(keys)
+
+def import_bundle(db, in_dir: str, upload_folder: str = None, batch_size: int = 1000,
+                  drop: bool = False, log=print) -> dict:
+    with open(os.path.join(in_dir, MANIFEST), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"지원하지 않는 번들 형식: {manifest.get('format')}")
+
+    cp = Checkpoint(os.path.join(in_dir, IMPORT_CHECKPOINT))
+    if drop and not cp.state:  # 재개 중에는 지우지 않음
+        # 컬렉션을 지우면 인덱스도 같이 지워지므로 마이그레이션 기록도 지워 전부 다시 적용되게 한다
+        for name in COLLECTIONS + [counters.COLLECTION, hot.COLLECTION, migrations.COLLECTION]:
+            db.drop_collection(name)
+    migrations.migrate(db)  # 유니크 인덱스가 있어야 중복 건너뛰기가 안전
+    summary = {}
+
+    for name in COLLECTIONS:
+        path = os.path.join(in_dir, f"{name}.ndjson")
+        state = cp.get(name)
+        if state.get("done") or not os.path.exists(path):
+            summary[name] = state.get("inserted", 0)
+            continue
+        inserted = state.get("inserted", 0)
+        coll = db[name]
+        with open(path, "rb") as src:
+            src.seek(state.get("offset", 0))
+            batch = []
+            for line in src:
+                if line.strip():
+                    batch.append(_prepare(name, json_util.loads(line)))
+                if len(batch) >= batch_size:
+                    inserted += _insert(coll, batch)
+                    batch = []
+                    cp.set(name, offset=src.tell(), inserted=inserted)
+                    log(f"\r가져오기 {name}: {inserted}", end="", flush=True)
+            if batch:
+                inserted += _insert(coll, batch)
+        cp.set(name, done=True, inserted=inserted)
+        summary[name] = inserted
+        log(f"\r가져오기 {name}: {inserted} 완료")
+
+    if upload_folder:
+        summary["files"] = copy_files(os.path.join(in_dir, FILES_DIR), upload_folder)
+        log(f"업로드 파일 {summary['files']}개 복사")
+
+    log("파생 필드 재계산 (likes_count, comments_count, 카운터, 인기글, 버전)...")
+    summary["counters"] = counters.rebuild(db, batch_size)
+    summary["hot"] = hot.rebuild(db, batch_size)
+    summary["versions"] = _bump_versions(db, batch_size)
+    cp.clear()
+    return summary
@@ -0,0 +1,146 @@
+"""
+업로드 파일 저장 (내용 주소 방식)
+
+- 파일은 내용의 SHA-256 으로 <hex>.<ext> 이름을 가진다 → 같은 이미지는 한 번만 저장.
+- uploads 컬렉션에 파일별 참조(게시글 id 집합)를 둔다:
+  {"_id": <파일명>, "owners": [post_id, ...], "variants": {...}}
+  게시글이 이미지를 쓰면 $addToSet, 지워지면 $pull, 비면 파일을 지운다.
+  집합 연산이라 같은 해제가 재시도되어도(작업 큐) 참조 수가 어긋나지 않는다.
+- 해제와 저장이 겹칠 수 있다: 문서 삭제는 owners 가 빈 경우에만 하고, 파일은 discard() 가
+  옆으로 옮긴 뒤 문서가 다시 생겼는지(store) 확인하고 지운다. store() 는 파일이 없으면 다시 놓는다.
+- 이름이 곧 내용이므로 응답은 영구 캐시(immutable) + 해시 ETag 로 내려줄 수 있다.
+
+요청 본문 전체 크기는 MAX_CONTENT_LENGTH 로 werkzeug 가 스트리밍 단계에서 끊는다.
+파일 하나의 크기는 multipart 파서가 파일 부분을 받아 쓰는 LimitedSpool 이 세다가 넘는 순간
+FileTooLarge 로 파싱을 멈춘다 → 나머지 본문을 받지 않는다. store() 도 복사하면서 다시 센다.
+"""
+import os
+import re
+import hashlib
+import tempfile
+from datetime import datetime
+
+from pymongo import ReturnDocument
+
+COLLECTION = "uploads"
+CHUNK_SIZE = 64 * 1024
+
+# <sha256>.<ext> 또는 변형본 <sha256>_w320.webp
+HASHED_NAME = re.compile(r"^([0-9a-f]{64})(_w\d+)?\.[a-z0-9]+$")
+
+class FileTooLarge(Exception):
+    """파일 하나가 허용 용량을 넘은 경우"""
+
+class LimitedSpool(tempfile.SpooledTemporaryFile):
+    """
+    multipart 파서(werkzeug stream_factory)가 파일 부분을 쓰는 임시 파일.
+    작으면 메모리, 커지면 디스크 (werkzeug 기본과 같음). max_bytes 를 넘게 쓰면 FileTooLarge.
+    """
+
+    def __init__(self, max_bytes: int, max_size: int = 500 * 1024):
+        super().__init__(max_size=max_size, mode="rb+")
+        self.max_bytes = max_bytes
+        self.written = 0
+
+    def write(self, data) -> int:
+        self.written += len(data)
+        if self.written > self.max_bytes:
+            raise FileTooLarge()
+        return super().write(data)
+
+def is_content_addressed(filename: str) -> bool:
+    return HASHED_NAME.match(filename) is not None
+
+def store(db, file, folder: str, ext: str, max_bytes: int, owner) -> dict:
+    """
+    업로드 스트림을 해시하면서 임시 파일로 받고 <sha256>.<ext> 로 옮긴 뒤 owner 참조 추가.
+    max_bytes 를 넘는 순간 중단하고 FileTooLarge.
+    반환: 갱신 후의 uploads 문서 ({"_id": 파일명, "owners", "variants"?})
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLarge()
+                digest.update(chunk)
+                out.write(chunk)
+
+        name = f"{digest.hexdigest()}.{ext.lower()}"
+        entry = db[COLLECTION].find_one_and_update(
+            {"_id": name},
+            {"$addToSet": {"owners": owner},
+             "$setOnInsert": {"size": size, "created_at": datetime.utcnow()}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        # 참조를 올린 뒤에 파일이 없으면 놓는다: 처음 올린 파일이거나 직전에 참조 0 으로 지워진 경우.
+        # 이미 있으면 내용이 같으므로 임시 파일만 버린다 (discard 가 옆으로 옮긴 중이면 discard 가 되돌림)
+        path = os.path.join(folder, name)
+        if os.path.exists(path):
+            remove_quietly(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+        return entry
+    except BaseException:
+        remove_quietly(tmp_path)
+        raise
+
+def set_variants(db, name: str, variants: dict) -> bool:
+    """
+    변형본 기록. 참조가 남아 있을 때만 기록하고 True.
+    생성 중에 마지막 참조가 풀렸으면(글 삭제) False → 호출 측이 만든 파일을 지운다.
+    """
+    res = db[COLLECTION].update_one({"_id": name, "owners.0": {"$exists": True}}, {"$set": {"variants": variants}})
+    return res.matched_count == 1
+
+def release(db, name: str, owner) -> bool:
+    """
+    owner 참조 제거. 더 이상 참조가 없으면 문서를 지우고 True (호출 측이 파일 삭제).
+    uploads 문서가 없는 예전 방식 파일({post_id}_{name})은 항상 True.
+    """
+    coll = db[COLLECTION]
+    entry = coll.find_one_and_update(
+        {"_id": name}, {"$pull": {"owners": owner}}, return_document=ReturnDocument.AFTER
+    )
+    if entry is None:
+        return not is_content_addressed(name)
+    if entry["owners"]:
+        return False
+    return coll.delete_one({"_id": name, "owners": {"$size": 0}}).deleted_count == 1
+
+def discard(db, folder: str, name: str, extra=()) -> bool:
+    """
+    release() 가 True 를 준 뒤 name(과 extra 변형본) 파일 삭제. 지웠으면 True.
+    파일을 .tmp 로 옮긴 다음 uploads 문서를 다시 본다: 그 사이 store() 가 같은 내용을 올렸으면
+    (문서가 다시 있음) 옮긴 파일을 되돌리고 False.
+    """
+    moved = []
+    for n in [name, *extra]:
+        path = os.path.join(folder, n)
+        try:
+            os.replace(path, path + ".tmp")
+            moved.append(path)
+        except FileNotFoundError:
+            pass
+    revived = db[COLLECTION].find_one({"_id": name}, {"_id": 1}) is not None
+    for path in moved:
+        if revived:
+            os.replace(path + ".tmp", path)
+        else:
+            remove_quietly(path + ".tmp")
+    return not revived
+
+def remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"파일 삭제 실패 ({path}): {e}")
@@ -0,0 +1,93 @@
+"""
+HTTP 조건부 요청(ETag / Last-Modified)용 버전 번호 (versions 컬렉션)
+
+문서 형태: {"_id": <key>, "v": <int>, "at": <마지막 변경 시각>}
+  - "post:<id>"       : 게시글 본문/좋아요/댓글/이미지 변형이 바뀔 때마다 +1
+  - "board:<board>"   : 그 게시판 목록의 구성이 바뀔 때 (글 작성/삭제, 썸네일 생성, 인기글 정리)
+  - "board:"          : 전체 목록
+  - "user:<username>" : 그 사용자가 좋아요를 누르거나 취소할 때 (목록의 liked 필드)
+
+좋아요/댓글 수 변화는 게시판 버전을 올리지 않는다. 올리면 좋아요 하나가 사이트 전체의
+목록 캐시와 ETag 를 무효화한다. 대신 목록/인기글은 COUNT_WINDOW 초 단위 시간 창을 버전에
+섞어서, 카드의 수와 인기글 순위가 최대 그만큼 늦게 반영되게 한다 (list_state).
+
+304 판단은 게시글 문서 대신 이 작은 문서만 읽는다 (_id 조회 1회).
+문서가 없으면 버전 0 으로 본다. 게시글은 작성 때 버전을 올리지만, 그 전에 만든 글은 문서가
+없을 수 있으므로 Last-Modified 를 _id(ObjectId)의 생성 시각으로 잡는다 (get_post). 삭제된 게시글의 문서도 지우지 않는다
+(지우면 버전이 0 으로 돌아가 예전 ETag 와 다시 일치할 수 있음).
+"""
+import os
+import time
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne
+
+COLLECTION = "versions"
+EPOCH = datetime(1970, 1, 1)
+COUNT_WINDOW = int(os.getenv("LIST_COUNT_WINDOW", "30"))  # 초
+
+def post_key(post_id) -> str:
+    return f"post:{post_id}"
+
+def board_key(board) -> str:
+    return f"board:{board or ''}"
+
+def user_key(username) -> str:
+    return f"user:{username}"
+
+def post_keys(post_id, *boards) -> list:
+    """목록 카드 자체가 바뀌는 변경(삭제, 썸네일): 그 글이 보이는 목록(게시판 + 전체)도 함께"""
+    return [post_key(post_id), *(board_key(b) for b in boards), board_key(None)]
+
+def bump_ops(*keys: str) -> list:
+    # Last-Modified 는 초 단위라 밀리초 이하는 버린다 (Mongo 저장 정밀도와 맞춤)
+    now = datetime.utcnow().replace(microsecond=0)
+    return [UpdateOne({"_id": key}, {"$inc": {"v": 1}, "$set": {"at": now}}, upsert=True)
+            for key in dict.fromkeys(keys)]
+
+def bump(db, *keys: str) -> None:
+    if not keys:
+        return
+    db[COLLECTION].bulk_write(bump_ops(*keys), ordered=False)
+
+def bump_post(db, post_id, *boards) -> None:
+    bump(db, *post_keys(post_id, *boards))
+
+def from_doc(doc) -> tuple:
+    """(version, last_modified). 문서가 없으면 버전 0"""
+    return (doc["v"], doc["at"]) if doc else (0, EPOCH)
+
+def get(db, key: str) -> tuple:
+    return from_doc(db[COLLECTION].find_one({"_id": key}))
+
+def post_from_doc(doc, post_id) -> tuple:
+    """게시글 (version, last_modified). 문서가 없으면 버전 0, 시각은 작성 시각(_id 생성 시각)"""
+    return from_doc(doc) if doc else (0, post_id.generation_time.replace(tzinfo=None))
+
+def get_post(db, post_id) -> tuple:
+    return post_from_doc(db[COLLECTION].find_one({"_id": post_key(post_id)}), post_id)
+
+# ── 목록/인기글 ──
+def count_window(now: float = None) -> int:
+    return int((time.time() if now is None else now) // COUNT_WINDOW)
+
+def list_keys(board, username=None) -> list:
+    return [board_key(board), *([user_key(username)] if username else [])]
+
+def list_state(docs: dict, board, username=None, now: float = None) -> tuple:
+    """
+    docs ({_id: 문서}, list_keys 로 읽은 것) → (shared, version, last_modified)
+      shared  : 캐시 키용, 사용자 무관 "<게시판 버전>.<시간 창>"
+      version : ETag 용, shared + 사용자 좋아요 버전
+    """
+    board_v, board_at = from_doc(docs.get(board_key(board)))
+    user_v, user_at = from_doc(docs.get(user_key(username))) if username else (0, EPOCH)
+    window = count_window(now)
+    shared = f"{board_v}.{window}"
+    window_at = EPOCH + timedelta(seconds=window * COUNT_WINDOW)
+    return shared, f"{shared}.{user_v}", max(board_at, user_at, window_at)
+
+def get_list(db, board, username=None) -> tuple:
+    keys = list_keys(board, username)
+    docs = {d["_id"]: d for d in db[COLLECTION].find({"_id": {"$in": keys}})}
+    return list_state(docs, board, username)